@@ -0,0 +1,485 @@
+"""Columnar store and materialized aggregates for the Reporting items.
+
+Backs "Client lifetime value calculator", "Cleaner performance heatmap",
+"Net Promoter Score (NPS) tracking", "Most-requested services chart",
+"Auto-track ad spend vs. bookings", the weekly revenue report and the
+missed/rescheduled job report.
+
+Imported data lives under one directory per workspace as Parquet parts,
+one file per import and table (``jobs``, ``payments``, ``reviews``,
+``ad_spend``, ``clients``; see ``TABLES``). Reports never scan those
+parts. Each entry in ``AGGREGATES`` is a small grouped table of sums,
+minimums and maximums over one source table, and ``append`` folds a new
+batch into every aggregate over that table: the cost is proportional to
+the batch plus the aggregate, not to the years of history behind it.
+Aggregates are saved as a numbered snapshot directory holding every
+aggregate plus the list of parts they include; one ``os.replace`` of the
+``CURRENT`` pointer makes a snapshot live, so a crash never leaves
+aggregates and part list out of step. Parts written by an interrupted
+import are folded in when the store is next opened; ``rebuild``
+recomputes everything from the parts.
+
+    python analytics.py build --root analytics_data --years 3
+    python analytics.py report --root analytics_data
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# Table -> column -> dtype; "datetime64[ns]" columns are parsed from text on import
+TABLES = {
+    "jobs": {"job_id": "string", "client": "string", "cleaner": "string", "service": "string",
+             "date": "datetime64[ns]", "amount": "float64", "status": "string"},
+    "payments": {"client": "string", "date": "datetime64[ns]", "amount": "float64"},
+    "reviews": {"client": "string", "cleaner": "string", "date": "datetime64[ns]", "rating": "int64", "nps": "int64"},
+    "ad_spend": {"date": "datetime64[ns]", "channel": "string", "spend": "float64"},
+    "clients": {"client": "string", "acquired": "datetime64[ns]", "channel": "string"},
+}
+COMPLETED, MISSED, RESCHEDULED = "completed", "missed", "rescheduled"
+
+Aggregate = namedtuple("Aggregate", ["table", "keys", "prepare", "how"])
+
+
+def _month(dates):
+    return dates.dt.to_period("M").dt.start_time
+
+
+def _week(dates):
+    return dates.dt.to_period("W-SUN").dt.start_time
+
+
+def _jobs_by_week(df):
+    done = df["status"] == COMPLETED
+    return pd.DataFrame({"week": _week(df["date"]), "revenue": df["amount"].where(done, 0.0), "jobs": done.astype("int64")})
+
+
+def _jobs_by_month(df):
+    return pd.DataFrame({
+        "month": _month(df["date"]), "jobs": 1,
+        "missed": (df["status"] == MISSED).astype("int64"),
+        "rescheduled": (df["status"] == RESCHEDULED).astype("int64"),
+    })
+
+
+def _services(df):
+    return pd.DataFrame({"service": df["service"], "month": _month(df["date"]), "jobs": 1})
+
+
+def _cleaner_jobs(df):
+    return pd.DataFrame({"cleaner": df["cleaner"], "month": _month(df["date"]),
+                         "jobs": (df["status"] == COMPLETED).astype("int64")})
+
+
+def _cleaner_ratings(df):
+    return pd.DataFrame({"cleaner": df["cleaner"], "month": _month(df["date"]),
+                         "rating_sum": df["rating"], "ratings": 1})
+
+
+def _nps(df):
+    return pd.DataFrame({
+        "month": _month(df["date"]), "responses": 1,
+        "promoters": (df["nps"] >= 9).astype("int64"), "detractors": (df["nps"] <= 6).astype("int64"),
+    })
+
+
+def _client_value(df):
+    return pd.DataFrame({"client": df["client"], "paid": df["amount"], "payments": 1,
+                         "first": df["date"], "last": df["date"]})
+
+
+def _ad_spend(df):
+    return pd.DataFrame({"channel": df["channel"], "month": _month(df["date"]), "spend": df["spend"]})
+
+
+def _acquisitions(df):
+    return pd.DataFrame({"channel": df["channel"], "month": _month(df["acquired"]), "clients": 1})
+
+
+AGGREGATES = {
+    "revenue_weekly": Aggregate("jobs", ["week"], _jobs_by_week, {"revenue": "sum", "jobs": "sum"}),
+    "jobs_monthly": Aggregate("jobs", ["month"], _jobs_by_month, {"jobs": "sum", "missed": "sum", "rescheduled": "sum"}),
+    "services_monthly": Aggregate("jobs", ["service", "month"], _services, {"jobs": "sum"}),
+    "cleaner_jobs": Aggregate("jobs", ["cleaner", "month"], _cleaner_jobs, {"jobs": "sum"}),
+    "cleaner_ratings": Aggregate("reviews", ["cleaner", "month"], _cleaner_ratings, {"rating_sum": "sum", "ratings": "sum"}),
+    "nps_monthly": Aggregate("reviews", ["month"], _nps, {"responses": "sum", "promoters": "sum", "detractors": "sum"}),
+    "client_value": Aggregate("payments", ["client"], _client_value,
+                              {"paid": "sum", "payments": "sum", "first": "min", "last": "max"}),
+    "ad_spend_monthly": Aggregate("ad_spend", ["channel", "month"], _ad_spend, {"spend": "sum"}),
+    "acquisitions_monthly": Aggregate("clients", ["channel", "month"], _acquisitions, {"clients": "sum"}),
+}
+
+
+def _fold(current, batch, aggregate):
+    """``current`` with the grouped ``batch`` merged in."""
+    grouped = batch.groupby(aggregate.keys, sort=False).agg(aggregate.how)
+    if current is None or current.empty:
+        return grouped.sort_index()
+    return pd.concat([current, grouped]).groupby(level=aggregate.keys).agg(aggregate.how)
+
+
+def _fold_batch(aggregates, table, df):
+    """Fold ``df`` into ``table``'s entries of the ``aggregates`` dict; returns their names.
+
+    Entries are replaced, never modified, so a copy of the store's dict
+    can be folded into without touching the live aggregates.
+    """
+    names = [name for name, aggregate in AGGREGATES.items() if aggregate.table == table]
+    if len(df):
+        for name in names:
+            aggregate = AGGREGATES[name]
+            aggregates[name] = _fold(aggregates.get(name), aggregate.prepare(df), aggregate)
+    return names
+
+
+def _part_number(part):
+    match = re.fullmatch(r"part-(\d+)\.parquet", os.path.basename(part))
+    return int(match.group(1)) if match else 0
+
+
+def coerce(table, df):
+    """``df`` with exactly ``table``'s columns and dtypes; raises ValueError on missing columns."""
+    schema = TABLES[table]
+    missing = [column for column in schema if column not in df.columns]
+    if missing:
+        raise ValueError(f"{table} import is missing columns: {', '.join(missing)}")
+    out = pd.DataFrame(index=range(len(df)))
+    for column, dtype in schema.items():
+        values = df[column].reset_index(drop=True)
+        out[column] = pd.to_datetime(values) if dtype.startswith("datetime") else values.astype(dtype)
+    return out
+
+
+class AnalyticsStore:
+    def __init__(self, root):
+        self.root = root
+        self.aggregates = {}
+        self.parts = []  # part paths (relative to root) folded into the aggregates
+        self.version = 0  # live snapshot under _aggregates/; 0 before the first save
+        self._next_part = 1  # never reused, even when an append fails
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(root, "_aggregates"), exist_ok=True)
+        self._load()
+
+    @property
+    def _current_path(self):
+        return os.path.join(self.root, "_aggregates", "CURRENT")
+
+    def _snapshot_dir(self, version):
+        return os.path.join(self.root, "_aggregates", f"v{version:06d}")
+
+    def _load(self):
+        if os.path.exists(self._current_path):
+            with open(self._current_path, encoding="utf-8") as f:
+                self.version = int(f.read().strip())
+            directory = self._snapshot_dir(self.version)
+            with open(os.path.join(directory, "manifest.json"), encoding="utf-8") as f:
+                self.parts = json.load(f)["parts"]
+            for name in AGGREGATES:
+                path = os.path.join(directory, f"{name}.parquet")
+                if os.path.exists(path):
+                    self.aggregates[name] = pd.read_parquet(path)
+        self._remove_stale_snapshots()
+        all_parts = self._all_parts()
+        self._next_part = 1 + max((_part_number(part) for part in all_parts), default=0)
+        # Parts written after the last saved manifest (an interrupted import)
+        folded = set(self.parts)
+        pending = [part for part in all_parts if part not in folded]
+        if pending:
+            aggregates, parts = dict(self.aggregates), list(self.parts)
+            for part in pending:
+                table = part.split("/", 1)[0]
+                _fold_batch(aggregates, table, pd.read_parquet(os.path.join(self.root, part)))
+                parts.append(part)
+            self._save(AGGREGATES, aggregates, parts)
+
+    def _all_parts(self):
+        parts = []
+        for table in TABLES:
+            directory = os.path.join(self.root, table)
+            if os.path.isdir(directory):
+                parts += [f"{table}/{name}" for name in sorted(os.listdir(directory)) if name.endswith(".parquet")]
+        return parts
+
+    def _save(self, names, aggregates, parts):
+        """Write ``aggregates`` and ``parts`` as a new snapshot and make it live.
+
+        Only the named aggregates are rewritten; the others are hard links
+        to the previous snapshot's files. ``CURRENT`` is switched with one
+        ``os.replace``, and only then does the store take the new state, so
+        a failed save leaves memory and disk on the previous snapshot.
+        """
+        previous, version = self._snapshot_dir(self.version), self.version + 1
+        directory = self._snapshot_dir(version)
+        shutil.rmtree(directory, ignore_errors=True)  # left by a crash before the switch
+        os.makedirs(directory)
+        for name, frame in aggregates.items():
+            path, old = os.path.join(directory, f"{name}.parquet"), os.path.join(previous, f"{name}.parquet")
+            if name in names or not os.path.exists(old):
+                frame.to_parquet(path)
+                continue
+            try:
+                os.link(old, path)
+            except OSError:
+                shutil.copyfile(old, path)
+        with open(os.path.join(directory, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump({"parts": parts}, f)
+        with open(f"{self._current_path}.tmp", "w", encoding="utf-8") as f:
+            f.write(str(version))
+        os.replace(f"{self._current_path}.tmp", self._current_path)
+        self.aggregates, self.parts, self.version = aggregates, parts, version
+        self._remove_stale_snapshots()
+
+    def _remove_stale_snapshots(self):
+        directory = os.path.join(self.root, "_aggregates")
+        live = os.path.basename(self._snapshot_dir(self.version))
+        for entry in os.listdir(directory):
+            if entry.startswith("v") and entry != live and os.path.isdir(os.path.join(directory, entry)):
+                shutil.rmtree(os.path.join(directory, entry), ignore_errors=True)
+
+    def append(self, table, df):
+        """Import ``df`` into ``table`` and fold it into that table's aggregates; returns the row count."""
+        if table not in TABLES:
+            raise ValueError(f"Unknown table: {table}")
+        df = coerce(table, df)
+        if df.empty:
+            return 0
+        with self._lock:
+            os.makedirs(os.path.join(self.root, table), exist_ok=True)
+            part = f"{table}/part-{self._next_part:06d}.parquet"
+            self._next_part += 1
+            path = os.path.join(self.root, part)
+            try:
+                df.to_parquet(path, index=False)
+                aggregates = dict(self.aggregates)
+                names = _fold_batch(aggregates, table, df)
+                self._save(names, aggregates, self.parts + [part])
+            except BaseException:
+                # Not live: drop the part so reopening the store does not fold it in
+                if part not in self.parts and os.path.exists(path):
+                    os.remove(path)
+                raise
+        return len(df)
+
+    def read(self, table):
+        """Every row of ``table`` (a full scan; reports use the aggregates instead)."""
+        parts = [os.path.join(self.root, part) for part in self.parts if part.startswith(f"{table}/")]
+        if not parts:
+            return coerce(table, pd.DataFrame(columns=list(TABLES[table])))
+        return pd.concat([pd.read_parquet(path) for path in parts], ignore_index=True)
+
+    def rebuild(self):
+        """Recompute every aggregate from the stored parts."""
+        with self._lock:
+            aggregates, parts = {}, []
+            for part in self._all_parts():
+                table = part.split("/", 1)[0]
+                _fold_batch(aggregates, table, pd.read_parquet(os.path.join(self.root, part)))
+                parts.append(part)
+            self._save(AGGREGATES, aggregates, parts)
+
+    @property
+    def empty(self):
+        return not self.parts
+
+    def _aggregate(self, name):
+        frame = self.aggregates.get(name)
+        if frame is None:
+            aggregate = AGGREGATES[name]
+            frame = pd.DataFrame(columns=aggregate.keys + list(aggregate.how)).set_index(aggregate.keys)
+        return frame
+
+    # -- reports ---------------------------------------------------------
+
+    def weekly_revenue(self):
+        return self._aggregate("revenue_weekly").sort_index()
+
+    def reschedule_report(self):
+        """Monthly jobs with missed and rescheduled rates (%)."""
+        frame = self._aggregate("jobs_monthly").sort_index().astype("float64")
+        jobs = frame["jobs"].where(frame["jobs"] > 0)
+        return frame.assign(missed_pct=100 * frame["missed"] / jobs, rescheduled_pct=100 * frame["rescheduled"] / jobs)
+
+    def service_popularity(self, months=None):
+        """Jobs per service, over the last ``months`` months (all time if None), most requested first."""
+        frame = self._aggregate("services_monthly").reset_index()
+        if months and len(frame):
+            frame = frame[frame["month"] > frame["month"].max() - pd.DateOffset(months=months)]
+        return frame.groupby("service")["jobs"].sum().sort_values(ascending=False)
+
+    def cleaner_heatmap(self, months=12):
+        """Cleaner x month average rating over the last ``months`` months (NaN: no reviews)."""
+        frame = self._aggregate("cleaner_ratings").reset_index()
+        if not len(frame):
+            return pd.DataFrame()
+        frame = frame[frame["month"] > frame["month"].max() - pd.DateOffset(months=months)]
+        frame = frame.assign(rating=frame["rating_sum"] / frame["ratings"])
+        return frame.pivot(index="cleaner", columns="month", values="rating").sort_index()
+
+    def cleaner_summary(self, months=12):
+        """Completed jobs and average rating per cleaner over the last ``months`` months."""
+        jobs = self._aggregate("cleaner_jobs").reset_index()
+        ratings = self._aggregate("cleaner_ratings").reset_index()
+        if not len(jobs):
+            return pd.DataFrame(columns=["jobs", "rating"])
+        since = jobs["month"].max() - pd.DateOffset(months=months)
+        jobs = jobs[jobs["month"] > since].groupby("cleaner")["jobs"].sum()
+        ratings = ratings[ratings["month"] > since].groupby("cleaner")[["rating_sum", "ratings"]].sum()
+        return pd.DataFrame({"jobs": jobs, "rating": ratings["rating_sum"] / ratings["ratings"]}).sort_values("rating")
+
+    def nps(self):
+        """Monthly Net Promoter Score: % promoters (9-10) minus % detractors (0-6)."""
+        frame = self._aggregate("nps_monthly").sort_index().astype("float64")
+        responses = frame["responses"].where(frame["responses"] > 0)
+        return frame.assign(nps=100 * (frame["promoters"] - frame["detractors"]) / responses)
+
+    def client_lifetime_value(self):
+        """Per-client totals plus ``(average value, average months, clients)``."""
+        frame = self._aggregate("client_value")
+        if not len(frame):
+            return frame, (0.0, 0.0, 0)
+        months = (frame["last"] - frame["first"]).dt.days / 30.44 + 1
+        frame = frame.assign(months=months, monthly=frame["paid"] / months).sort_values("paid", ascending=False)
+        return frame, (float(frame["paid"].mean()), float(months.mean()), len(frame))
+
+    def ad_spend_vs_bookings(self):
+        """Month x channel spend, new clients and cost per acquisition."""
+        spend = self._aggregate("ad_spend_monthly")
+        clients = self._aggregate("acquisitions_monthly")
+        frame = spend.join(clients, how="outer").fillna(0.0)
+        frame["cost_per_client"] = frame["spend"] / frame["clients"].where(frame["clients"] > 0)
+        return frame.sort_index()
+
+
+REPORTS = {
+    "Weekly revenue": "weekly_revenue",
+    "Client lifetime value": "client_lifetime_value",
+    "Cleaner performance heatmap": "cleaner_heatmap",
+    "Net Promoter Score": "nps",
+    "Most-requested services": "service_popularity",
+    "Ad spend vs. bookings": "ad_spend_vs_bookings",
+    "Missed & rescheduled jobs": "reschedule_report",
+}
+
+
+# -- synthetic history ------------------------------------------------------
+
+SERVICES = {"Standard clean": 160.0, "Deep clean": 280.0, "Move-out": 340.0, "Office clean": 220.0,
+            "Window washing": 120.0, "Carpet cleaning": 180.0}
+CHANNELS = ("Google Ads", "Facebook", "Referral", "Yelp", "Nextdoor")
+_PAID_CHANNELS = {"Google Ads": 40.0, "Facebook": 25.0, "Yelp": 12.0, "Nextdoor": 6.0}
+
+
+def synthetic_history(years=3, clients=3000, cleaners=40, end=pd.Timestamp("2026-09-30"), seed=0):
+    """``{table: DataFrame}`` for ``years`` years of a growing cleaning business."""
+    rng = np.random.default_rng(seed)
+    start = end - pd.DateOffset(years=years)
+    days = (end - start).days
+    # Clients: acquisition ramps up over time; each books weekly, biweekly or monthly until churning
+    acquired = start + pd.to_timedelta(np.sort(days * np.sqrt(rng.random(clients))).astype(int), unit="D")
+    channel = rng.choice(CHANNELS, clients, p=[0.3, 0.2, 0.25, 0.15, 0.1])
+    every = rng.choice([7, 14, 28], clients, p=[0.3, 0.45, 0.25])
+    lifetime = rng.exponential(500, clients).astype(int) + 30
+    visits = np.maximum((np.minimum(lifetime, (end - acquired).days) // every), 1)
+    client_ids = np.array([f"client-{i + 1}" for i in range(clients)])
+    owner = np.repeat(np.arange(clients), visits)
+    visit_no = np.arange(len(owner)) - np.repeat(np.cumsum(visits) - visits, visits)
+    dates = acquired[owner] + pd.to_timedelta(visit_no * every[owner], unit="D") \
+        + pd.to_timedelta(rng.integers(8, 16, len(owner)), unit="h")
+    services = np.array(list(SERVICES))
+    service = services[rng.choice(len(services), len(owner), p=[0.55, 0.15, 0.05, 0.1, 0.07, 0.08])]
+    amount = pd.Series(service).map(SERVICES).to_numpy() * rng.uniform(0.9, 1.2, len(owner)).round(2)
+    status = rng.choice([COMPLETED, RESCHEDULED, MISSED], len(owner), p=[0.93, 0.05, 0.02])
+    cleaner_quality = rng.normal(4.4, 0.3, cleaners)
+    cleaner = rng.integers(cleaners, size=len(owner))
+    jobs = pd.DataFrame({
+        "job_id": [f"job-{i + 1}" for i in range(len(owner))], "client": client_ids[owner],
+        "cleaner": [f"cleaner-{c + 1:02d}" for c in cleaner], "service": service, "date": dates,
+        "amount": amount.round(2), "status": status,
+    }).sort_values("date", ignore_index=True)
+
+    done = jobs[jobs["status"] == COMPLETED]
+    payments = pd.DataFrame({
+        "client": done["client"].to_numpy(),
+        "date": done["date"].to_numpy() + pd.to_timedelta(rng.integers(0, 20, len(done)), unit="D").to_numpy(),
+        "amount": done["amount"].to_numpy(),
+    })
+    reviewed = done.sample(frac=0.2, random_state=seed)
+    quality = cleaner_quality[reviewed["cleaner"].str[-2:].astype(int).to_numpy() - 1]
+    rating = np.clip(np.round(rng.normal(quality, 0.6)), 1, 5).astype(int)
+    reviews = pd.DataFrame({
+        "client": reviewed["client"].to_numpy(), "cleaner": reviewed["cleaner"].to_numpy(),
+        "date": reviewed["date"].to_numpy() + pd.to_timedelta(1, unit="D"), "rating": rating,
+        "nps": np.clip(rating * 2 + rng.integers(-1, 2, len(rating)), 0, 10),
+    })
+    spend_days = pd.date_range(start, end, freq="D")
+    ad_spend = pd.DataFrame([
+        {"date": day, "channel": name, "spend": round(base * rng.uniform(0.6, 1.4), 2)}
+        for day in spend_days for name, base in _PAID_CHANNELS.items()
+    ])
+    client_table = pd.DataFrame({"client": client_ids, "acquired": acquired, "channel": channel})
+    return {"jobs": jobs, "payments": payments, "reviews": reviews, "ad_spend": ad_spend, "clients": client_table}
+
+
+def import_by_month(store, history, column_of=None):
+    """Append ``history`` one calendar month at a time, as monthly imports would; returns per-import seconds."""
+    column_of = column_of or {"clients": "acquired"}
+    timings = []
+    months = sorted(set().union(*(
+        set(_month(frame[column_of.get(table, "date")]).unique()) for table, frame in history.items()
+    )))
+    for month in months:
+        for table, frame in history.items():
+            dates = frame[column_of.get(table, "date")]
+            batch = frame[_month(dates) == month]
+            if len(batch):
+                started = time.perf_counter()
+                store.append(table, batch)
+                timings.append(time.perf_counter() - started)
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and query the reporting store")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="import synthetic history month by month")
+    build.add_argument("--root", default="analytics_data")
+    build.add_argument("--years", type=int, default=3)
+    build.add_argument("--clients", type=int, default=3000)
+    build.add_argument("--seed", type=int, default=0)
+    report = sub.add_parser("report", help="time every report and a full rebuild")
+    report.add_argument("--root", default="analytics_data")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        history = synthetic_history(args.years, args.clients, seed=args.seed)
+        store = AnalyticsStore(args.root)
+        timings = import_by_month(store, history)
+        rows = sum(len(frame) for frame in history.values())
+        print(f"{rows:,} rows in {len(timings)} imports: median {np.median(timings) * 1000:.0f} ms, "
+              f"total {sum(timings):.1f}s ({len(history['jobs']):,} jobs)")
+        return 0
+
+    store = AnalyticsStore(args.root)
+    for label, method in REPORTS.items():
+        started = time.perf_counter()
+        getattr(store, method)()
+        print(f"{label}: {(time.perf_counter() - started) * 1000:.1f} ms")
+    before = {name: frame.copy() for name, frame in store.aggregates.items()}
+    started = time.perf_counter()
+    store.rebuild()
+    elapsed = time.perf_counter() - started
+    same = all(before[name].equals(store.aggregates[name]) for name in before)
+    print(f"full rebuild from {len(store.parts)} parts: {elapsed:.2f}s, matches incremental: {same}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,6 +2,33 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
 import json
+import os
+import threading
+from collections import OrderedDict
+
+import analytics
+import assignment
+import billing
+from booking_calendar import Booking, BookingCalendar, synthetic_bookings, write_ics
+from catalog import item_id
+from catalog_watcher import CatalogWatcher
+from dedupe import Lead, LeadDeduper, duplicate_groups, synthetic_leads
+from guides import GuideIndex, load_guides
+from ingest import IngestServer
+from jobs import JobManager, JobQueueFull
+from notes_store import NoteStore
+import notify
+from pricing import PricingEngine, QuoteRequest, adjust_rates, quote_email, synthetic_requests
+import lead_scoring
+from recommend import Recommender
+from recurrence import Exceptions, RecurrenceEngine, synthetic_series, us_holidays
+from routing import RoutePlanner, synthetic_day
+from scoring import DEFAULT_WEIGHTS, SORT_OPTIONS, WEIGHT_LABELS, ItemFeatures, SortKeys
+from simulate import simulate_plan
+import templates
+from tool_optimizer import ToolIndex, optimize, tool_cost
+from sync import DEFAULT_PRIORITY, PRIORITY_LEVELS
+from workspaces import DEFAULT_WORKSPACE, WorkspaceManager, priority_counts
 
 # Page configuration
 st.set_page_config(
@@ -87,6 +114,11 @@ st.markdown("""
         transition: transform 0.3s ease;
         border: 1px solid #e9ecef;
     }
+    .metric-grid {
+        display: grid;
+        grid-template-columns: repeat(4, minmax(0, 1fr));
+        gap: 0 15px;
+    }
     .metric-card:hover {
         transform: translateY(-5px);
         box-shadow: 0 12px 24px rgba(0, 0, 0, 0.15);
@@ -111,973 +143,231 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Items per page when the checklist is sorted
+CHECKLIST_PAGE_SIZE = 25
+
 # Initialize session state
 def init_session_state():
     if 'completed_automations' not in st.session_state:
         st.session_state.completed_automations = set()
-    if 'automation_notes' not in st.session_state:
-        st.session_state.automation_notes = {}
     if 'priority_levels' not in st.session_state:
         st.session_state.priority_levels = {}
     if 'implementation_dates' not in st.session_state:
         st.session_state.implementation_dates = {}
     if 'favorite_automations' not in st.session_state:
         st.session_state.favorite_automations = set()
+    if 'job_ids' not in st.session_state:
+        st.session_state.job_ids = []
+    if 'checklist_limit' not in st.session_state:
+        st.session_state.checklist_limit = CHECKLIST_PAGE_SIZE
+
+def reset_checklist_page():
+    st.session_state.checklist_limit = CHECKLIST_PAGE_SIZE
+
+def show_more_items():
+    st.session_state.checklist_limit += CHECKLIST_PAGE_SIZE
 
 init_session_state()
 
-# Define automation data structure
-def get_automation_data():
-    return {
-        "Client Onboarding & Management": {
-            "items": [
-                {
-                    "name": "New client welcome email sequence",
-                    "difficulty": "Easy",
-                    "time_estimate": "2-4 hours",
-                    "cost_estimate": "$0-50",
-                    "roi_potential": "High",
-                    "tools": ["Mailchimp", "ConvertKit", "Zapier"],
-                    "description": "Automated email series to welcome new clients and set expectations"
-                },
-                {
-                    "name": "Auto-send intake form after booking",
-                    "difficulty": "Easy",
-                    "time_estimate": "1-2 hours",
-                    "cost_estimate": "$0-25",
-                    "roi_potential": "High",
-                    "tools": ["Google Forms", "Typeform", "Zapier"],
-                    "description": "Automatically send client intake forms upon booking confirmation"
-                },
-                {
-                    "name": "Automated quote generator",
-                    "difficulty": "Medium",
-                    "time_estimate": "8-12 hours",
-                    "cost_estimate": "$100-300",
-                    "roi_potential": "High",
-                    "tools": ["Custom form", "Zapier", "Google Sheets"],
-                    "description": "Dynamic pricing calculator based on service type, size, and location"
-                },
-                {
-                    "name": "CRM entry upon lead submission",
-                    "difficulty": "Easy",
-                    "time_estimate": "1-3 hours",
-                    "cost_estimate": "$0-50",
-                    "roi_potential": "High",
-                    "tools": ["HubSpot", "Pipedrive", "Zapier"],
-                    "description": "Automatically add new leads to your CRM system"
-                },
-                {
-                    "name": "Auto-reminder to complete service agreement",
-                    "difficulty": "Easy",
-                    "time_estimate": "2-3 hours",
-                    "cost_estimate": "$0-30",
-                    "roi_potential": "Medium",
-                    "tools": ["Email automation", "DocuSign", "Zapier"],
-                    "description": "Send reminders for unsigned service agreements"
-                },
-                {
-                    "name": "Assign client to team based on zip code",
-                    "difficulty": "Medium",
-                    "time_estimate": "4-6 hours",
-                    "cost_estimate": "$50-150",
-                    "roi_potential": "High",
-                    "tools": ["Zapier", "Google Maps API", "CRM"],
-                    "description": "Automatically route clients to appropriate service teams by location"
-                },
-                {
-                    "name": "Birthday or anniversary client greeting email",
-                    "difficulty": "Easy",
-                    "time_estimate": "2-3 hours",
-                    "cost_estimate": "$0-40",
-                    "roi_potential": "Medium",
-                    "tools": ["Mailchimp", "CRM", "Zapier"],
-                    "description": "Personalized birthday and service anniversary messages"
-                },
-                {
-                    "name": "Follow-up email after service with feedback link",
-                    "difficulty": "Easy",
-                    "time_estimate": "1-2 hours",
-                    "cost_estimate": "$0-25",
-                    "roi_potential": "High",
-                    "tools": ["Email automation", "Survey tool", "Zapier"],
-                    "description": "Automatic post-service feedback collection"
-                },
-                {
-                    "name": "Send review request via SMS/email",
-                    "difficulty": "Easy",
-                    "time_estimate": "2-3 hours",
-                    "cost_estimate": "$20-60",
-                    "roi_potential": "High",
-                    "tools": ["Twilio", "Email service", "Review platform"],
-                    "description": "Automated review requests after successful service completion"
-                },
-                {
-                    "name": "Tag clients based on service frequency",
-                    "difficulty": "Medium",
-                    "time_estimate": "3-5 hours",
-                    "cost_estimate": "$0-75",
-                    "roi_potential": "Medium",
-                    "tools": ["CRM", "Zapier", "Analytics tool"],
-                    "description": "Automatically categorize clients by booking patterns"
-                },
-                {
-                    "name": "Auto-schedule recurring appointments",
-                    "difficulty": "Medium",
-                    "time_estimate": "4-8 hours",
-                    "cost_estimate": "$50-150",
-                    "roi_potential": "High",
-                    "tools": ["Scheduling software", "Calendar API", "CRM"],
-                    "description": "Automatically book recurring cleaning appointments"
-                },
-                {
-                    "name": "Client reactivation campaigns after 60+ days",
-                    "difficulty": "Easy",
-                    "time_estimate": "3-5 hours",
-                    "cost_estimate": "$25-75",
-                    "roi_potential": "High",
-                    "tools": ["Email marketing", "CRM", "Automation platform"],
-                    "description": "Win-back campaigns for inactive clients"
-                },
-                {
-                    "name": "Auto-update Google Sheet with new client info",
-                    "difficulty": "Easy",
-                    "time_estimate": "1-3 hours",
-                    "cost_estimate": "$0-25",
-                    "roi_potential": "Medium",
-                    "tools": ["Google Sheets", "Zapier", "Forms"],
-                    "description": "Automatically populate spreadsheets with client data"
-                },
-                {
-                    "name": "Send pre-clean checklist automatically before visit",
-                    "difficulty": "Easy",
-                    "time_estimate": "2-4 hours",
-                    "cost_estimate": "$0-50",
-                    "roi_potential": "Medium",
-                    "tools": ["Email automation", "Scheduling system", "Templates"],
-                    "description": "Automated pre-service preparation instructions"
-                },
-                {
-                    "name": "Move client to VIP tag after 10 services",
-                    "difficulty": "Medium",
-                    "time_estimate": "3-6 hours",
-                    "cost_estimate": "$25-100",
-                    "roi_potential": "Medium",
-                    "tools": ["CRM", "Analytics", "Automation rules"],
-                    "description": "Automatically upgrade loyal customers to VIP status"
-                }
-            ],
-            "icon": "👥",
-            "color": "#2E86AB"
-        },
-        "Booking & Scheduling": {
-            "items": [
-                {
-                    "name": "Online booking form to Google Calendar",
-                    "difficulty": "Easy",
-                    "time_estimate": "2-4 hours",
-                    "cost_estimate": "$0-50",
-                    "roi_potential": "High",
-                    "tools": ["Calendly", "Acuity", "Google Calendar"],
-                    "description": "Seamless integration between booking system and calendar"
-                },
-                {
-                    "name": "Auto-notification to cleaner about new job",
-                    "difficulty": "Easy",
-                    "time_estimate": "1-2 hours",
-                    "cost_estimate": "$10-30",
-                    "roi_potential": "High",
-                    "tools": ["SMS service", "Email", "Slack"],
-                    "description": "Instant notifications to cleaning staff for new bookings"
-                },
-                {
-                    "name": "Rescheduling link auto-included in reminders",
-                    "difficulty": "Easy",
-                    "time_estimate": "2-3 hours",
-                    "cost_estimate": "$0-40",
-                    "roi_potential": "Medium",
-                    "tools": ["Scheduling software", "Email templates", "Calendar"],
-                    "description": "Easy rescheduling options in appointment reminders"
-                },
-                {
-                    "name": "Auto-cancel recurring job if card fails",
-                    "difficulty": "Medium",
-                    "time_estimate": "4-6 hours",
-                    "cost_estimate": "$50-120",
-                    "roi_potential": "High",
-                    "tools": ["Payment processor", "Scheduling system", "Automation"],
-                    "description": "Prevent service delivery for failed payments"
-                },
-                {
-                    "name": "Send ETA texts to clients 1 hour before arrival",
-                    "difficulty": "Medium",
-                    "time_estimate": "4-6 hours",
-                    "cost_estimate": "$30-80",
-                    "roi_potential": "High",
-                    "tools": ["Twilio", "Zapier", "Calendar integration"],
-                    "description": "Automated arrival time notifications to improve customer experience"
-                },
-                {
-                    "name": "Send weekly schedule to team every Monday",
-                    "difficulty": "Easy",
-                    "time_estimate": "2-4 hours",
-                    "cost_estimate": "$10-50",
-                    "roi_potential": "Medium",
-                    "tools": ["Email automation", "Calendar", "Team communication"],
-                    "description": "Weekly schedule distribution to cleaning teams"
-                },
-                {
-                    "name": "Auto-assign cleaners based on zone/availability",
-                    "difficulty": "Hard",
-                    "time_estimate": "12-20 hours",
-                    "cost_estimate": "$200-500",
-                    "roi_potential": "High",
-                    "tools": ["Custom logic", "Google Maps API", "Scheduling software"],
-                    "description": "Intelligent assignment system based on location and availability"
-                },
-                {
-                    "name": "Buffer time automation between bookings",
-                    "difficulty": "Medium",
-                    "time_estimate": "3-6 hours",
-                    "cost_estimate": "$25-100",
-                    "roi_potential": "Medium",
-                    "tools": ["Scheduling software", "Calendar rules", "Automation"],
-                    "description": "Automatic travel time between appointments"
-                },
-                {
-                    "name": "Auto-block days off from calendar",
-                    "difficulty": "Easy",
-                    "time_estimate": "1-3 hours",
-                    "cost_estimate": "$0-30",
-                    "roi_potential": "Medium",
-                    "tools": ["Calendar integration", "HR system", "Scheduling"],
-                    "description": "Prevent bookings on staff vacation days"
-                },
-                {
-                    "name": "Cleaning crew shift reminder SMS",
-                    "difficulty": "Easy",
-                    "time_estimate": "2-4 hours",
-                    "cost_estimate": "$15-50",
-                    "roi_potential": "Medium",
-                    "tools": ["SMS service", "Scheduling system", "Automation"],
-                    "description": "Shift reminders sent to cleaning staff"
-                },
-                {
-                    "name": "Day-before job confirmation SMS/email",
-                    "difficulty": "Easy",
-                    "time_estimate": "2-3 hours",
-                    "cost_estimate": "$10-40",
-                    "roi_potential": "High",
-                    "tools": ["Communication platform", "Scheduling", "Templates"],
-                    "description": "Appointment confirmations sent day before service"
-                },
-                {
-                    "name": "Auto-reschedule on public holidays",
-                    "difficulty": "Medium",
-                    "time_estimate": "4-8 hours",
-                    "cost_estimate": "$50-150",
-                    "roi_potential": "Medium",
-                    "tools": ["Calendar API", "Holiday database", "Scheduling"],
-                    "description": "Automatic holiday scheduling adjustments"
-                },
-                {
-                    "name": "Weather alert integration for outdoor jobs",
-                    "difficulty": "Medium",
-                    "time_estimate": "3-5 hours",
-                    "cost_estimate": "$25-75",
-                    "roi_potential": "Medium",
-                    "tools": ["Weather API", "Zapier", "SMS service"],
-                    "description": "Automatic weather-based scheduling adjustments"
-                },
-                {
-                    "name": "Double-booking prevention alert",
-                    "difficulty": "Easy",
-                    "time_estimate": "2-4 hours",
-                    "cost_estimate": "$0-50",
-                    "roi_potential": "High",
-                    "tools": ["Scheduling software", "Calendar validation", "Alerts"],
-                    "description": "Prevent scheduling conflicts automatically"
-                },
-                {
-                    "name": "Missed booking alert and recovery automation",
-                    "difficulty": "Medium",
-                    "time_estimate": "4-7 hours",
-                    "cost_estimate": "$50-120",
-                    "roi_potential": "High",
-                    "tools": ["Tracking system", "Communication platform", "CRM"],
-                    "description": "Automatic follow-up for missed appointments"
-                }
-            ],
-            "icon": "📅",
-            "color": "#A23B72"
-        },
-        "Payments & Invoicing": {
-            "items": [
-                {
-                    "name": "Auto-generate invoice after job completion",
-                    "difficulty": "Medium",
-                    "time_estimate": "6-10 hours",
-                    "cost_estimate": "$100-250",
-                    "roi_potential": "High",
-                    "tools": ["QuickBooks", "FreshBooks", "Stripe"],
-                    "description": "Automatic invoice creation upon service completion"
-                },
-                {
-                    "name": "Stripe payment failed send retry link",
-                    "difficulty": "Medium",
-                    "time_estimate": "3-5 hours",
-                    "cost_estimate": "$50-100",
-                    "roi_potential": "High",
-                    "tools": ["Stripe", "Email automation", "Zapier"],
-                    "description": "Automated payment retry system for failed transactions"
-                },
-                {
-                    "name": "Send invoice reminders every 3 days (max 3x)",
-                    "difficulty": "Easy",
-                    "time_estimate": "2-4 hours",
-                    "cost_estimate": "$20-60",
-                    "roi_potential": "High",
-                    "tools": ["Email automation", "Invoice system", "Scheduling"],
-                    "description": "Automated payment reminder sequence"
-                },
-                {
-                    "name": "Auto-charge recurring cleaning clients",
-                    "difficulty": "Medium",
-                    "time_estimate": "4-8 hours",
-                    "cost_estimate": "$75-200",
-                    "roi_potential": "High",
-                    "tools": ["Stripe", "PayPal", "Recurring billing"],
-                    "description": "Automated billing for regular cleaning services"
-                },
-                {
-                    "name": "Send thank you receipt after payment",
-                    "difficulty": "Easy",
-                    "time_estimate": "1-2 hours",
-                    "cost_estimate": "$0-25",
-                    "roi_potential": "Medium",
-                    "tools": ["Email automation", "Payment processor", "Templates"],
-                    "description": "Automated payment confirmation emails"
-                },
-                {
-                    "name": "Sync payments with QuickBooks/Xero",
-                    "difficulty": "Medium",
-                    "time_estimate": "4-8 hours",
-                    "cost_estimate": "$100-250",
-                    "roi_potential": "High",
-                    "tools": ["QuickBooks", "Xero", "API integration"],
-                    "description": "Automatic accounting software synchronization"
-                },
-                {
-                    "name": "Auto-calculate travel surcharges",
-                    "difficulty": "Medium",
-                    "time_estimate": "5-10 hours",
-                    "cost_estimate": "$75-200",
-                    "roi_potential": "Medium",
-                    "tools": ["Google Maps API", "Pricing calculator", "Booking system"],
-                    "description": "Distance-based automatic surcharge calculation"
-                },
-                {
-                    "name": "First-time discount automatically applied",
-                    "difficulty": "Easy",
-                    "time_estimate": "2-3 hours",
-                    "cost_estimate": "$0-50",
-                    "roi_potential": "High",
-                    "tools": ["Booking system", "Coupon codes", "CRM"],
-                    "description": "Automatic new customer discount application"
-                },
-                {
-                    "name": "Add upsells (fridge, oven) in invoice builder",
-                    "difficulty": "Medium",
-                    "time_estimate": "4-8 hours",
-                    "cost_estimate": "$50-150",
-                    "roi_potential": "High",
-                    "tools": ["Invoice system", "Service catalog", "Automation"],
-                    "description": "Automatic upsell suggestions in invoices"
-                },
-                {
-                    "name": "Auto-tag high-ticket clients in CRM",
-                    "difficulty": "Easy",
-                    "time_estimate": "2-4 hours",
-                    "cost_estimate": "$0-50",
-                    "roi_potential": "Medium",
-                    "tools": ["CRM", "Analytics", "Automation rules"],
-                    "description": "Automatically identify and tag valuable customers"
-                },
-                {
-                    "name": "Auto-apply coupon code from referral system",
-                    "difficulty": "Medium",
-                    "time_estimate": "3-6 hours",
-                    "cost_estimate": "$50-120",
-                    "roi_potential": "High",
-                    "tools": ["Referral software", "Booking system", "Coupon management"],
-                    "description": "Automatic referral discount application"
-                },
-                {
-                    "name": "Estimate calculator form with automatic email follow-up",
-                    "difficulty": "Medium",
-                    "time_estimate": "6-12 hours",
-                    "cost_estimate": "$100-300",
-                    "roi_potential": "High",
-                    "tools": ["Form builder", "Email automation", "Calculator"],
-                    "description": "Interactive quote calculator with follow-up sequence"
-                },
-                {
-                    "name": "Notify admin when client exceeds late payment threshold",
-                    "difficulty": "Easy",
-                    "time_estimate": "2-4 hours",
-                    "cost_estimate": "$10-50",
-                    "roi_potential": "Medium",
-                    "tools": ["Alert system", "Payment tracking", "Email/SMS"],
-                    "description": "Automatic alerts for overdue payments"
-                },
-                {
-                    "name": "Auto-suspend services until payment is received",
-                    "difficulty": "Medium",
-                    "time_estimate": "4-8 hours",
-                    "cost_estimate": "$75-200",
-                    "roi_potential": "High",
-                    "tools": ["Payment system", "Scheduling software", "Automation"],
-                    "description": "Automatic service suspension for non-payment"
-                },
-                {
-                    "name": "Payment data dashboard updates daily",
-                    "difficulty": "Medium",
-                    "time_estimate": "6-12 hours",
-                    "cost_estimate": "$150-400",
-                    "roi_potential": "Medium",
-                    "tools": ["Dashboard tool", "Payment API", "Analytics"],
-                    "description": "Automated financial reporting dashboard"
-                }
-            ],
-            "icon": "💰",
-            "color": "#F18F01"
-        },
-        "Team Management & Operations": {
-            "items": [
-                {
-                    "name": "Send daily job route to each cleaner",
-                    "difficulty": "Medium",
-                    "time_estimate": "5-8 hours",
-                    "cost_estimate": "$100-200",
-                    "roi_potential": "High",
-                    "tools": ["Google Maps", "SMS service", "Route optimization"],
-                    "description": "Optimized daily routes sent to cleaning teams"
-                },
-                {
-                    "name": "Auto clock-in/out system via geolocation",
-                    "difficulty": "Hard",
-                    "time_estimate": "15-25 hours",
-                    "cost_estimate": "$300-600",
-                    "roi_potential": "High",
-                    "tools": ["Mobile app", "GPS tracking", "Time tracking"],
-                    "description": "Location-based automatic time tracking for staff"
-                },
-                {
-                    "name": "Slack/WhatsApp message if staff doesn't check-in",
-                    "difficulty": "Easy",
-                    "time_estimate": "2-4 hours",
-                    "cost_estimate": "$10-50",
-                    "roi_potential": "Medium",
-                    "tools": ["Slack", "WhatsApp API", "Monitoring system"],
-                    "description": "Automatic alerts for missing staff check-ins"
-                },
-                {
-                    "name": "Team KPI tracker update every week",
-                    "difficulty": "Medium",
-                    "time_estimate": "6-12 hours",
-                    "cost_estimate": "$100-300",
-                    "roi_potential": "Medium",
-                    "tools": ["Analytics platform", "Dashboard", "Automation"],
-                    "description": "Weekly performance metrics compilation"
-                },
-                {
-                    "name": "Auto-assign team leads per route",
-                    "difficulty": "Medium",
-                    "time_estimate": "4-8 hours",
-                    "cost_estimate": "$75-200",
-                    "roi_potential": "Medium",
-                    "tools": ["Scheduling system", "Team management", "Logic rules"],
-                    "description": "Automatic team leader assignment for routes"
-                },
-                {
-                    "name": "Weekly timesheet auto-submission reminder",
-                    "difficulty": "Easy",
-                    "time_estimate": "1-3 hours",
-                    "cost_estimate": "$10-40",
-                    "roi_potential": "Medium",
-                    "tools": ["Email automation", "Timesheet system", "Scheduling"],
-                    "description": "Automated timesheet submission reminders"
-                },
-                {
-                    "name": "Auto-upload photos of completed jobs to shared drive",
-                    "difficulty": "Medium",
-                    "time_estimate": "4-8 hours",
-                    "cost_estimate": "$50-150",
-                    "roi_potential": "Medium",
-                    "tools": ["Cloud storage", "Mobile app", "API integration"],
-                    "description": "Automatic job completion photo management"
-                },
-                {
-                    "name": "Cleaning checklist completion tracking",
-                    "difficulty": "Medium",
-                    "time_estimate": "6-10 hours",
-                    "cost_estimate": "$100-250",
-                    "roi_potential": "High",
-                    "tools": ["Mobile app", "Database", "Analytics"],
-                    "description": "Digital checklist tracking and compliance monitoring"
-                },
-                {
-                    "name": "Job satisfaction survey from cleaner",
-                    "difficulty": "Easy",
-                    "time_estimate": "2-4 hours",
-                    "cost_estimate": "$20-60",
-                    "roi_potential": "Medium",
-                    "tools": ["Survey tool", "Email automation", "Analytics"],
-                    "description": "Post-job satisfaction surveys for cleaning staff"
-                },
-                {
-                    "name": "Auto-flag negative reviews for manager review",
-                    "difficulty": "Medium",
-                    "time_estimate": "3-6 hours",
-                    "cost_estimate": "$50-120",
-                    "roi_potential": "High",
-                    "tools": ["Review monitoring", "Alert system", "Management dashboard"],
-                    "description": "Automatic negative review detection and escalation"
-                },
-                {
-                    "name": "Equipment maintenance reminder every 30 uses",
-                    "difficulty": "Medium",
-                    "time_estimate": "4-6 hours",
-                    "cost_estimate": "$50-120",
-                    "roi_potential": "Medium",
-                    "tools": ["Usage tracking", "Email automation", "Calendar"],
-                    "description": "Preventive maintenance scheduling for cleaning equipment"
-                },
-                {
-                    "name": "Cleaner performance review every 90 days",
-                    "difficulty": "Medium",
-                    "time_estimate": "6-12 hours",
-                    "cost_estimate": "$100-300",
-                    "roi_potential": "Medium",
-                    "tools": ["HR system", "Performance tracking", "Automation"],
-                    "description": "Automated quarterly performance review scheduling"
-                },
-                {
-                    "name": "Auto-email when supplies drop below stock level",
-                    "difficulty": "Easy",
-                    "time_estimate": "2-4 hours",
-                    "cost_estimate": "$20-60",
-                    "roi_potential": "High",
-                    "tools": ["Inventory system", "Email automation", "Alerts"],
-                    "description": "Automatic low inventory notifications"
-                },
-                {
-                    "name": "Geofence tracking for mobile crews",
-                    "difficulty": "Hard",
-                    "time_estimate": "12-20 hours",
-                    "cost_estimate": "$200-500",
-                    "roi_potential": "High",
-                    "tools": ["GPS tracking", "Mobile app", "Geofencing API"],
-                    "description": "Location-based crew tracking and alerts"
-                },
-                {
-                    "name": "Send client notes to cleaner before job",
-                    "difficulty": "Easy",
-                    "time_estimate": "2-4 hours",
-                    "cost_estimate": "$10-50",
-                    "roi_potential": "High",
-                    "tools": ["CRM", "Communication platform", "Scheduling"],
-                    "description": "Automatic client preference sharing with cleaning staff"
-                },
-                {
-                    "name": "Employee reward points system tracker",
-                    "difficulty": "Medium",
-                    "time_estimate": "8-15 hours",
-                    "cost_estimate": "$150-400",
-                    "roi_potential": "Medium",
-                    "tools": ["Rewards platform", "Performance tracking", "Database"],
-                    "description": "Gamified employee performance tracking system"
-                },
-                {
-                    "name": "Trigger onboarding for new hires",
-                    "difficulty": "Easy",
-                    "time_estimate": "3-6 hours",
-                    "cost_estimate": "$25-100",
-                    "roi_potential": "Medium",
-                    "tools": ["HR system", "Email automation", "Document management"],
-                    "description": "Automated new employee onboarding process"
-                },
-                {
-                    "name": "Certification or training renewal reminders",
-                    "difficulty": "Easy",
-                    "time_estimate": "2-4 hours",
-                    "cost_estimate": "$15-50",
-                    "roi_potential": "Medium",
-                    "tools": ["Calendar system", "Email automation", "Training tracker"],
-                    "description": "Automatic certification expiry reminders"
-                },
-                {
-                    "name": "Auto-send route changes via SMS",
-                    "difficulty": "Easy",
-                    "time_estimate": "2-4 hours",
-                    "cost_estimate": "$15-50",
-                    "roi_potential": "High",
-                    "tools": ["SMS service", "Route planning", "Change detection"],
-                    "description": "Instant route change notifications to cleaning teams"
-                },
-                {
-                    "name": "Auto-log hours into payroll system",
-                    "difficulty": "Medium",
-                    "time_estimate": "6-12 hours",
-                    "cost_estimate": "$100-300",
-                    "roi_potential": "High",
-                    "tools": ["Payroll software", "Time tracking", "API integration"],
-                    "description": "Automatic timesheet to payroll integration"
-                }
-            ],
-            "icon": "👷",
-            "color": "#C73E1D"
-        },
-        "Marketing & Sales": {
-            "items": [
-                {
-                    "name": "Abandoned quote follow-up email",
-                    "difficulty": "Easy",
-                    "time_estimate": "2-4 hours",
-                    "cost_estimate": "$0-50",
-                    "roi_potential": "High",
-                    "tools": ["Email automation", "CRM", "Zapier"],
-                    "description": "Re-engage prospects who didn't complete their quote"
-                },
-                {
-                    "name": "Lead magnet download 5-day nurture sequence",
-                    "difficulty": "Medium",
-                    "time_estimate": "8-12 hours",
-                    "cost_estimate": "$50-150",
-                    "roi_potential": "High",
-                    "tools": ["Email marketing", "Landing page", "Content"],
-                    "description": "Educational email series for lead nurturing"
-                },
-                {
-                    "name": "Auto-tag lead source (Facebook, Google, etc.)",
-                    "difficulty": "Easy",
-                    "time_estimate": "2-4 hours",
-                    "cost_estimate": "$0-50",
-                    "roi_potential": "Medium",
-                    "tools": ["CRM", "UTM tracking", "Analytics"],
-                    "description": "Automatic lead source identification and tagging"
-                },
-                {
-                    "name": "Google Review + Yelp review link SMS",
-                    "difficulty": "Easy",
-                    "time_estimate": "2-3 hours",
-                    "cost_estimate": "$20-60",
-                    "roi_potential": "High",
-                    "tools": ["SMS service", "Review platforms", "Automation"],
-                    "description": "Automated review request messages"
-                },
-                {
-                    "name": "Win-back emails for old customers",
-                    "difficulty": "Easy",
-                    "time_estimate": "3-5 hours",
-                    "cost_estimate": "$25-75",
-                    "roi_potential": "High",
-                    "tools": ["Email marketing", "CRM", "Segmentation"],
-                    "description": "Re-engagement campaigns for inactive customers"
-                },
-                {
-                    "name": "Auto-post testimonials to website",
-                    "difficulty": "Medium",
-                    "time_estimate": "6-10 hours",
-                    "cost_estimate": "$100-250",
-                    "roi_potential": "Medium",
-                    "tools": ["Website CMS", "Review platforms", "API"],
-                    "description": "Automatic testimonial publishing from review platforms"
-                },
-                {
-                    "name": "Send referral program invite after 3 jobs",
-                    "difficulty": "Easy",
-                    "time_estimate": "3-5 hours",
-                    "cost_estimate": "$25-75",
-                    "roi_potential": "High",
-                    "tools": ["Email automation", "Referral software", "CRM"],
-                    "description": "Automated referral program enrollment for loyal customers"
-                },
-                {
-                    "name": "Weekly email newsletter automation",
-                    "difficulty": "Medium",
-                    "time_estimate": "4-8 hours",
-                    "cost_estimate": "$50-150",
-                    "roi_potential": "Medium",
-                    "tools": ["Email marketing", "Content management", "Scheduling"],
-                    "description": "Automated weekly newsletter with tips and updates"
-                },
-                {
-                    "name": "Reactivate cold leads with discount offer",
-                    "difficulty": "Easy",
-                    "time_estimate": "3-6 hours",
-                    "cost_estimate": "$25-100",
-                    "roi_potential": "High",
-                    "tools": ["Email automation", "CRM", "Discount system"],
-                    "description": "Special offers to re-engage cold prospects"
-                },
-                {
-                    "name": "Instagram post scheduling",
-                    "difficulty": "Easy",
-                    "time_estimate": "2-4 hours",
-                    "cost_estimate": "$10-50",
-                    "roi_potential": "Medium",
-                    "tools": ["Social media scheduler", "Content calendar", "Instagram API"],
-                    "description": "Automated social media content posting"
-                },
-                {
-                    "name": "Auto-detect and email duplicate leads",
-                    "difficulty": "Medium",
-                    "time_estimate": "4-8 hours",
-                    "cost_estimate": "$50-150",
-                    "roi_potential": "Medium",
-                    "tools": ["CRM", "Duplicate detection", "Email automation"],
-                    "description": "Prevent duplicate lead processing and follow-up"
-                },
-                {
-                    "name": "Trigger a call task for high-interest leads",
-                    "difficulty": "Easy",
-                    "time_estimate": "2-4 hours",
-                    "cost_estimate": "$20-60",
-                    "roi_potential": "High",
-                    "tools": ["CRM", "Lead scoring", "Task automation"],
-                    "description": "Automatic call scheduling for qualified leads"
-                },
-                {
-                    "name": "Send seasonal promo campaigns (e.g., spring cleaning)",
-                    "difficulty": "Easy",
-                    "time_estimate": "3-6 hours",
-                    "cost_estimate": "$25-100",
-                    "roi_potential": "High",
-                    "tools": ["Email marketing", "Calendar automation", "Promotions"],
-                    "description": "Seasonal marketing campaign automation"
-                },
-                {
-                    "name": "Add new leads from Facebook Ads to CRM",
-                    "difficulty": "Easy",
-                    "time_estimate": "2-4 hours",
-                    "cost_estimate": "$0-50",
-                    "roi_potential": "High",
-                    "tools": ["Facebook Ads", "CRM", "Zapier"],
-                    "description": "Automatic lead capture from Facebook advertising"
-                },
-                {
-                    "name": "Auto-score leads based on form inputs",
-                    "difficulty": "Medium",
-                    "time_estimate": "4-8 hours",
-                    "cost_estimate": "$50-150",
-                    "roi_potential": "High",
-                    "tools": ["CRM", "Lead scoring", "Form analysis"],
-                    "description": "Automatic lead qualification and prioritization"
-                }
-            ],
-            "icon": "📈",
-            "color": "#6A994E"
-        },
-        "Customer Communication": {
-            "items": [
-                {
-                    "name": "Two-way SMS integration for support",
-                    "difficulty": "Medium",
-                    "time_estimate": "6-10 hours",
-                    "cost_estimate": "$100-250",
-                    "roi_potential": "High",
-                    "tools": ["Twilio", "SMS platform", "Help desk"],
-                    "description": "Bidirectional SMS communication system"
-                },
-                {
-                    "name": "Auto-respond to website chat inquiries",
-                    "difficulty": "Medium",
-                    "time_estimate": "4-8 hours",
-                    "cost_estimate": "$50-150",
-                    "roi_potential": "Medium",
-                    "tools": ["Chatbot", "Live chat", "AI responses"],
-                    "description": "Automated initial responses to website visitors"
-                },
-                {
-                    "name": "Missed call auto-text How can we help",
-                    "difficulty": "Easy",
-                    "time_estimate": "2-4 hours",
-                    "cost_estimate": "$20-60",
-                    "roi_potential": "High",
-                    "tools": ["Phone system", "SMS service", "Call tracking"],
-                    "description": "Automatic follow-up for missed phone calls"
-                },
-                {
-                    "name": "Job status updates via SMS (In Progress, Completed)",
-                    "difficulty": "Easy",
-                    "time_estimate": "2-4 hours",
-                    "cost_estimate": "$20-60",
-                    "roi_potential": "High",
-                    "tools": ["SMS service", "Job tracking", "Zapier"],
-                    "description": "Real-time job progress updates to customers"
-                },
-                {
-                    "name": "Auto-email of cleaner profile before visit",
-                    "difficulty": "Easy",
-                    "time_estimate": "2-4 hours",
-                    "cost_estimate": "$10-50",
-                    "roi_potential": "Medium",
-                    "tools": ["Email automation", "Staff database", "Scheduling"],
-                    "description": "Pre-service cleaner introduction emails"
-                },
-                {
-                    "name": "Send delay notifications via SMS",
-                    "difficulty": "Easy",
-                    "time_estimate": "2-3 hours",
-                    "cost_estimate": "$15-50",
-                    "roi_potential": "High",
-                    "tools": ["SMS service", "Scheduling system", "Alerts"],
-                    "description": "Automatic delay notifications to customers"
-                },
-                {
-                    "name": "Auto-notify customer when cleaner is nearby",
-                    "difficulty": "Medium",
-                    "time_estimate": "4-8 hours",
-                    "cost_estimate": "$50-150",
-                    "roi_potential": "High",
-                    "tools": ["GPS tracking", "SMS service", "Geofencing"],
-                    "description": "Location-based arrival notifications"
-                },
-                {
-                    "name": "Service reminder emails (weekly, biweekly, etc.)",
-                    "difficulty": "Easy",
-                    "time_estimate": "2-4 hours",
-                    "cost_estimate": "$10-50",
-                    "roi_potential": "High",
-                    "tools": ["Email automation", "Scheduling", "CRM"],
-                    "description": "Recurring service booking reminders"
-                },
-                {
-                    "name": "You are next job notification for clients",
-                    "difficulty": "Easy",
-                    "time_estimate": "2-4 hours",
-                    "cost_estimate": "$15-50",
-                    "roi_potential": "Medium",
-                    "tools": ["SMS/Email service", "Queue management", "Scheduling"],
-                    "description": "Queue position updates for customers"
-                },
-                {
-                    "name": "Set auto-replies for off-hours contact",
-                    "difficulty": "Easy",
-                    "time_estimate": "1-2 hours",
-                    "cost_estimate": "$0-25",
-                    "roi_potential": "Medium",
-                    "tools": ["Email automation", "Phone system", "Chat platform"],
-                    "description": "Automated after-hours response messages"
-                }
-            ],
-            "icon": "💬",
-            "color": "#7209B7"
-        },
-        "Reporting & Analytics": {
-            "items": [
-                {
-                    "name": "Weekly revenue report emailed to owner",
-                    "difficulty": "Easy",
-                    "time_estimate": "2-4 hours",
-                    "cost_estimate": "$0-50",
-                    "roi_potential": "Medium",
-                    "tools": ["Analytics tool", "Email automation", "Dashboard"],
-                    "description": "Automated financial performance reports"
-                },
-                {
-                    "name": "Auto-generate monthly KPI dashboard",
-                    "difficulty": "Medium",
-                    "time_estimate": "8-15 hours",
-                    "cost_estimate": "$150-400",
-                    "roi_potential": "High",
-                    "tools": ["BI tool", "Data visualization", "Analytics"],
-                    "description": "Comprehensive business performance dashboard"
-                },
-                {
-                    "name": "New client acquisition report",
-                    "difficulty": "Easy",
-                    "time_estimate": "3-6 hours",
-                    "cost_estimate": "$25-100",
-                    "roi_potential": "Medium",
-                    "tools": ["CRM", "Analytics", "Reporting tool"],
-                    "description": "Monthly new customer acquisition analysis"
-                },
-                {
-                    "name": "Cleaner performance heatmap",
-                    "difficulty": "Medium",
-                    "time_estimate": "6-12 hours",
-                    "cost_estimate": "$100-300",
-                    "roi_potential": "Medium",
-                    "tools": ["Analytics platform", "Performance data", "Visualization"],
-                    "description": "Visual performance tracking for cleaning staff"
-                },
-                {
-                    "name": "Missed job or reschedule frequency report",
-                    "difficulty": "Easy",
-                    "time_estimate": "3-5 hours",
-                    "cost_estimate": "$25-75",
-                    "roi_potential": "Medium",
-                    "tools": ["Scheduling system", "Analytics", "Reporting"],
-                    "description": "Analysis of scheduling disruptions and patterns"
-                },
-                {
-                    "name": "Auto-track ad spend vs. bookings",
-                    "difficulty": "Medium",
-                    "time_estimate": "6-10 hours",
-                    "cost_estimate": "$100-250",
-                    "roi_potential": "High",
-                    "tools": ["Ad platforms", "Analytics", "ROI tracking"],
-                    "description": "Marketing ROI analysis and optimization"
-                },
-                {
-                    "name": "Most-requested services chart",
-                    "difficulty": "Easy",
-                    "time_estimate": "2-4 hours",
-                    "cost_estimate": "$20-60",
-                    "roi_potential": "Medium",
-                    "tools": ["Service tracking", "Analytics", "Visualization"],
-                    "description": "Popular service analysis for business planning"
-                },
-                {
-                    "name": "Net Promoter Score (NPS) tracking",
-                    "difficulty": "Medium",
-                    "time_estimate": "4-8 hours",
-                    "cost_estimate": "$50-150",
-                    "roi_potential": "Medium",
-                    "tools": ["Survey tool", "Analytics", "NPS calculator"],
-                    "description": "Customer satisfaction and loyalty measurement"
-                },
-                {
-                    "name": "Client lifetime value calculator",
-                    "difficulty": "Hard",
-                    "time_estimate": "10-20 hours",
-                    "cost_estimate": "$200-500",
-                    "roi_potential": "High",
-                    "tools": ["Analytics platform", "Custom calculations", "CRM"],
-                    "description": "Automated CLV tracking and analysis"
-                },
-                {
-                    "name": "Export all data monthly to cloud drive",
-                    "difficulty": "Easy",
-                    "time_estimate": "2-4 hours",
-                    "cost_estimate": "$10-50",
-                    "roi_potential": "Low",
-                    "tools": ["Cloud storage", "Data export", "Automation"],
-                    "description": "Automated data backup and archiving"
-                }
-            ],
-            "icon": "📊",
-            "color": "#FF6B35"
-        }
-    }
+# Catalog (hot-reloaded from catalog.json) and workspaces (one per location),
+# shared by every session of this server
+@st.cache_resource
+def get_workspace_manager():
+    return WorkspaceManager(catalog_source=CatalogWatcher().start())
+
+workspace_manager = get_workspace_manager()
+
+# Background jobs (exports and other slow work), shared by all sessions
+@st.cache_resource
+def get_job_manager():
+    return JobManager()
+
+job_manager = get_job_manager()
+
+def build_export_csv(job, categories, completed, favorites, priorities, notes_path):
+    """Background job: the progress report as CSV text."""
+    # Own connection: the workspace's store is closed if it is evicted while this runs
+    notes_store = NoteStore(notes_path)
+    try:
+        notes = notes_store.all()
+    finally:
+        notes_store.close()
+    export_data = []
+    for done, (category, cat_data) in enumerate(categories.items()):
+        job.check_cancelled()
+        job.report(done / len(categories), f"Exporting {category}")
+        for item in cat_data["items"]:
+            export_data.append({
+                "Category": category,
+                "Automation": item["name"],
+                "Status": "✅ Completed" if item["name"] in completed else "⏳ Pending",
+                "Priority": priorities.get(item["name"], DEFAULT_PRIORITY),
+                "Difficulty": item.get("difficulty", "Medium"),
+                "Time_Estimate": item.get("time_estimate", "Unknown"),
+                "Cost_Estimate": item.get("cost_estimate", "Unknown"),
+                "ROI_Potential": item.get("roi_potential", "Medium"),
+                "Tools": ", ".join(item.get("tools", [])),
+                "Notes": notes.get(item["name"], ""),
+                "Favorite": "Yes" if item["name"] in favorites else "No",
+                "Export_Date": datetime.now().strftime("%Y-%m-%d %H:%M")
+            })
+    
+    df = pd.DataFrame(export_data)
+    return df.to_csv(index=False)
+
+# Sample data for the built-in engines is built by background jobs, shared by every session
+# like st.cache_resource; sections show a placeholder until their build is done
+SAMPLE_BUILDS_KEPT = 32
+
+@st.cache_resource
+def get_sample_builds():
+    return OrderedDict(), threading.Lock()
+
+sample_builds_waiting = []
+
+def sample_build(label, builder, *args):
+    """``builder(job, *args)`` as run by a background job, or ``None`` while it is still building."""
+    builds, lock = get_sample_builds()
+    key = (builder.__name__,) + args
+    with lock:
+        job = builds.get(key)
+        if job is None or job.status == "cancelled":
+            try:
+                job = job_manager.submit("sample-data", label, builder, *args)
+            except JobQueueFull:
+                st.info(f"⏳ {label}: waiting for a free background worker...")
+                sample_builds_waiting.append(None)
+                return None
+            builds[key] = job
+            builds.move_to_end(key)
+            for stale in [k for k, other in builds.items() if not other.active][:max(len(builds) - SAMPLE_BUILDS_KEPT, 0)]:
+                del builds[stale]
+    if job.status == "done":
+        return job.result
+    if job.status == "failed":
+        st.error(f"{label} failed: {job.error}")
+        if st.button("🔄 Retry", key=f"retry_{'_'.join(map(str, key))}"):
+            with lock:
+                builds.pop(key, None)
+            st.rerun()
+        return None
+    st.progress(job.progress, text=f"⏳ {label}: {job.message or 'building'}...")
+    sample_builds_waiting.append(job)
+    return None
+
+# Optional webhook endpoint for completion events from Zapier, Make.com, etc.
+@st.cache_resource
+def get_ingest_server(port):
+    return IngestServer(workspace_manager, port=port).start_in_thread()
+
+ingest_port = os.environ.get("AUTOMATION_HUB_INGEST_PORT")
+ingest_server = get_ingest_server(int(ingest_port)) if ingest_port else None
+
+with st.sidebar:
+    st.header("🏢 Workspace")
+    workspace_names = workspace_manager.list_names()
+    current_workspace = st.session_state.pop("pending_workspace", st.session_state.get("workspace", DEFAULT_WORKSPACE))
+    workspace_name = st.selectbox(
+        "Location:",
+        workspace_names,
+        index=workspace_names.index(current_workspace) if current_workspace in workspace_names else 0
+    )
+    if ingest_server:
+        st.caption(f"🔌 Webhooks: `POST http://{ingest_server.host}:{ingest_server.port}/events`")
+    with st.expander("➕ New workspace"):
+        new_workspace = st.text_input("Name:", placeholder="e.g. downtown-franchise")
+        if st.button("Create", use_container_width=True) and new_workspace:
+            try:
+                st.session_state.pending_workspace = workspace_manager.create(new_workspace).name
+                st.rerun()
+            except ValueError as e:
+                st.error(str(e))
+
+workspace = workspace_manager.get(workspace_name)
+if st.session_state.get("workspace") != workspace.name:
+    workspace.load_into(st.session_state)
+workspace_manager.evict_idle()
+
+WIDGET_FIELDS = {"completed": "check", "favorite": "fav", "priority": "priority", "note": "note"}
+
+def widget_key(kind, name):
+    return f"{kind}_{workspace.name}_{item_id(name)}"
+
+def reset_widgets(changes):
+    """Drop widget state so widgets re-read the synced values (``None`` = all)."""
+    if changes is None:
+        prefixes = tuple(f"{kind}_{workspace.name}_" for kind in WIDGET_FIELDS.values())
+        for key in [key for key in st.session_state if str(key).startswith(prefixes)]:
+            del st.session_state[key]
+        return
+    for field, name in changes:
+        st.session_state.pop(widget_key(WIDGET_FIELDS[field], name), None)
+
+# Pull edits made by other sessions; only the changed items' widgets are reset
+if "stale_widgets" in st.session_state:
+    reset_widgets(st.session_state.pop("stale_widgets"))
+reset_widgets(workspace.pull_into(st.session_state))
 
-# Get the data
-categories = get_automation_data()
+# Streamlit cannot push to a session from another thread, so the fragment
+# compares one version number and reruns only when another session changed something
+@st.fragment(run_every="3s")
+def watch_workspace():
+    if workspace.hub.version != st.session_state.sync_version:
+        st.rerun()
+
+watch_workspace()
+pending_changes = []
+
+def save_note(name, key):
+    """Write an edited note back to the workspace's note store."""
+    note_workspace = workspace_manager.get(st.session_state.workspace)
+    text = st.session_state[key]
+    synced_changes = note_workspace.push(st.session_state, [("note", name, text)])
+    st.session_state.stale_widgets = None if synced_changes is None else [
+        change for change in synced_changes if change != ("note", name)
+    ]
+    if note_workspace.notes.get(name) != text:
+        # Merged with someone else's edit: reopen the editor on the merged text
+        del st.session_state[key]
+
+# Get the data; one snapshot per run so a catalog reload never shows up mid-page
+catalog_snapshot = workspace.snapshot
+categories = catalog_snapshot.categories
+catalog_index = catalog_snapshot.index
+
+# Similarity neighbor table, built once per workspace catalog version
+@st.cache_resource(max_entries=128)
+def get_recommender(workspace_name, catalog_version, _categories):
+    return Recommender(_categories)
+
+recommender = get_recommender(workspace.name, catalog_snapshot.version, categories)
+
+@st.cache_resource(max_entries=128)
+def get_item_badges(workspace_name, catalog_version, _categories):
+    return templates.build_badges(_categories)
+
+item_badges = get_item_badges(workspace.name, catalog_snapshot.version, categories)
+
+@st.cache_resource(max_entries=128)
+def get_tool_index(workspace_name, catalog_version, _categories):
+    return ToolIndex(_categories)
+
+tool_index = get_tool_index(workspace.name, catalog_snapshot.version, categories)
+
+@st.cache_resource(max_entries=128)
+def get_item_features(workspace_name, catalog_version, _categories):
+    return ItemFeatures(_categories)
+
+item_features = get_item_features(workspace.name, catalog_snapshot.version, categories)
+
+@st.cache_resource
+def get_guide_index():
+    return GuideIndex(load_guides())
+
+guide_index = get_guide_index()
 
 # Calculate total automations
-total_automations = sum(len(cat_data["items"]) for cat_data in categories.values())
+total_automations = catalog_index.total
 
 # Main header
 st.markdown('<h1 class="main-header">🧼 Ultimate Cleaning Business Automation Hub</h1>', unsafe_allow_html=True)
@@ -1095,7 +385,7 @@ with col2:
 with col3:
     st.metric("Categories", len(categories), delta="Comprehensive")
 with col4:
-    high_roi_count = sum(1 for cat_data in categories.values() for item in cat_data["items"] if item.get("roi_potential") == "High")
+    high_roi_count = catalog_index.count("roi", "High")
     st.metric("High ROI Items", high_roi_count, delta="Priority focus")
 with col5:
     favorites_count = len(st.session_state.favorite_automations)
@@ -1116,12 +406,10 @@ with st.sidebar:
     
     # Progress by difficulty
     st.subheader("📈 Progress by Difficulty")
-    easy_completed = sum(1 for cat_data in categories.values() for item in cat_data["items"] 
-                        if item["name"] in st.session_state.completed_automations and item.get("difficulty") == "Easy")
-    medium_completed = sum(1 for cat_data in categories.values() for item in cat_data["items"] 
-                          if item["name"] in st.session_state.completed_automations and item.get("difficulty") == "Medium")
-    hard_completed = sum(1 for cat_data in categories.values() for item in cat_data["items"] 
-                        if item["name"] in st.session_state.completed_automations and item.get("difficulty") == "Hard")
+    completed_ids = catalog_index.ids_for_names(st.session_state.completed_automations)
+    easy_completed = len(completed_ids & catalog_index.filters["difficulty"].get("Easy", set()))
+    medium_completed = len(completed_ids & catalog_index.filters["difficulty"].get("Medium", set()))
+    hard_completed = len(completed_ids & catalog_index.filters["difficulty"].get("Hard", set()))
     
     col1, col2 = st.columns(2)
     with col1:
@@ -1162,6 +450,13 @@ with st.sidebar:
         ["All", "Completed", "Pending", "Favorites"]
     )
     
+    sort_by = st.selectbox("Sort by:", list(SORT_OPTIONS), on_change=reset_checklist_page)
+    with st.expander("⚖️ Score Weights"):
+        score_weights = {
+            name: st.slider(WEIGHT_LABELS[name], 0.0, 5.0, weight, 0.5, key=f"weight_{name}")
+            for name, weight in DEFAULT_WEIGHTS.items()
+        }
+    
     st.markdown("---")
     
     # Quick actions
@@ -1170,10 +465,12 @@ with st.sidebar:
     col1, col2 = st.columns(2)
     with col1:
         if st.button("✅ Mark Easy Complete", use_container_width=True):
-            for cat_data in categories.values():
-                for item in cat_data["items"]:
-                    if item.get("difficulty") == "Easy":
-                        st.session_state.completed_automations.add(item["name"])
+            st.session_state.stale_widgets = workspace.push(st.session_state, [
+                ("completed", item["name"], True)
+                for cat_data in categories.values()
+                for item in cat_data["items"]
+                if item.get("difficulty") == "Easy"
+            ])
             st.rerun()
         
         if st.button("⭐ Show High ROI", use_container_width=True):
@@ -1182,64 +479,80 @@ with st.sidebar:
     
     with col2:
         if st.button("🔄 Reset Progress", use_container_width=True):
-            st.session_state.completed_automations = set()
-            st.session_state.automation_notes = {}
-            st.session_state.priority_levels = {}
+            st.session_state.stale_widgets = workspace.push(st.session_state,
+                [("completed", name, False) for name in st.session_state.completed_automations]
+                + [("note", name, "") for name in workspace.notes.names()]
+                + [("priority", name, DEFAULT_PRIORITY) for name in st.session_state.priority_levels]
+            )
             st.rerun()
         
         if st.button("📋 Export Report", use_container_width=True):
-            export_data = []
-            for category, cat_data in categories.items():
-                for item in cat_data["items"]:
-                    export_data.append({
-                        "Category": category,
-                        "Automation": item["name"],
-                        "Status": "✅ Completed" if item["name"] in st.session_state.completed_automations else "⏳ Pending",
-                        "Priority": st.session_state.priority_levels.get(item["name"], "Medium"),
-                        "Difficulty": item.get("difficulty", "Medium"),
-                        "Time_Estimate": item.get("time_estimate", "Unknown"),
-                        "Cost_Estimate": item.get("cost_estimate", "Unknown"),
-                        "ROI_Potential": item.get("roi_potential", "Medium"),
-                        "Tools": ", ".join(item.get("tools", [])),
-                        "Notes": st.session_state.automation_notes.get(item["name"], ""),
-                        "Favorite": "Yes" if item["name"] in st.session_state.favorite_automations else "No",
-                        "Export_Date": datetime.now().strftime("%Y-%m-%d %H:%M")
-                    })
-            
-            df = pd.DataFrame(export_data)
-            csv = df.to_csv(index=False)
-            st.download_button(
-                label="📄 Download CSV Report",
-                data=csv,
-                file_name=f"cleaning_automations_report_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
-                mime="text/csv",
-                use_container_width=True
-            )
+            try:
+                job = job_manager.submit(
+                    workspace.name, "📋 Export Report", build_export_csv, categories,
+                    set(st.session_state.completed_automations), set(st.session_state.favorite_automations),
+                    dict(st.session_state.priority_levels), workspace.notes.path
+                )
+                st.session_state.job_ids.append(job.id)
+            except JobQueueFull:
+                st.warning("Too many background jobs are queued; try again in a moment.")
+    
+    # Background jobs of this session; polls only while one is still running
+    jobs_running = any(job.active for job in job_manager.jobs(st.session_state.job_ids))
+    
+    @st.fragment(run_every="1s" if jobs_running else None)
+    def show_jobs():
+        session_jobs = job_manager.jobs(st.session_state.job_ids)
+        st.session_state.job_ids = [job.id for job in session_jobs]
+        for job in session_jobs:
+            if job.active:
+                st.progress(job.progress, text=f"{job.name}: {job.message or job.status}")
+                if st.button("Cancel", key=f"cancel_job_{job.id}", use_container_width=True):
+                    job_manager.cancel(job.id)
+            elif job.status == "done":
+                st.download_button(
+                    label="📄 Download CSV Report",
+                    data=job.result,
+                    file_name=f"cleaning_automations_report_{datetime.fromtimestamp(job.finished).strftime('%Y%m%d_%H%M')}.csv",
+                    mime="text/csv",
+                    key=f"download_job_{job.id}",
+                    use_container_width=True
+                )
+            elif job.status == "failed":
+                st.error(f"{job.name} failed: {job.error}")
+        if jobs_running and not any(job.active for job in session_jobs):
+            st.rerun()  # stop polling
+    
+    if st.session_state.job_ids:
+        show_jobs()
+
+# Score and sort keys, computed once per progress version and weight setting
+@st.cache_resource(max_entries=128)
+def get_sort_keys(workspace_name, catalog_version, hub_epoch, sync_version, weights, _features, _state):
+    return SortKeys(_features, dict(weights), _state.priority_levels,
+                    _state.favorite_automations, _state.implementation_dates)
+
+sort_keys = get_sort_keys(workspace.name, catalog_snapshot.version, workspace.hub.epoch,
+                          st.session_state.sync_version, tuple(sorted(score_weights.items())),
+                          item_features, st.session_state)
 
 # Main content area with tabs
-tab1, tab2, tab3 = st.tabs(["🎯 Automation Checklist", "📊 Analytics Dashboard", "🛠️ Implementation Guides"])
+tab1, tab2, tab3, tab4 = st.tabs(["🎯 Automation Checklist", "📊 Analytics Dashboard", "🛠️ Implementation Guides", "🚐 Operations"])
 
 with tab1:
     # Category overview
     st.header("📋 Category Performance Overview")
     
-    # Create metrics for each category
-    cols = st.columns(min(4, len(selected_categories)))
-    for i, category in enumerate(selected_categories):
-        if i < len(cols):
-            with cols[i]:
-                cat_data = categories[category]
-                completed_in_category = sum(1 for item in cat_data["items"] if item["name"] in st.session_state.completed_automations)
-                total_in_category = len(cat_data["items"])
-                percentage = (completed_in_category / total_in_category) * 100 if total_in_category > 0 else 0
-                
-                st.markdown(f"""
-                <div class="metric-card">
-                    <h3>{cat_data['icon']} {category.split(' &')[0]}</h3>
-                    <h2>{completed_in_category}/{total_in_category}</h2>
-                    <p>{percentage:.0f}% Complete</p>
-                </div>
-                """, unsafe_allow_html=True)
+    # One card per selected category, rendered as a single grid element
+    st.markdown(templates.card_grid(
+        templates.category_card(
+            categories[category],
+            category,
+            len(completed_ids & catalog_index.by_category.get(category, set())),
+            len(categories[category]["items"]),
+        )
+        for category in selected_categories
+    ), unsafe_allow_html=True)
     
     st.markdown("---")
     
@@ -1249,6 +562,11 @@ with tab1:
     with col1:
         st.header("🎯 Automation Implementation Checklist")
         
+        # Search, difficulty and ROI filters come from the catalog index
+        matching_ids = catalog_index.matching(search_term, difficulty=difficulty_filter, roi=roi_filter)
+        
+        # Items passing every filter, by category in catalog order
+        filtered_by_category = {}
         for category, cat_data in categories.items():
             if category not in selected_categories:
                 continue
@@ -1256,16 +574,7 @@ with tab1:
             # Apply filters
             filtered_items = []
             for item in cat_data["items"]:
-                # Search filter
-                if search_term and search_term.lower() not in item["name"].lower() and search_term.lower() not in item.get("description", "").lower():
-                    continue
-                
-                # Difficulty filter
-                if difficulty_filter != "All" and item.get("difficulty") != difficulty_filter:
-                    continue
-                
-                # ROI filter
-                if roi_filter != "All" and item.get("roi_potential") != roi_filter:
+                if matching_ids is not None and item["id"] not in matching_ids:
                     continue
                 
                 # Status filter
@@ -1281,17 +590,27 @@ with tab1:
                     
                 filtered_items.append(item)
             
-            if not filtered_items:
-                continue
-                
-            # Enhanced category header
-            completed_in_cat = sum(1 for item in filtered_items if item["name"] in st.session_state.completed_automations)
-            st.markdown(f"""
-            <div class="category-header">
-                <h3>{cat_data['icon']} {category}</h3>
-                <p>Progress: {completed_in_cat}/{len(filtered_items)} completed • {len(filtered_items)} items shown</p>
-            </div>
-            """, unsafe_allow_html=True)
+            if filtered_items:
+                filtered_by_category[category] = filtered_items
+        
+        sort_key = SORT_OPTIONS[sort_by]
+        if sort_key is None:
+            checklist_groups = list(filtered_by_category.items())
+            more_items = 0
+        else:
+            # One ranked page; only the page itself is sorted
+            candidates = [item["id"] for items in filtered_by_category.values() for item in items]
+            ranked = sort_keys.top(sort_key, candidates, k=st.session_state.checklist_limit)
+            checklist_groups = [(None, [catalog_index.items[key] for key in ranked])]
+            more_items = len(candidates) - len(ranked)
+            st.caption(f"Top {len(ranked)} of {len(candidates)} automations by {sort_by.lower()}")
+        
+        for category, filtered_items in checklist_groups:
+            if category is not None:
+                # Enhanced category header
+                cat_data = categories[category]
+                completed_in_cat = sum(1 for item in filtered_items if item["name"] in st.session_state.completed_automations)
+                st.markdown(templates.category_header(cat_data, category, completed_in_cat, len(filtered_items)), unsafe_allow_html=True)
             
             # Display items
             for i, item in enumerate(filtered_items):
@@ -1307,75 +626,105 @@ with tab1:
                     with col_info:
                         st.markdown(f"**Description:** {item.get('description', 'No description available')}")
                         
-                        # Metadata badges
-                        difficulty_class = f"difficulty-{item.get('difficulty', 'medium').lower()}"
-                        roi_class = f"roi-{item.get('roi_potential', 'medium').lower()}"
-                        
-                        st.markdown(f"""
-                        <div style="margin: 10px 0;">
-                            <span class="feature-badge badge-new">Difficulty: <span class="{difficulty_class}">{item.get('difficulty', 'Medium')}</span></span>
-                            <span class="feature-badge badge-popular">Time: {item.get('time_estimate', 'Unknown')}</span>
-                            <span class="feature-badge badge-advanced">Cost: {item.get('cost_estimate', 'Unknown')}</span>
-                            <span class="feature-badge badge-new">ROI: <span class="{roi_class}">{item.get('roi_potential', 'Medium')}</span></span>
-                        </div>
-                        """, unsafe_allow_html=True)
+                        # Metadata badges (prerendered per catalog version)
+                        st.markdown(item_badges[item["id"]], unsafe_allow_html=True)
+                        st.caption(f"Priority score: {sort_keys.score_of(item['id']):.0f}/100")
                         
                         # Tools section
                         if item.get('tools'):
                             st.markdown(f"**Recommended Tools:** {', '.join(item['tools'])}")
+                        
+                        similar = recommender.similar(item["id"], k=3)
+                        if similar:
+                            st.markdown(f"**Similar Automations:** {', '.join(catalog_index.items[key]['name'] for key, _ in similar)}")
+                        
+                        item_guides = guide_index.for_item(item)
+                        if item_guides:
+                            st.markdown(f"**Guide:** {', '.join('📖 ' + guide['name'] for guide in item_guides)} (see 🛠️ Implementation Guides)")
                     
                     with col_actions:
                         # Action buttons
                         col_check, col_fav = st.columns(2)
                         
                         with col_check:
-                            if st.checkbox("Complete", value=is_completed, key=f"check_{category}_{i}_{hash(item['name'])}"):
-                                st.session_state.completed_automations.add(item["name"])
-                                if item["name"] not in st.session_state.implementation_dates:
-                                    st.session_state.implementation_dates[item["name"]] = datetime.now()
-                            else:
-                                st.session_state.completed_automations.discard(item["name"])
+                            checked = st.checkbox("Complete", value=is_completed, key=widget_key("check", item["name"]))
+                            if checked != is_completed:
+                                pending_changes.append(("completed", item["name"], checked))
                         
                         with col_fav:
-                            if st.checkbox("Favorite", value=is_favorite, key=f"fav_{category}_{i}_{hash(item['name'])}"):
-                                st.session_state.favorite_automations.add(item["name"])
-                            else:
-                                st.session_state.favorite_automations.discard(item["name"])
+                            favorited = st.checkbox("Favorite", value=is_favorite, key=widget_key("fav", item["name"]))
+                            if favorited != is_favorite:
+                                pending_changes.append(("favorite", item["name"], favorited))
                     
                     # Priority and notes section
                     col_priority, col_notes = st.columns([1, 2])
                     
                     with col_priority:
+                        # Only non-default priorities are stored; the push below updates the session
+                        current_priority = st.session_state.priority_levels.get(item["name"], DEFAULT_PRIORITY)
                         priority = st.selectbox(
                             "Priority:",
-                            ["High", "Medium", "Low"],
-                            index=["High", "Medium", "Low"].index(st.session_state.priority_levels.get(item["name"], "Medium")),
-                            key=f"priority_{category}_{i}_{hash(item['name'])}"
+                            PRIORITY_LEVELS,
+                            index=PRIORITY_LEVELS.index(current_priority),
+                            key=widget_key("priority", item["name"])
                         )
-                        st.session_state.priority_levels[item["name"]] = priority
+                        if priority != current_priority:
+                            pending_changes.append(("priority", item["name"], priority))
                     
                     with col_notes:
-                        note = st.text_area(
-                            "Implementation Notes:",
-                            value=st.session_state.automation_notes.get(item["name"], ""),
-                            height=100,  # Fixed: Increased to 100 pixels (minimum is 68)
-                            key=f"note_{category}_{i}_{hash(item['name'])}",
-                            placeholder="Add your implementation notes, progress updates, or lessons learned..."
-                        )
-                        st.session_state.automation_notes[item["name"]] = note
+                        # Notes are fetched only while the editor is open and saved only on edit
+                        if st.toggle("📝 Implementation Notes", key=widget_key("notes_open", item["name"])):
+                            note_key = widget_key("note", item["name"])
+                            st.text_area(
+                                "Implementation Notes:",
+                                value=workspace.notes.get(item["name"]),
+                                height=100,  # Fixed: Increased to 100 pixels (minimum is 68)
+                                key=note_key,
+                                on_change=save_note,
+                                args=(item["name"], note_key),
+                                placeholder="Add your implementation notes, progress updates, or lessons learned...",
+                                label_visibility="collapsed"
+                            )
+                        elif item["name"] in workspace.notes:
+                            st.caption("Has notes")
+        
+        if more_items:
+            st.button(f"Show {min(more_items, CHECKLIST_PAGE_SIZE)} more", on_click=show_more_items, use_container_width=True)
+        
+        # Publish this session's edits; rerun if that pulled in edits from others
+        if pending_changes:
+            pushed = {(field, name): value for field, name, value in pending_changes}
+            synced_changes = workspace.push(st.session_state, pending_changes)
+            stale = None if synced_changes is None else [
+                (field, name) for field, name in synced_changes
+                if workspace.hub.value(field, name) != pushed.get((field, name))
+            ]
+            if stale is None or stale:
+                st.session_state.stale_widgets = stale
+                st.rerun()
     
     with col2:
         st.header("📈 Quick Stats")
         
         # Enhanced analytics
         st.subheader("🎯 Priority Breakdown")
-        high_priority = sum(1 for item, priority in st.session_state.priority_levels.items() if priority == "High")
-        medium_priority = sum(1 for item, priority in st.session_state.priority_levels.items() if priority == "Medium")
-        low_priority = sum(1 for item, priority in st.session_state.priority_levels.items() if priority == "Low")
+        # Medium is whatever is not High or Low, across the whole catalog
+        priority_breakdown = priority_counts(st.session_state.priority_levels, catalog_index)
         
-        st.metric("🔴 High Priority", high_priority)
-        st.metric("🟡 Medium Priority", medium_priority)
-        st.metric("🟢 Low Priority", low_priority)
+        st.metric("🔴 High Priority", priority_breakdown["High"])
+        st.metric("🟡 Medium Priority", priority_breakdown["Medium"])
+        st.metric("🟢 Low Priority", priority_breakdown["Low"])
+        
+        st.markdown("---")
+        
+        # Suggestions based on what has been completed
+        st.subheader("🧭 Next Best Automations")
+        next_best = recommender.next_best(completed_ids, k=5)
+        if next_best:
+            for key, _ in next_best:
+                st.write(f"➡️ {catalog_index.items[key]['name']}")
+        else:
+            st.info("Complete an automation to get suggestions")
         
         st.markdown("---")
         
@@ -1412,6 +761,37 @@ with tab1:
         for tip in tips:
             st.write(f"• {tip}")
 
+@st.cache_resource(max_entries=128)
+def get_analytics_store(workspace_name, path):
+    return analytics.AnalyticsStore(os.path.join(path, "analytics"))
+
+def import_sample_history(job, store):
+    """Background job: three years of synthetic history into ``store``."""
+    job.report(0.0, "Generating history")
+    history = analytics.synthetic_history()
+    for done, (table, frame) in enumerate(history.items()):
+        job.check_cancelled()
+        job.report(done / len(history), f"Importing {table}")
+        store.append(table, frame)
+
+def rating_color(value):
+    """Heatmap cell style: red below 4 stars, blue above."""
+    if pd.isna(value):
+        return ""
+    strength = min(abs(value - 4.0), 1.0) * 0.6
+    return f"background-color: rgba({'214, 39, 40' if value < 4.0 else '46, 134, 171'}, {strength:.2f})"
+
+def build_lead_scoring(job, n_leads, seed):
+    # Last year's leads with outcomes train the model; this month's are scored
+    history, converted = lead_scoring.synthetic_leads(n_leads, seed=seed)
+    recent, _ = lead_scoring.synthetic_leads(n_leads // 10, seed=seed + 1)
+    encoder = lead_scoring.LeadEncoder(lead_scoring.SERVICE_ZIPS)
+    scorers = {
+        "Rule weights": lead_scoring.LeadScorer.from_rules(encoder),
+        "Trained on past leads": lead_scoring.LeadScorer.fit(encoder, history, converted),
+    }
+    return recent, encoder.encode(recent), [lead_scoring.tag_source(lead) for lead in recent], scorers
+
 with tab2:
     st.header("📊 Analytics Dashboard")
     
@@ -1471,80 +851,516 @@ with tab2:
         st.markdown("2. Start with 'Easy' difficulty items")
         st.markdown("3. Focus on high ROI automations")
         st.markdown("4. Track your progress here")
+    
+    # Monte Carlo simulation over the estimate ranges
+    st.subheader("🎲 Plan Cost & Time Simulation")
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        plan_scope = st.radio("Simulate:", ["Pending", "Favorites"], horizontal=True)
+        trials = st.select_slider("Trials:", options=[1000, 5000, 10000, 20000, 50000], value=10000)
+    plan_items = [
+        item for item in catalog_index.items.values()
+        if (item["name"] in st.session_state.favorite_automations if plan_scope == "Favorites"
+            else item["name"] not in st.session_state.completed_automations)
+    ]
+    with col2:
+        if plan_items:
+            # Precompiled estimate columns when the catalog is still the one the artifact was built from
+            artifact = getattr(workspace_manager.catalog_source, "artifact", None)
+            columns = artifact.estimates_for(plan_items) if artifact is not None else None
+            plan = simulate_plan(plan_items, trials=trials, columns=columns)
+            st.caption(f"{plan['items']} automations • {plan['trials']:,} trials • P10 / P50 / P90 totals")
+            for label, key, fmt in (("⏱️ Hours", "hours", "{:,.0f}h"), ("💰 Cost", "cost", "${:,.0f}")):
+                cols = st.columns(3)
+                for col, (percentile, value) in zip(cols, plan[key].items()):
+                    col.metric(f"{label} {percentile}", fmt.format(value))
+        else:
+            st.info(f"No {plan_scope.lower()} automations to simulate")
+    
+    # Smallest or cheapest set of subscriptions that covers the selected automations
+    st.subheader("🧰 Tool Consolidation")
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        tool_scope = st.radio("Cover:", ["Favorites", "Pending"], horizontal=True)
+        objective = st.radio("Optimize for:", ["Fewest tools", "Lowest monthly cost"])
+    if tool_scope == "Favorites":
+        scope_ids = catalog_index.ids_for_names(st.session_state.favorite_automations)
+    else:
+        scope_ids = set(catalog_index.items) - catalog_index.ids_for_names(st.session_state.completed_automations)
+    with col2:
+        if scope_ids:
+            cover = optimize(tool_index, scope_ids, weighted=objective == "Lowest monthly cost")
+            st.caption(
+                f"{len(cover.tools)} tools cover {len(scope_ids) - len(cover.uncovered)} automations • "
+                f"est. ${sum(tool_cost(tool) for tool in cover.tools):,}/month • "
+                f"{'optimal' if cover.method == 'exact' else f'greedy, lower bound {cover.lower_bound:.1f}'}"
+            )
+            st.dataframe(pd.DataFrame([
+                {
+                    "Tool": tool_index.display[tool],
+                    "Automations": len(cover.covered[tool]),
+                    "Est. $/month": tool_cost(tool),
+                }
+                for tool in cover.tools
+            ]), hide_index=True, use_container_width=True)
+        else:
+            st.info(f"No {tool_scope.lower()} automations to cover")
+    
+    # Marketing & Sales: "Auto-score leads based on form inputs" and "Trigger a call task for high-interest leads"
+    st.subheader("📣 Lead Scoring")
+    lead_scoring_data = sample_build("Training lead scorers", build_lead_scoring, 50000, 0)
+    if lead_scoring_data is not None:
+        recent_leads, lead_features, lead_sources, lead_scorers = lead_scoring_data
+        col1, col2 = st.columns([1, 2])
+        with col1:
+            scorer_name = st.radio("Score with:", list(lead_scorers))
+            hot_threshold, warm_threshold = lead_scoring.HOT, lead_scoring.WARM
+            warm_threshold, hot_threshold = st.slider("Warm / hot thresholds:", 0, 100, (int(warm_threshold), int(hot_threshold)))
+        scorer = lead_scorers[scorer_name]
+        lead_scores = scorer.score_matrix(lead_features)
+        lead_tiers = lead_scoring.tiers(lead_scores, hot_threshold, warm_threshold)
+        with col2:
+            cols = st.columns(4)
+            for col, tier in zip(cols, ("Hot", "Warm", "Cold")):
+                col.metric(f"{tier} leads", f"{int((lead_tiers == tier).sum()):,}")
+            cols[3].metric("Call tasks", f"{len(lead_scoring.call_tasks(recent_leads, lead_scores, hot_threshold)):,}")
+            by_source = pd.DataFrame({"Source": lead_sources, "Score": lead_scores, "Hot": lead_tiers == "Hot"})
+            st.dataframe(
+                by_source.groupby("Source").agg(Leads=("Score", "size"), **{"Avg score": ("Score", "mean"), "Hot %": ("Hot", "mean")})
+                .assign(**{"Avg score": lambda df: df["Avg score"].round(1), "Hot %": lambda df: (df["Hot %"] * 100).round(1)})
+                .sort_values("Avg score", ascending=False),
+                use_container_width=True,
+            )
+        with st.expander("Score a form submission"):
+            col1, col2, col3 = st.columns(3)
+            form_lead = {
+                "service": col1.selectbox("Service:", lead_scoring.SERVICES),
+                "frequency": col1.selectbox("Frequency:", lead_scoring.FREQUENCIES),
+                "timeline": col2.selectbox("Timeline:", lead_scoring.TIMELINES),
+                "source": col2.selectbox("Source:", lead_scoring.SOURCES),
+                "sqft": col3.number_input("Square feet:", min_value=0, value=1800, step=100),
+                "budget": col3.number_input("Budget ($):", min_value=0, value=200, step=25),
+                "zip": lead_scoring.SERVICE_ZIPS[0],
+                "phone": "on file",
+            }
+            form_score = scorer.score_one(form_lead)
+            form_tier = lead_scoring.tiers(form_score, hot_threshold, warm_threshold)
+            st.metric("Lead score", f"{form_score:.0f}/100", delta=f"{form_tier} • call now" if form_tier == "Hot" else str(form_tier))
+    
+    # Reporting & Analytics: reports read materialized aggregates, never the imported history
+    st.subheader("📑 Business Reports")
+    analytics_store = get_analytics_store(workspace.name, workspace.path)
+    with st.expander("📥 Import data", expanded=analytics_store.empty):
+        col1, col2 = st.columns([1, 2])
+        with col1:
+            import_table = st.selectbox("Table:", list(analytics.TABLES))
+            st.caption("Columns: " + ", ".join(analytics.TABLES[import_table]))
+        with col2:
+            upload = st.file_uploader("CSV file:", type="csv", key="analytics_upload")
+            if upload is not None and st.button("Import", key="analytics_import"):
+                try:
+                    imported = analytics_store.append(import_table, pd.read_csv(upload))
+                    st.success(f"Imported {imported:,} {import_table} rows")
+                except ValueError as exc:
+                    st.error(str(exc))
+        history_job = job_manager.get(st.session_state.get("history_job_id"))
+        if history_job is not None and history_job.active:
+            st.progress(history_job.progress, text=f"{history_job.name}: {history_job.message or history_job.status}")
+            sample_builds_waiting.append(history_job)
+        elif history_job is not None and history_job.status == "failed":
+            st.error(f"{history_job.name} failed: {history_job.error}")
+        if analytics_store.empty and not (history_job and history_job.active) \
+                and st.button("Load 3 years of sample history"):
+            try:
+                st.session_state.history_job_id = job_manager.submit(
+                    workspace.name, "Importing sample history", import_sample_history, analytics_store).id
+                st.rerun()
+            except JobQueueFull:
+                st.warning("Too many background jobs are queued; try again in a moment.")
+    if analytics_store.empty:
+        st.info("Import jobs, payments, reviews or ad spend to see reports.")
+    else:
+        report_name = st.selectbox("Report:", list(analytics.REPORTS))
+        report_started = datetime.now()
+        report = getattr(analytics_store, analytics.REPORTS[report_name])()
+        report_ms = (datetime.now() - report_started).total_seconds() * 1000
+        if report_name == "Weekly revenue":
+            st.line_chart(report["revenue"].tail(104))
+            cols = st.columns(2)
+            cols[0].metric("Last week", f"${report['revenue'].iloc[-1]:,.0f}" if len(report) else "$0",
+                           delta=f"${report['revenue'].iloc[-1] - report['revenue'].iloc[-2]:,.0f}" if len(report) > 1 else None)
+            cols[1].metric("Jobs last week", f"{int(report['jobs'].iloc[-1]) if len(report) else 0:,}")
+        elif report_name == "Client lifetime value":
+            clients, (avg_value, avg_months, client_count) = report
+            cols = st.columns(3)
+            cols[0].metric("Avg lifetime value", f"${avg_value:,.0f}")
+            cols[1].metric("Avg months as client", f"{avg_months:.1f}")
+            cols[2].metric("Paying clients", f"{client_count:,}")
+            st.dataframe(clients.head(20).round(2), use_container_width=True)
+        elif report_name == "Cleaner performance heatmap":
+            report.columns = [month.strftime("%b %y") for month in report.columns]
+            st.dataframe(report.style.format("{:.2f}", na_rep="").map(rating_color), use_container_width=True)
+        elif report_name == "Net Promoter Score":
+            st.line_chart(report["nps"])
+            st.metric("NPS this month", f"{report['nps'].iloc[-1]:.0f}" if len(report) else "–")
+        elif report_name == "Most-requested services":
+            st.bar_chart(analytics_store.service_popularity(months=12))
+        elif report_name == "Ad spend vs. bookings":
+            st.dataframe(report.reset_index().pivot_table(index="month", columns="channel", values="cost_per_client")
+                         .tail(12).round(2), use_container_width=True)
+            st.caption("Cost per new client by channel, last 12 months")
+        else:
+            st.line_chart(report[["missed_pct", "rescheduled_pct"]])
+        st.caption(f"Computed from materialized aggregates over {len(analytics_store.parts):,} imports in {report_ms:.0f} ms")
 
 with tab3:
     st.header("🛠️ Implementation Guides")
     
-    # Popular implementation guides
-    guides = {
-        "Getting Started with Email Automation": {
-            "steps": [
-                "Choose an email platform (Mailchimp, ConvertKit)",
-                "Set up your account and verify domain",
-                "Create email templates for common scenarios",
-                "Set up automation triggers",
-                "Test with a small group",
-                "Monitor and optimize"
-            ],
-            "tools": ["Mailchimp", "ConvertKit", "Zapier"],
-            "time": "4-6 hours",
-            "difficulty": "Easy"
-        },
-        "Setting Up Payment Automation": {
-            "steps": [
-                "Create Stripe or PayPal account",
-                "Integrate with your booking system",
-                "Set up recurring billing",
-                "Configure failed payment handling",
-                "Test payment flows",
-                "Set up reporting"
-            ],
-            "tools": ["Stripe", "PayPal", "Zapier"],
-            "time": "6-10 hours",
-            "difficulty": "Medium"
-        },
-        "Building a Customer Communication System": {
-            "steps": [
-                "Choose SMS platform (Twilio)",
-                "Set up phone number",
-                "Create message templates",
-                "Integrate with scheduling system",
-                "Set up automated triggers",
-                "Monitor delivery rates"
-            ],
-            "tools": ["Twilio", "SMS platform", "Zapier"],
-            "time": "8-12 hours",
-            "difficulty": "Medium"
-        },
-        "Creating Automated Scheduling": {
-            "steps": [
-                "Select scheduling software (Calendly, Acuity)",
-                "Configure service types and durations",
-                "Set up calendar integration",
-                "Create booking confirmation emails",
-                "Add payment integration",
-                "Test the complete flow"
-            ],
-            "tools": ["Calendly", "Acuity", "Google Calendar"],
-            "time": "4-8 hours",
-            "difficulty": "Easy"
-        }
-    }
+    # Implementation guides, each rendered as one precompiled markdown block
+    for guide_id, guide in guide_index.guides.items():
+        with st.expander(f"📖 {guide['name']}"):
+            st.markdown(guide_index.rendered[guide_id])
+
+# Built-in engines behind catalog items the hub can run itself (synthetic data until real imports are wired in)
+ROUTE_DEPOT = (39.96, -83.0)
+
+def build_dispatcher(job, n_jobs, n_cleaners, seed):
+    zones = assignment.synthetic_zones()
+    cleaners, jobs = assignment.synthetic_day(zones, n_jobs, n_cleaners, seed)
+    dispatcher = assignment.Dispatcher(assignment.ZoneIndex(zones), cleaners)
+    unassigned = dispatcher.assign(jobs)
+    return dispatcher, jobs, unassigned
+
+def build_booking_calendar(job, n_cleaners, seed):
+    calendar = BookingCalendar()
+    rejected = calendar.import_bookings(synthetic_bookings(n_cleaners, seed=seed))
+    return calendar, rejected
+
+def build_recurrence_engine(job, n_series, seed):
+    holidays = set().union(*(us_holidays(year) for year in range(2024, 2031)))
+    return RecurrenceEngine(synthetic_series(n_series, seed=seed), Exceptions(holidays))
+
+def build_lead_deduper(job, n_leads, seed):
+    leads, _ = synthetic_leads(n_leads, seed=seed)
+    deduper = LeadDeduper()
+    i, j, _ = deduper.fit(leads)
+    return deduper, {lead.id: lead for lead in leads}, duplicate_groups(deduper.ids, i, j)
+
+def build_billing(job, n_clients, days, seed):
+    jobs = billing.synthetic_jobs(n_clients, days, seed=seed)
+    engine, events, _ = billing.simulate(jobs, days, seed=seed)
+    return engine, events
+
+@st.cache_resource
+def get_notifiers():
+    # Workspace name -> running notification stack, started once the outbox has messages to deliver
+    return {}, threading.Lock()
+
+@st.cache_resource
+def get_outbox(workspace_name, path):
+    # One connection per workspace outbox, shared by the page and the notification stack
+    return notify.Outbox(path)
+
+def outbox_path(workspace):
+    return os.path.join(workspace.path, "outbox.db")
+
+def start_notifier(workspace):
+    """The workspace's notification stack: its outbox plus local SMS/email stand-ins until provider keys exist."""
+    notifiers, lock = get_notifiers()
+    with lock:
+        if workspace.name not in notifiers:
+            outbox = get_outbox(workspace.name, outbox_path(workspace))
+            notifiers[workspace.name] = notify.LocalStack(outbox).start_in_thread()
+        return notifiers[workspace.name]
+
+def build_client_quotes(job, n_clients, seed):
+    # The client base, encoded once so a rate change only re-prices columns
+    engine = PricingEngine(depot=ROUTE_DEPOT)
+    return engine, engine.encode(synthetic_requests(n_clients, center=ROUTE_DEPOT, seed=seed))
+
+def build_route_plan(job, n_jobs, n_crews, seed):
+    planner = RoutePlanner(ROUTE_DEPOT, synthetic_day(n_jobs, ROUTE_DEPOT, seed=seed), n_crews)
+    planner.solve()
+    return planner
+
+with tab4:
+    st.header("🚐 Operations")
     
-    for guide_name, guide_data in guides.items():
-        with st.expander(f"📖 {guide_name}"):
-            col1, col2 = st.columns([2, 1])
-            
-            with col1:
-                st.markdown("### Implementation Steps:")
-                for i, step in enumerate(guide_data["steps"], 1):
-                    st.write(f"{i}. {step}")
-            
-            with col2:
-                st.markdown("### Guide Details:")
-                st.write(f"**Time Required:** {guide_data['time']}")
-                st.write(f"**Difficulty:** {guide_data['difficulty']}")
-                st.write(f"**Tools Needed:** {', '.join(guide_data['tools'])}")
+    # Daily routes: "Send daily job route to each cleaner"
+    st.subheader("🗺️ Daily Routes")
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        route_jobs = st.select_slider("Jobs:", options=[50, 100, 200, 300], value=100)
+        route_crews = st.slider("Crews:", 5, 60, 15)
+        route_seed = st.number_input("Day (seed):", min_value=0, value=0, step=1)
+    with col2:
+        planner = sample_build("Planning routes", build_route_plan, route_jobs, route_crews, int(route_seed))
+        if planner is not None:
+            routes = planner.plan()
+            st.caption(
+                f"{sum(len(route.jobs) for route in routes)} jobs on {len(routes)} routes • "
+                f"{sum(route.km for route in routes):,.0f} km • {len(planner.unassigned)} unassigned"
+            )
+            st.dataframe(pd.DataFrame([
+                {
+                    "Crew": route.crew,
+                    "Stops": len(route.jobs),
+                    "Drive (min)": round(route.minutes),
+                    "Km": round(route.km, 1),
+                    "First stop": f"{int(route.arrivals[0]) // 60:02d}:{int(route.arrivals[0]) % 60:02d}",
+                }
+                for route in routes
+            ]), hide_index=True, use_container_width=True)
+            route_crew = st.selectbox("Route for:", [route.crew for route in routes])
+            route = next((route for route in routes if route.crew == route_crew), None)
+            if route:
+                st.code("\n".join(
+                    f"{int(arrival) // 60:02d}:{int(arrival) % 60:02d}  {job_id}"
+                    for job_id, arrival in zip(route.jobs, route.arrivals)
+                ), language=None)
+    
+    # Zone and availability assignment: "Auto-assign cleaners based on zone/availability"
+    st.subheader("🧭 Cleaner Assignment")
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        dispatch_jobs = st.select_slider("Jobs to assign:", options=[500, 1000, 2000, 5000], value=2000)
+        dispatch_cleaners = st.select_slider("Cleaners:", options=[100, 200, 400, 800], value=400)
+    with col2:
+        dispatch = sample_build("Assigning cleaners", build_dispatcher, dispatch_jobs, dispatch_cleaners, int(route_seed))
+        if dispatch is not None:
+            dispatcher, dispatch_day, dispatch_unassigned = dispatch
+            cleaner_loads = pd.Series([len(job_ids) for job_ids in dispatcher.schedule().values()])
+            st.caption(
+                f"{len(dispatcher.assigned):,} of {len(dispatch_day):,} jobs assigned • "
+                f"{len(dispatch_unassigned):,} without a free cleaner in their zone • "
+                f"{cleaner_loads.mean() if len(cleaner_loads) else 0:.1f} jobs per busy cleaner"
+            )
+            # Late booking check against the day's remaining availability (nothing is booked)
+            late_zip = st.text_input("Late booking zip:", value="43005")
+            late_start = st.select_slider(
+                "Start:", options=list(range(assignment.DAY_START, assignment.DAY_END - 120 + 1, assignment.SLOT_MINUTES)),
+                value=14 * 60, format_func=lambda minute: f"{minute // 60:02d}:{minute % 60:02d}"
+            )
+            late_zone = dispatcher.zone_index.zone_name(late_zip)
+            late_cleaner = dispatcher.best_cleaner(assignment.Job("late", late_zip, late_start, 120))
+            if late_zone is None:
+                st.warning(f"No zone covers zip {late_zip}")
+            elif late_cleaner:
+                st.success(f"{late_zone}: {late_cleaner} is free for a 2-hour job")
+            else:
+                st.info(f"{late_zone}: nobody is free then")
+    
+    # Double-booking and buffer checks over a year of bookings
+    st.subheader("📅 Booking Conflicts")
+    bookings = sample_build("Importing a year of bookings", build_booking_calendar, 50, int(route_seed))
+    if bookings is not None:
+        booking_calendar, import_rejected = bookings
+        st.caption(
+            f"{len(booking_calendar):,} bookings imported • {len(import_rejected):,} rejected on import "
+            f"(double-booked or inside the {booking_calendar.buffer.seconds // 60}-minute buffer)"
+        )
+        col1, col2 = st.columns([1, 2])
+        with col1:
+            booking_cleaner = st.selectbox("Cleaner:", booking_calendar.cleaners())
+            booking_date = st.date_input("Date:", value=datetime(2025, 3, 4))
+            booking_time = st.time_input("Start time:", value=datetime(2025, 1, 1, 11, 0).time(), step=900)
+            booking_hours = st.select_slider("Hours:", options=[1.0, 1.5, 2.0, 3.0, 4.0], value=2.0)
+        with col2:
+            booking_start = datetime.combine(booking_date, booking_time)
+            proposed = Booking("proposed", booking_cleaner, booking_start,
+                               booking_start + timedelta(hours=booking_hours), "Proposed booking")
+            conflicts = booking_calendar.check(proposed)
+            if not conflicts:
+                st.success("✅ No conflicts; the slot respects the buffer")
+            for conflict in conflicts:
+                other = booking_calendar.bookings[conflict.other]
+                problem = "Double-booked with" if conflict.kind == "overlap" else "Too close to"
+                st.warning(f"{problem} {other.summary} ({other.start:%H:%M}-{other.end:%H:%M})")
+            day_start = datetime.combine(booking_date, datetime.min.time())
+            gaps = booking_calendar.free_gaps(booking_cleaner, day_start + timedelta(hours=7), day_start + timedelta(hours=20))
+            st.write("**Free that day:** " + (", ".join(f"{gap.start:%H:%M}-{gap.end:%H:%M}" for gap in gaps) or "fully booked"))
+            st.download_button(
+                "📆 Download day as .ics",
+                data=write_ics(booking_calendar.day(booking_cleaner, booking_date)),
+                file_name=f"{booking_cleaner}_{booking_date:%Y%m%d}.ics",
+                mime="text/calendar",
+            )
+    
+    # Recurring clients, expanded one month at a time with holidays moved to the next business day
+    st.subheader("🔁 Recurring Visits")
+    recurrence_engine = sample_build("Loading recurring clients", build_recurrence_engine, 5000, int(route_seed))
+    if recurrence_engine is not None:
+        col1, col2 = st.columns([1, 2])
+        with col1:
+            view_month = st.date_input("Month:", value=datetime.now().date().replace(day=1), key="recurrence_month")
+        with col2:
+            month_view = recurrence_engine.month_view(view_month.year, view_month.month)
+            st.caption(
+                f"{sum(len(visits) for visits in month_view.values()):,} visits for "
+                f"{len(recurrence_engine.series):,} recurring clients in {view_month:%B %Y}"
+            )
+            st.bar_chart(pd.Series({day.strftime("%d %a"): len(visits) for day, visits in sorted(month_view.items())}, name="Visits"))
+    
+    # Duplicate leads: "Auto-detect and email duplicate leads"
+    st.subheader("👥 Duplicate Leads")
+    dedupe_index = sample_build("Indexing leads", build_lead_deduper, 20000, int(route_seed))
+    if dedupe_index is not None:
+        lead_deduper, leads_by_id, lead_groups = dedupe_index
+        st.caption(
+            f"{len(leads_by_id):,} leads • {len(lead_groups):,} duplicate groups covering "
+            f"{sum(len(group) for group in lead_groups):,} leads"
+        )
+        col1, col2 = st.columns([1, 2])
+        with col1:
+            new_lead = Lead(
+                "new",
+                st.text_input("Name:", value=leads_by_id["L1"].name),
+                st.text_input("Email:", value=leads_by_id["L1"].email.upper()),
+                st.text_input("Phone:", value=""),
+                st.text_input("Address:", value=leads_by_id["L1"].address),
+            )
+        with col2:
+            # Checked against the index without adding the lead to it
+            matches = lead_deduper.check(new_lead, add=False)
+            if matches:
+                st.warning(f"Possible duplicate of {len(matches)} existing lead(s)")
+                st.dataframe(pd.DataFrame([
+                    {"Lead": lead_id, "Score": round(score, 2), **leads_by_id[lead_id]._asdict()}
+                    for lead_id, score in matches[:10]
+                ]).drop(columns="id"), hide_index=True, use_container_width=True)
+            else:
+                st.success("✅ New lead, no duplicates found")
+            with st.expander("Largest duplicate groups"):
+                for group in lead_groups[:5]:
+                    st.write(", ".join(f"{lead_id} ({leads_by_id[lead_id].name})" for lead_id in group))
+    
+    # Quotes: "Automated quote generator", travel surcharges and the first-time discount
+    st.subheader("💵 Quote Calculator")
+    client_quotes = sample_build("Encoding the client base", build_client_quotes, 20000, int(route_seed))
+    if client_quotes is not None:
+        pricing_engine, client_columns = client_quotes
+        col1, col2 = st.columns([1, 2])
+        with col1:
+            quote_request = QuoteRequest(
+                "estimate",
+                st.selectbox("Service type:", pricing_engine.services),
+                st.number_input("Square footage:", min_value=200, value=1800, step=100),
+                st.selectbox("Visit frequency:", pricing_engine.frequencies),
+                tuple(st.multiselect("Add-ons:", pricing_engine.addon_names)),
+                ROUTE_DEPOT[0] + st.slider("Km north of base:", 0, 80, 10) / 111.0,
+                ROUTE_DEPOT[1],
+                st.checkbox("First-time client", value=True),
+                st.text_input("Promo code:", value=""),
+            )
+        with col2:
+            quote = pricing_engine.quote(quote_request)
+            if quote.serviceable:
+                cols = st.columns(4)
+                cols[0].metric("Total", f"${quote.total:,.2f}")
+                cols[1].metric("Discount", f"${quote.discount:,.2f}")
+                cols[2].metric("Travel", f"${quote.travel:,.2f}")
+                cols[3].metric("Tax", f"${quote.tax:,.2f}")
+            else:
+                st.warning(f"{quote.distance_km:.0f} km away: outside the service area")
+            with st.expander("📧 Follow-up email"):
+                st.text(quote_email(quote, quote_request))
+            # Re-price the whole client base under a rate change
+            rate_change = st.slider("Rate change (%):", -20, 20, 5)
+            current = pd.Series(pricing_engine.price_columns(client_columns)["total"])
+            repriced = pd.Series(PricingEngine(adjust_rates(pricing_engine.card, rate_change), ROUTE_DEPOT).price_columns(client_columns)["total"])
+            revenue_change = (repriced - current).sum()
+            st.caption(
+                f"{current.count():,} client visits re-priced: average ${current.mean():,.2f} → "
+                f"${repriced.mean():,.2f} ({'+' if revenue_change >= 0 else '-'}${abs(revenue_change):,.0f} per round of visits)"
+            )
+    
+    # Invoices and dunning: reminders every 3 days (max 3x), admin alerts and suspension until paid
+    st.subheader("🧾 Billing & Dunning")
+    billing_run = sample_build("Simulating 60 days of billing", build_billing, 1000, 60, int(route_seed))
+    if billing_run is not None:
+        billing_engine, billing_events = billing_run
+        invoice_states = billing_engine.state_counts()
+        cols = st.columns(4)
+        for col, (label, state) in zip(cols, (("Open", billing.OPEN), ("Overdue", billing.OVERDUE),
+                                              ("Suspended", billing.SUSPENDED), ("Paid", billing.PAID))):
+            col.metric(f"{label} invoices", f"{invoice_states.get(state, 0):,}")
+        last_day = max(event.at for event in billing_events).date() if billing_events else None
+        todays_events = [event for event in billing_events if event.at.date() == last_day]
+        st.caption(
+            f"{len(billing_engine.invoices):,} invoices over 60 days • on {last_day}: "
+            + ", ".join(f"{count} {kind.replace('_', ' ')}" for kind, count in sorted(
+                pd.Series([event.kind for event in todays_events], dtype=object).value_counts().items()))
+        )
+        col1, col2 = st.columns([2, 1])
+        with col1:
+            suspended = billing_engine.suspended_clients()
+            st.write(f"**Services suspended until payment:** {len(suspended):,} clients")
+            st.dataframe(pd.DataFrame(
+                [{"Client": client, "Overdue balance": billing_engine.overdue_balance(client)} for client in suspended],
+                columns=["Client", "Overdue balance"],
+            ).sort_values("Overdue balance", ascending=False).head(20), hide_index=True, use_container_width=True)
+        with col2:
+            invoice_id = st.selectbox("Invoice:", list(billing_engine.invoices)[-50:])
+            invoice = billing_engine.invoices[invoice_id]
+            st.write(f"{invoice.client} • ${invoice.total:,.2f} • {billing_engine.state[invoice_id]}, "
+                     f"{billing_engine.reminders[invoice_id]} reminder(s)")
+            st.download_button("📄 Download PDF", data=billing.render_pdf(invoice),
+                               file_name=f"{invoice_id}.pdf", mime="application/pdf")
+
+    # Client notifications: rate-limited per channel, retried with backoff, kept in a persistent outbox
+    st.subheader("📨 Notifications")
+    notifier = get_notifiers()[0].get(workspace.name)
+    outbox = get_outbox(workspace.name, outbox_path(workspace)) if os.path.exists(outbox_path(workspace)) else None
+    if notifier is None and outbox is not None and outbox.unsettled():
+        # Messages left pending or mid-send by an earlier run: resume delivery
+        notifier = start_notifier(workspace)
+    col1, col2, col3 = st.columns([2, 2, 1])
+    with col1:
+        notify_template = st.selectbox("Template:", list(notify.TEMPLATES),
+                                       format_func=lambda name: name.replace("_", " ").title())
+    with col2:
+        notify_channels = st.multiselect("Channels:", [notify.SMS, notify.EMAIL], default=[notify.SMS, notify.EMAIL])
+    with col3:
+        notify_count = st.number_input("Clients:", 10, 5000, 200, step=10)
+    if st.button("📤 Queue messages", disabled=not notify_channels):
+        notifier = start_notifier(workspace)
+        outbox = notifier.outbox
+        batch = datetime.now().strftime("%Y%m%d%H%M%S%f")
+        added = notifier.dispatcher.enqueue(notify.synthetic_messages(
+            int(notify_count), notify_template, tuple(notify_channels), prefix=batch, seed=int(route_seed)))
+        st.success(f"✅ Queued {added:,} messages")
+    if outbox is None:
+        st.caption("Delivery starts when messages are first queued; until then nothing runs for this workspace.")
+    else:
+        @st.fragment(run_every="2s" if outbox.unsettled() else None)
+        def show_outbox():
+            counts = outbox.counts()
+            cols = st.columns(4)
+            for col, status in zip(cols, (notify.PENDING, notify.SENDING, notify.SENT, notify.FAILED)):
+                col.metric(status.title(), f"{sum(n for (_, s), n in counts.items() if s == status):,}")
+            if notifier is None:
+                st.caption("Nothing left to deliver; delivery restarts when messages are queued.")
+            else:
+                stats = notifier.dispatcher.stats
+                st.caption(f"{stats['batches']:,} batches this session • {stats['retried']:,} retries • "
+                           f"stand-ins received {notifier.gateway.received:,} SMS and "
+                           f"{notifier.smtp.received:,} emails")
+            failures = outbox.failures()
+            if failures:
+                with st.expander(f"⚠️ Failed messages ({len(failures)} most recent)"):
+                    st.dataframe(pd.DataFrame(failures, columns=["Message", "Channel", "To", "Attempts", "Error"]),
+                                 hide_index=True, use_container_width=True)
+
+        show_outbox()
+
+# Rerun the page once a sample build it is waiting for has finished
+@st.fragment(run_every="1s" if sample_builds_waiting else None)
+def watch_sample_builds():
+    if any(job is None or not job.active for job in sample_builds_waiting):
+        st.rerun()
+
+if sample_builds_waiting:
+    watch_sample_builds()
 
 # Enhanced footer
 st.markdown("---")
@@ -1594,14 +1410,6 @@ with col4:
 
 # Save progress notification
 if st.button("💾 Save All Progress", use_container_width=True, type="primary"):
-    progress_data = {
-        "completed": list(st.session_state.completed_automations),
-        "notes": st.session_state.automation_notes,
-        "priorities": st.session_state.priority_levels,
-        "favorites": list(st.session_state.favorite_automations),
-        "implementation_dates": {k: v.isoformat() for k, v in st.session_state.implementation_dates.items()},
-        "last_updated": datetime.now().isoformat()
-    }
+    workspace.save()
     st.success("✅ All progress saved successfully! Your data is preserved for future sessions.")
     st.balloons()
-
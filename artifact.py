@@ -0,0 +1,400 @@
+"""Precompiled, memory-mapped catalog artifact shared by worker processes.
+
+``python artifact.py build`` compiles catalog.json into a single binary
+file: every item as a JSON record, the id, name and token tables as sorted
+string tables, the filter and search indexes as int32 posting lists over
+item rows, and the numeric estimate columns as float32 arrays. Workers
+``mmap`` the file read-only and ``MappedCatalogIndex`` answers lookups,
+searches and filters straight from those arrays, so the indexes exist once
+in the page cache however many processes a host runs, and workers start
+without tokenizing or parsing estimate strings. Only the item dicts
+themselves are decoded per process, since the page renders them.
+
+Layout (little-endian)::
+
+    b"AHUBCAT2" | uint64 header length | JSON header | padding | arrays...
+
+The header only holds small metadata: category fields and row ranges,
+filter value ranges and array offsets. Array offsets are relative to the
+start of the file and aligned to 64 bytes. A string table is a blob of
+NUL-terminated UTF-8 strings plus an int64 array of ``n + 1`` start
+offsets. The header's ``source_hash`` is a hash of the catalog file it was
+built from; a stale artifact is simply ignored.
+"""
+import argparse
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import struct
+from collections.abc import Mapping
+
+import numpy as np
+
+from catalog import CATALOG_PATH, iter_items, load_catalog
+from catalog_index import (FILTER_FIELDS, _TOKEN_RE, CatalogIndex, CatalogSnapshot, _search_text,
+                           tokenize)
+from simulate import estimate_columns
+
+MAGIC = b"AHUBCAT2"
+FORMAT_VERSION = 2
+ALIGNMENT = 64
+ARTIFACT_PATH = os.path.splitext(CATALOG_PATH)[0] + ".artifact"
+
+ESTIMATE_COLUMNS = ("time_low", "time_high", "cost_low", "cost_high")
+
+
+def source_hash(path=CATALOG_PATH):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:32]
+
+
+def build_artifact(catalog_path=CATALOG_PATH, out_path=ARTIFACT_PATH):
+    categories = load_catalog(catalog_path)
+    rows = [item for _, item in iter_items(categories)]
+
+    arrays = {}
+    arrays["item_text"], arrays["item_starts"] = _strings(
+        json.dumps(item, ensure_ascii=False, separators=(",", ":")) for item in rows)
+    for table, field in (("id", "id"), ("name", "name")):
+        values = [item[field] for item in rows]
+        arrays[f"{table}_text"], arrays[f"{table}_starts"] = _strings(values)
+        arrays[f"{table}_order"] = np.argsort(np.array(values, dtype=object), kind="stable").astype(np.int32)
+
+    postings = {}
+    for row, item in enumerate(rows):
+        for token in tokenize(_search_text(item)):
+            postings.setdefault(token, []).append(row)
+    tokens = sorted(postings)
+    arrays["token_text"], arrays["token_starts"] = _strings(tokens)
+    arrays["token_postings"], ranges = _pack({token: postings[token] for token in tokens})
+    arrays["token_ranges"] = np.array([0] + [stop for _, stop in ranges.values()], dtype=np.int64)
+    filters = {}
+    for name, (field, default) in FILTER_FIELDS.items():
+        buckets = {}
+        for row, item in enumerate(rows):
+            buckets.setdefault(item.get(field, default), []).append(row)
+        arrays[f"filter_{name}"], filters[name] = _pack(buckets)
+    estimates = estimate_columns(rows)
+    for name, column in zip(ESTIMATE_COLUMNS, estimates):
+        arrays[name] = column
+
+    header_categories = []
+    start = 0
+    for category, cat_data in categories.items():
+        stop = start + len(cat_data["items"])
+        fields = {key: value for key, value in cat_data.items() if key != "items"}
+        header_categories.append([category, fields, start, stop])
+        start = stop
+    header = {
+        "format": FORMAT_VERSION,
+        "source_hash": source_hash(catalog_path),
+        "categories": header_categories,
+        "filters": filters,
+        "arrays": {},
+    }
+    # Offsets depend on the header size, which depends on the offsets: settle
+    # on a header size first, then pad the JSON to it.
+    header_size = 0
+    while True:
+        offset = _align(len(MAGIC) + 8 + header_size)
+        for name, array in arrays.items():
+            header["arrays"][name] = {"offset": offset, "dtype": array.dtype.str, "length": int(array.size)}
+            offset = _align(offset + array.nbytes)
+        encoded = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        if len(encoded) <= header_size:
+            encoded = encoded.ljust(header_size)
+            break
+        header_size = len(encoded) + 256
+
+    tmp_path = f"{out_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC + struct.pack("<Q", header_size) + encoded)
+        for name, array in arrays.items():
+            f.write(b"\0" * (header["arrays"][name]["offset"] - f.tell()))
+            f.write(np.ascontiguousarray(array).tobytes())
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+def _strings(values):
+    """String table for ``values``: NUL-terminated UTF-8 blob and start offsets."""
+    encoded = [value.encode("utf-8") + b"\0" for value in values]
+    starts = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=starts[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), starts
+
+
+def _pack(postings):
+    """Concatenate posting lists into one int32 array plus ``{key: [start, stop]}``."""
+    ranges = {}
+    parts = []
+    start = 0
+    for key, rows in postings.items():
+        ranges[key] = [start, start + len(rows)]
+        parts.append(rows)
+        start += len(rows)
+    flat = np.fromiter((row for rows in parts for row in rows), dtype=np.int32, count=start)
+    return flat, ranges
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+class _StringTable:
+    """Read-only view of a string table inside the mapping."""
+
+    def __init__(self, buffer, offset, starts, order=None):
+        self._buffer = buffer
+        self._offset = offset
+        self._starts = starts
+        self._order = order
+
+    def __len__(self):
+        return len(self._starts) - 1
+
+    def __getitem__(self, i):
+        start = self._offset + int(self._starts[i])
+        return self._buffer[start:self._offset + int(self._starts[i + 1]) - 1].decode("utf-8")
+
+    def find(self, value):
+        """Index of the last string equal to ``value``, or -1.
+
+        Binary search through ``order``, the sorted permutation; a table
+        without one must already be sorted.
+        """
+        order = range(len(self)) if self._order is None else self._order
+        i = bisect.bisect_right(range(len(order)), value, key=lambda k: self[int(order[k])]) - 1
+        if i >= 0 and self[int(order[i])] == value:
+            return int(order[i])
+        return -1
+
+    def containing(self, text):
+        """Indexes of the strings that contain ``text``, found with ``mmap.find``."""
+        needle = text.encode("utf-8")
+        end = self._offset + int(self._starts[-1])
+        positions = []
+        at = self._buffer.find(needle, self._offset, end)
+        while at >= 0:
+            positions.append(at - self._offset)
+            at = self._buffer.find(needle, at + 1, end)
+        hits = np.searchsorted(self._starts, positions, side="right") - 1
+        return np.unique(hits)
+
+
+class _RowMapping(Mapping):
+    """``{key: value}`` over rows resolved through a ``_StringTable``."""
+
+    def __init__(self, table, value_of):
+        self._table = table
+        self._value_of = value_of
+
+    def __getitem__(self, key):
+        row = self._table.find(key) if isinstance(key, str) else -1
+        if row < 0:
+            raise KeyError(key)
+        return self._value_of(row)
+
+    def __iter__(self):
+        return (self._table[row] for row in range(len(self._table)))
+
+    def __len__(self):
+        return len(self._table)
+
+
+class _Buckets(Mapping):
+    """``{value: set of ids}`` read from a posting list on every access."""
+
+    def __init__(self, index, postings, ranges):
+        self._index = index
+        self._postings = postings
+        self._ranges = ranges
+
+    def __getitem__(self, value):
+        start, stop = self._ranges[value]
+        return self._index._ids(self._postings[start:stop])
+
+    def __iter__(self):
+        return iter(self._ranges)
+
+    def __len__(self):
+        return len(self._ranges)
+
+
+class MappedCatalogIndex(CatalogIndex):
+    """``CatalogIndex`` whose lookups read the artifact's arrays in place.
+
+    ``items``, ``ids_by_name``, ``category_of``, ``filters`` and
+    ``by_category`` are read-only mappings; sets are built per call from
+    the posting lists and not kept. ``updated`` returns an ordinary
+    ``CatalogIndex`` for the new catalog, since the mapping cannot be
+    copied on write.
+    """
+
+    def __init__(self, artifact):
+        arrays = artifact.arrays
+        self._ids_table = artifact.table("id")
+        self._rows = artifact.rows
+        self.items = _RowMapping(self._ids_table, self._rows.__getitem__)
+        self.ids_by_name = _RowMapping(artifact.table("name"), self._ids_table.__getitem__)
+        self.category_of = _RowMapping(self._ids_table, artifact.category_of_row)
+        self._tokens = artifact.table("token")
+        self._token_postings = arrays["token_postings"]
+        self._token_ranges = arrays["token_ranges"]
+        self.tokens = _RowMapping(self._tokens, self._token_ids)
+        self.filters = {
+            name: _Buckets(self, arrays[f"filter_{name}"], ranges)
+            for name, ranges in artifact.header["filters"].items()
+        }
+        self.by_category = _Buckets(self, range(len(self._rows)), {
+            category: (start, stop) for category, _, start, stop in artifact.header["categories"]
+        })
+        self._owned = None
+
+    def updated(self, categories, added, removed, changed):
+        return CatalogIndex.build(categories)
+
+    def search(self, query):
+        query = query.lower()
+        candidates = None
+        for word in _TOKEN_RE.findall(query):
+            hits = self._tokens.containing(word)
+            rows = np.concatenate([self._token_rows(int(i)) for i in hits]) if len(hits) else ()
+            matched = self._ids(np.unique(rows))
+            candidates = matched if candidates is None else candidates & matched
+            if not candidates:
+                return set()
+        if candidates is None:
+            candidates = self.items.keys()
+        return {
+            key for key in candidates
+            if query in self.items[key]["name"].lower()
+            or query in self.items[key].get("description", "").lower()
+        }
+
+    def count(self, name, value):
+        ranges = self.filters[name]._ranges
+        return ranges[value][1] - ranges[value][0] if value in ranges else 0
+
+    def _token_rows(self, i):
+        return self._token_postings[self._token_ranges[i]:self._token_ranges[i + 1]]
+
+    def _token_ids(self, i):
+        return self._ids(self._token_rows(i))
+
+    def _ids(self, rows):
+        return {self._ids_table[int(row)] for row in rows}
+
+
+class CatalogArtifact:
+    """A memory-mapped artifact; arrays are read-only views on the mapping."""
+
+    def __init__(self, path=ARTIFACT_PATH):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a catalog artifact")
+        (header_size,) = struct.unpack_from("<Q", self._map, len(MAGIC))
+        start = len(MAGIC) + 8
+        header = json.loads(bytes(self._map[start:start + header_size]))
+        if header["format"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported artifact format {header['format']}")
+        self.source_hash = header["source_hash"]
+        self.header = header
+        self.arrays = {
+            name: np.frombuffer(self._map, dtype=spec["dtype"], count=spec["length"], offset=spec["offset"])
+            for name, spec in header["arrays"].items()
+        }
+        self._category_starts = np.array([start for _, _, start, _ in header["categories"]], dtype=np.int64)
+        self._categories = None
+        self._rows = None
+
+    def table(self, name):
+        """``_StringTable`` for ``id``, ``name``, ``token`` or ``item``."""
+        spec = self.header["arrays"][f"{name}_text"]
+        return _StringTable(self._map, spec["offset"], self.arrays[f"{name}_starts"], self.arrays.get(f"{name}_order"))
+
+    @property
+    def categories(self):
+        """The catalog, decoded from the item records on first use."""
+        if self._categories is None:
+            records = self.table("item")
+            self._categories = {
+                category: dict(fields, items=[json.loads(records[row]) for row in range(start, stop)])
+                for category, fields, start, stop in self.header["categories"]
+            }
+        return self._categories
+
+    @property
+    def rows(self):
+        """Item dicts in row order (the objects in ``categories``)."""
+        if self._rows is None:
+            self._rows = [item for _, item in iter_items(self.categories)]
+        return self._rows
+
+    def category_of_row(self, row):
+        return self.header["categories"][int(np.searchsorted(self._category_starts, row, side="right")) - 1][0]
+
+    def is_fresh(self, catalog_path=CATALOG_PATH):
+        return os.path.exists(catalog_path) and source_hash(catalog_path) == self.source_hash
+
+    def estimates(self, rows):
+        """``(4, len(rows))`` estimate columns: time low/high, cost low/high."""
+        rows = np.asarray(rows, dtype=np.intp)
+        return np.stack([self.arrays[name][rows] for name in ESTIMATE_COLUMNS])
+
+    def estimates_for(self, items):
+        """``estimate_columns(items)``, read from the artifact for items it holds.
+
+        Items added by a workspace overlay are not in the artifact and are
+        parsed as usual.
+        """
+        ids = self.table("id")
+        all_rows = self.rows
+        rows = [ids.find(item["id"]) for item in items]
+        known = [i for i, row in enumerate(rows) if row >= 0 and all_rows[row] is items[i]]
+        if len(known) == len(items):
+            return self.estimates(rows)
+        columns = estimate_columns(items) if not known else np.empty((4, len(items)), dtype=np.float32)
+        if known:
+            columns[:, known] = self.estimates([rows[i] for i in known])
+            missing = sorted(set(range(len(items))) - set(known))
+            columns[:, missing] = estimate_columns([items[i] for i in missing])
+        return columns
+
+    def snapshot(self, version=0):
+        """A ``CatalogSnapshot`` whose index reads the mapped arrays."""
+        return CatalogSnapshot(version, self.categories, MappedCatalogIndex(self))
+
+
+def load_fresh_artifact(path=ARTIFACT_PATH, catalog_path=CATALOG_PATH):
+    """The artifact at ``path`` if it matches the catalog file, else ``None``."""
+    if not os.path.exists(path):
+        return None
+    try:
+        artifact = CatalogArtifact(path)
+    except (OSError, ValueError, KeyError):
+        return None
+    return artifact if artifact.is_fresh(catalog_path) else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile catalog.json into a memory-mappable artifact")
+    parser.add_argument("command", choices=("build", "info"))
+    parser.add_argument("--catalog", default=CATALOG_PATH)
+    parser.add_argument("--out", default=ARTIFACT_PATH)
+    args = parser.parse_args(argv)
+    if args.command == "build":
+        build_artifact(args.catalog, args.out)
+    artifact = CatalogArtifact(args.out)
+    print(f"{args.out}: {len(artifact.rows)} items, {len(artifact.table('token'))} tokens, "
+          f"{os.path.getsize(args.out):,} bytes, source {artifact.source_hash}, "
+          f"{'fresh' if artifact.is_fresh(args.catalog) else 'STALE'}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,226 @@
+"""Cleaner assignment by zone and availability.
+
+Backs "Assign client to team based on zip code" and "Auto-assign cleaners
+based on zone/availability":
+
+* ``ZoneIndex`` maps zip codes to zones through a precomputed dict with a
+  3-digit prefix fallback; ``Dispatcher`` keeps a cleaners x zones boolean
+  matrix over it;
+* each cleaner's free time for the day is one ``uint64`` bitmap of
+  ``SLOT_MINUTES`` slots, so "who is free from 10:00 to 12:00" is a single
+  vectorized AND over all cleaners. Shifts count only the slots wholly
+  inside them, jobs take every slot they touch, and jobs running outside
+  06:00-22:00 are never assigned;
+* ``Dispatcher.assign`` assigns a day's jobs in rounds of min-cost
+  bipartite matching (``scipy.optimize.linear_sum_assignment``): each
+  round gives every cleaner at most one more job, the matched slots are
+  removed from the bitmaps, and rounds repeat until nothing more fits;
+* ``Dispatcher.assign_one`` places a single late booking against the
+  current bitmaps without touching other assignments.
+
+    python assignment.py --jobs 2000 --cleaners 400
+"""
+import argparse
+import time
+from collections import namedtuple
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+SLOT_MINUTES = 30
+DAY_START = 6 * 60
+SLOTS = 32  # 06:00-22:00; at most 64 fit in one bitmap
+DAY_END = DAY_START + SLOTS * SLOT_MINUTES
+
+# Matching costs: cheapest wins; anything at or above INFEASIBLE is never assigned
+OUT_OF_ZONE_COST = 50.0
+LOAD_COST = 1.0
+INFEASIBLE = 1e9
+
+Cleaner = namedtuple("Cleaner", ["id", "zones", "available"])  # available: [(start_minute, end_minute), ...]
+Job = namedtuple("Job", ["id", "zip", "start", "duration"])  # minutes after midnight
+
+
+def slot_mask(start, end):
+    """Bitmap of the slots overlapping ``[start, end)`` minutes; 0 if it runs outside the day."""
+    if start < DAY_START or end > DAY_END or end <= start:
+        return 0
+    first = (start - DAY_START) // SLOT_MINUTES
+    last = -(-(end - DAY_START) // SLOT_MINUTES)
+    return ((1 << (last - first)) - 1) << first
+
+
+def free_mask(start, end):
+    """Bitmap of the slots lying wholly inside ``[start, end)`` minutes, clipped to the day."""
+    first = max(-(-(start - DAY_START) // SLOT_MINUTES), 0)
+    last = min((end - DAY_START) // SLOT_MINUTES, SLOTS)
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+
+class ZoneIndex:
+    def __init__(self, zones):
+        """``zones`` maps a zone name to its zip codes or 3-digit zip prefixes."""
+        self.names = list(zones)
+        self.by_zip = {}
+        self.by_prefix = {}
+        for number, (zone, codes) in enumerate(zones.items()):
+            for code in codes:
+                code = str(code).strip()
+                (self.by_zip if len(code) == 5 else self.by_prefix)[code] = number
+
+    def zone_of(self, zip_code):
+        """Zone number for ``zip_code``, or -1 if no zone covers it."""
+        zip_code = str(zip_code).strip()[:5]
+        number = self.by_zip.get(zip_code)
+        if number is None:
+            number = self.by_prefix.get(zip_code[:3], -1)
+        return number
+
+    def zone_name(self, zip_code):
+        number = self.zone_of(zip_code)
+        return self.names[number] if number >= 0 else None
+
+
+class Dispatcher:
+    def __init__(self, zone_index, cleaners, allow_out_of_zone=False):
+        self.zone_index = zone_index
+        self.cleaners = list(cleaners)
+        self.allow_out_of_zone = allow_out_of_zone
+        n = len(self.cleaners)
+        zone_numbers = {name: number for number, name in enumerate(zone_index.names)}
+        self.serves = np.zeros((n, len(zone_index.names) + 1), dtype=bool)  # last column: unknown zone
+        self.free = np.zeros(n, dtype=np.uint64)
+        for row, cleaner in enumerate(self.cleaners):
+            for zone in cleaner.zones:
+                if zone in zone_numbers:
+                    self.serves[row, zone_numbers[zone]] = True
+            mask = 0
+            for start, end in cleaner.available:
+                # Inward: a shift from 9:15 is not free for the 9:00 slot
+                mask |= free_mask(start, end)
+            self.free[row] = mask
+        self.load = np.zeros(n, dtype=np.int64)
+        self.assigned = {}  # job id -> cleaner id
+
+    def _costs(self, jobs):
+        """``(len(jobs), cleaners)`` cost matrix against the current bitmaps."""
+        zones = np.array([self.zone_index.zone_of(job.zip) for job in jobs])
+        masks = np.array([slot_mask(job.start, job.start + job.duration) for job in jobs], dtype=np.uint64)
+        fits = (self.free[None, :] & masks[:, None]) == masks[:, None]
+        fits &= masks[:, None] != 0
+        in_zone = self.serves[:, zones].T
+        costs = np.where(in_zone, 0.0, OUT_OF_ZONE_COST if self.allow_out_of_zone else INFEASIBLE)
+        costs = costs + self.load[None, :] * LOAD_COST
+        costs[~fits] = INFEASIBLE
+        return costs, masks
+
+    def assign(self, jobs, max_rounds=32):
+        """Assign ``jobs`` in matching rounds; returns the ids left unassigned."""
+        pending = [job for job in jobs if job.id not in self.assigned]
+        for _ in range(max_rounds):
+            if not pending:
+                break
+            costs, masks = self._costs(pending)
+            # Drop jobs nobody can take any more before matching
+            possible = (costs < INFEASIBLE).any(axis=1)
+            if not possible.any():
+                break
+            rows = np.flatnonzero(possible)
+            matched_rows, cols = linear_sum_assignment(costs[rows])
+            placed = set()
+            for row, col in zip(rows[matched_rows].tolist(), cols.tolist()):
+                if costs[row, col] >= INFEASIBLE:
+                    continue
+                self._book(pending[row], col, masks[row])
+                placed.add(row)
+            if not placed:
+                break
+            pending = [job for row, job in enumerate(pending) if row not in placed and possible[row]]
+        return [job.id for job in jobs if job.id not in self.assigned]
+
+    def best_cleaner(self, job):
+        """Cheapest cleaner who can take ``job`` now, or ``None``; assigns nothing."""
+        costs, _ = self._costs([job])
+        col = int(np.argmin(costs[0]))
+        return self.cleaners[col].id if costs[0, col] < INFEASIBLE else None
+
+    def assign_one(self, job):
+        """Assign a single late booking; returns the cleaner id or ``None``."""
+        costs, masks = self._costs([job])
+        col = int(np.argmin(costs[0]))
+        if costs[0, col] >= INFEASIBLE:
+            return None
+        self._book(job, col, masks[0])
+        return self.cleaners[col].id
+
+    def _book(self, job, col, mask):
+        self.free[col] &= ~np.uint64(mask)
+        self.load[col] += 1
+        self.assigned[job.id] = self.cleaners[col].id
+
+    def schedule(self):
+        """Cleaner id -> assigned job ids."""
+        result = {}
+        for job_id, cleaner_id in self.assigned.items():
+            result.setdefault(cleaner_id, []).append(job_id)
+        return result
+
+
+def synthetic_zones(n_zones=12, zips_per_zone=20, first_zip=43001):
+    return {
+        f"Zone {chr(65 + z)}": [f"{first_zip + z * zips_per_zone + i:05d}" for i in range(zips_per_zone)]
+        for z in range(n_zones)
+    }
+
+
+def synthetic_day(zones, n_jobs=2000, n_cleaners=400, seed=0):
+    """Cleaners serving one or two zones on 6-10 hour shifts, and jobs across all zips."""
+    rng = np.random.default_rng(seed)
+    names = list(zones)
+    cleaners = []
+    for i in range(n_cleaners):
+        served = rng.choice(names, size=int(rng.integers(1, 3)), replace=False).tolist()
+        start = int(rng.integers(7, 11)) * 60
+        cleaners.append(Cleaner(f"cleaner-{i + 1}", served, [(start, start + int(rng.integers(6, 11)) * 60)]))
+    all_zips = [code for codes in zones.values() for code in codes]
+    jobs = [
+        Job(f"job-{i + 1}", all_zips[int(rng.integers(len(all_zips)))],
+            int(rng.integers(16, 34)) * SLOT_MINUTES, int(rng.choice([60, 90, 120])))
+        for i in range(n_jobs)
+    ]
+    return cleaners, jobs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Assign a synthetic day of jobs to cleaners")
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--cleaners", type=int, default=400)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--late", type=int, default=100, help="late bookings to place one by one")
+    args = parser.parse_args(argv)
+
+    zones = synthetic_zones()
+    cleaners, jobs = synthetic_day(zones, args.jobs + args.late, args.cleaners, args.seed)
+    jobs, late = jobs[:args.jobs], jobs[args.jobs:]
+    index = ZoneIndex(zones)
+    started = time.perf_counter()
+    dispatcher = Dispatcher(index, cleaners)
+    unassigned = dispatcher.assign(jobs)
+    elapsed = time.perf_counter() - started
+    print(f"{args.jobs} jobs, {args.cleaners} cleaners: {len(dispatcher.assigned)} assigned, "
+          f"{len(unassigned)} unassigned in {elapsed * 1000:.0f} ms")
+    timings = []
+    placed = 0
+    for job in late:
+        started = time.perf_counter()
+        placed += dispatcher.assign_one(job) is not None
+        timings.append(time.perf_counter() - started)
+    if timings:
+        print(f"{len(late)} late bookings: {placed} placed, median {1000 * float(np.median(timings)):.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
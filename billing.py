@@ -0,0 +1,393 @@
+"""Invoicing and dunning.
+
+Backs "Auto-generate invoice after job completion", "Send invoice
+reminders every 3 days (max 3x)", "Notify admin when client exceeds late
+payment threshold" and "Auto-suspend services until payment is
+received":
+
+* ``generate_invoices`` turns a batch of completed jobs into numbered
+  invoices, with tax computed over the whole batch at once;
+* ``render_invoices`` streams HTML or PDF renderings through a process
+  pool (``workers=0`` renders inline), yielding each as it is ready;
+* ``BillingEngine`` keeps one dunning state per invoice (open, overdue,
+  suspended, paid) and a heap of timers keyed by when each invoice next
+  needs attention. ``tick(now)`` pops only the timers that are due, so a
+  daily tick over years of invoices touches just the ones falling due
+  that day. Payments bump an invoice's timer generation, which turns its
+  pending timer into a no-op instead of searching the heap for it.
+* ``LocalBooks`` stands in for Stripe and QuickBooks: it charges
+  payments (with an optional decline rate) and keeps the ledger as JSON
+  lines that export to CSV.
+
+    python billing.py simulate --clients 5000 --days 90
+    python billing.py render --invoices 2000 --format pdf --out invoices
+"""
+import argparse
+import csv
+import functools
+import heapq
+import itertools
+import json
+import os
+import random
+import time
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from html import escape
+from string import Template
+
+import numpy as np
+
+CompletedJob = namedtuple("CompletedJob", ["id", "client", "completed", "description", "amount"])
+Invoice = namedtuple("Invoice", ["id", "client", "job", "description", "issued", "due", "subtotal", "tax", "total"])
+Payment = namedtuple("Payment", ["id", "invoice", "amount", "at", "status"])
+Event = namedtuple("Event", ["at", "kind", "invoice", "client", "detail"])
+DunningPolicy = namedtuple(
+    "DunningPolicy",
+    ["reminder_every", "max_reminders", "suspend_after", "alert_invoices", "alert_balance"],
+    defaults=(timedelta(days=3), 3, timedelta(days=3), 2, 500.0),
+)
+
+OPEN, OVERDUE, SUSPENDED, PAID = "open", "overdue", "suspended", "paid"
+REMINDER, ADMIN_ALERT, SUSPEND, RESUME, PAYMENT = "reminder", "admin_alert", "suspend", "resume", "payment"
+
+TAX_RATE = 0.0725
+TERMS = timedelta(days=14)
+
+
+def generate_invoices(jobs, first_number=1, terms=TERMS, tax_rate=TAX_RATE):
+    """One invoice per completed job, numbered in completion order."""
+    jobs = sorted(jobs, key=lambda job: (job.completed, job.id))
+    subtotal = np.round(np.fromiter((job.amount for job in jobs), dtype=np.float64, count=len(jobs)), 2)
+    tax = np.round(subtotal * tax_rate, 2)
+    total = subtotal + tax
+    return [
+        Invoice(f"INV-{first_number + i:07d}", job.client, job.id, job.description,
+                job.completed, job.completed + terms, s, t, round(g, 2))
+        for i, (job, s, t, g) in enumerate(zip(jobs, subtotal.tolist(), tax.tolist(), total.tolist()))
+    ]
+
+
+class BillingEngine:
+    def __init__(self, policy=DunningPolicy(), books=None):
+        self.policy = policy
+        self.books = books
+        self.invoices = {}
+        self.state = {}
+        self.balance = {}
+        self.reminders = {}
+        self._timers = []  # heap of (at, seq, invoice id, generation)
+        self._generation = {}
+        self._seq = itertools.count()
+        self._overdue = {}  # client -> overdue or suspended invoice ids
+        self._suspended = {}  # client -> suspended invoice ids
+        self._alerted = set()
+        self.touched = 0  # timers popped by the last tick
+
+    def add_invoices(self, invoices):
+        for invoice in invoices:
+            self.invoices[invoice.id] = invoice
+            self.state[invoice.id] = OPEN
+            self.balance[invoice.id] = invoice.total
+            self.reminders[invoice.id] = 0
+            self._schedule(invoice.id, invoice.due)
+            if self.books is not None:
+                self.books.record_invoice(invoice)
+
+    def _schedule(self, invoice_id, at):
+        generation = self._generation.get(invoice_id, 0) + 1
+        self._generation[invoice_id] = generation
+        heapq.heappush(self._timers, (at, next(self._seq), invoice_id, generation))
+
+    def next_due(self):
+        """When the next timer fires, or None."""
+        return self._timers[0][0] if self._timers else None
+
+    def tick(self, now):
+        """Advance every invoice whose timer is due by ``now``; returns the events."""
+        events = []
+        self.touched = 0
+        while self._timers and self._timers[0][0] <= now:
+            at, _, invoice_id, generation = heapq.heappop(self._timers)
+            self.touched += 1
+            if generation == self._generation.get(invoice_id) and self.state[invoice_id] != PAID:
+                self._advance(invoice_id, at, events)
+        return events
+
+    def _advance(self, invoice_id, at, events):
+        invoice = self.invoices[invoice_id]
+        client, policy = invoice.client, self.policy
+        if self.state[invoice_id] == OPEN:
+            self.state[invoice_id] = OVERDUE
+            self._overdue.setdefault(client, set()).add(invoice_id)
+            self._check_alert(client, at, events)
+        if self.reminders[invoice_id] < policy.max_reminders:
+            self.reminders[invoice_id] += 1
+            events.append(Event(at, REMINDER, invoice_id, client, self.reminders[invoice_id]))
+            last = self.reminders[invoice_id] == policy.max_reminders
+            self._schedule(invoice_id, at + (policy.suspend_after if last else policy.reminder_every))
+        else:
+            self.state[invoice_id] = SUSPENDED
+            suspended = self._suspended.setdefault(client, set())
+            if not suspended:
+                events.append(Event(at, SUSPEND, invoice_id, client, self.balance[invoice_id]))
+            suspended.add(invoice_id)
+
+    def _overdue_balance(self, client):
+        return sum(self.balance[key] for key in self._overdue.get(client, ()))
+
+    def _check_alert(self, client, at, events):
+        overdue = self._overdue.get(client, ())
+        late = len(overdue) >= self.policy.alert_invoices or self._overdue_balance(client) >= self.policy.alert_balance
+        if late and client not in self._alerted:
+            self._alerted.add(client)
+            events.append(Event(at, ADMIN_ALERT, None, client, round(self._overdue_balance(client), 2)))
+        elif not late:
+            self._alerted.discard(client)  # alert again if the client crosses the threshold later
+
+    def pay(self, invoice_id, amount, at):
+        """Apply a payment; returns the events it causes."""
+        if self.state.get(invoice_id) in (None, PAID):
+            return []
+        invoice = self.invoices[invoice_id]
+        self.balance[invoice_id] = round(self.balance[invoice_id] - amount, 2)
+        events = [Event(at, PAYMENT, invoice_id, invoice.client, amount)]
+        if self.balance[invoice_id] > 0:
+            return events
+        self.state[invoice_id] = PAID
+        self._generation[invoice_id] += 1  # its pending timer is now stale
+        self._overdue.get(invoice.client, set()).discard(invoice_id)
+        self._check_alert(invoice.client, at, events)
+        suspended = self._suspended.get(invoice.client)
+        if suspended and invoice_id in suspended:
+            suspended.discard(invoice_id)
+            if not suspended:
+                events.append(Event(at, RESUME, invoice_id, invoice.client, None))
+        return events
+
+    def is_suspended(self, client):
+        return bool(self._suspended.get(client))
+
+    def suspended_clients(self):
+        return sorted(client for client, ids in self._suspended.items() if ids)
+
+    def state_counts(self):
+        return Counter(self.state.values())
+
+    def overdue_balance(self, client):
+        return round(self._overdue_balance(client), 2)
+
+
+# -- rendering -------------------------------------------------------------
+
+INVOICE_HTML = Template(
+    '<!DOCTYPE html><html><head><meta charset="utf-8"><title>$number</title></head><body>'
+    '<h1>$business</h1><h2>Invoice $number</h2>'
+    '<p>Bill to: $client<br>Issued: $issued<br>Due: $due</p>'
+    '<table><tr><th>Service</th><th>Amount</th></tr><tr><td>$description</td><td>$$$subtotal</td></tr>'
+    '<tr><td>Tax</td><td>$$$tax</td></tr><tr><th>Total due</th><th>$$$total</th></tr></table>'
+    '</body></html>'
+)
+
+
+def invoice_lines(invoice, business):
+    return [
+        business, f"Invoice {invoice.id}", "", f"Bill to: {invoice.client}",
+        f"Issued: {invoice.issued:%Y-%m-%d}", f"Due: {invoice.due:%Y-%m-%d}", "",
+        f"{invoice.description}: ${invoice.subtotal:,.2f}", f"Tax: ${invoice.tax:,.2f}",
+        f"Total due: ${invoice.total:,.2f}",
+    ]
+
+
+def render_html(invoice, business="Sparkle Cleaning Co."):
+    return INVOICE_HTML.substitute(
+        business=escape(business), number=escape(invoice.id), client=escape(invoice.client),
+        issued=f"{invoice.issued:%Y-%m-%d}", due=f"{invoice.due:%Y-%m-%d}",
+        description=escape(invoice.description), subtotal=f"{invoice.subtotal:,.2f}",
+        tax=f"{invoice.tax:,.2f}", total=f"{invoice.total:,.2f}",
+    ).encode("utf-8")
+
+
+def render_pdf(invoice, business="Sparkle Cleaning Co."):
+    """A one-page PDF with the invoice as Helvetica text."""
+    text = " T* ".join(f"({_pdf_escape(line)}) Tj" for line in invoice_lines(invoice, business))
+    stream = f"BT /F1 12 Tf 16 TL 72 720 Td {text} ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        "/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        f"<< /Length {len(stream.encode('latin-1', 'replace'))} >>\nstream\n{stream}\nendstream",
+    ]
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1", "replace")
+    xref = len(out)
+    out += (f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+            + "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+            + f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n").encode("latin-1")
+    return bytes(out)
+
+
+def _pdf_escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+RENDERERS = {"html": render_html, "pdf": render_pdf}
+
+
+def _render(invoice, fmt, business):
+    return invoice.id, RENDERERS[fmt](invoice, business)
+
+
+def render_invoices(invoices, fmt="html", workers=None, chunksize=64, business="Sparkle Cleaning Co."):
+    """``(invoice id, bytes)`` for each invoice, in order, as they are rendered."""
+    render = functools.partial(_render, fmt=fmt, business=business)
+    if workers == 0:
+        yield from map(render, invoices)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(render, invoices, chunksize=chunksize)
+
+
+# -- payments and books stand-in -------------------------------------------
+
+class LocalBooks:
+    """Stand-in for Stripe (charges) and QuickBooks (ledger), kept as JSON lines."""
+
+    def __init__(self, path=None, decline_rate=0.0, seed=0):
+        self.path = path
+        self.decline_rate = decline_rate
+        self.entries = []
+        self._rng = random.Random(seed)
+        self._payments = itertools.count(1)
+
+    def _record(self, entry):
+        self.entries.append(entry)
+        if self.path:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    def record_invoice(self, invoice):
+        self._record({"type": "invoice", "ref": invoice.id, "client": invoice.client,
+                      "date": invoice.issued.isoformat(), "debit": invoice.total, "credit": 0.0})
+
+    def charge(self, invoice, amount, at):
+        """Charge the client's card on file; the payment's status is "succeeded" or "declined"."""
+        status = "declined" if self._rng.random() < self.decline_rate else "succeeded"
+        payment = Payment(f"pay_{next(self._payments):08d}", invoice.id, amount, at, status)
+        if status == "succeeded":
+            self._record({"type": "payment", "ref": payment.id, "invoice": invoice.id, "client": invoice.client,
+                          "date": at.isoformat(), "debit": 0.0, "credit": amount})
+        return payment
+
+    def export_csv(self, path):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, ["date", "type", "ref", "invoice", "client", "debit", "credit"])
+            writer.writeheader()
+            for entry in self.entries:
+                writer.writerow({"invoice": entry.get("invoice", entry["ref"]), **entry})
+
+
+# -- synthetic data ---------------------------------------------------------
+
+def synthetic_jobs(n_clients=2000, days=90, start=datetime(2025, 3, 3), seed=0):
+    """Weekly and biweekly cleans for ``n_clients`` over ``days`` days."""
+    rng = np.random.default_rng(seed)
+    jobs = []
+    for c in range(n_clients):
+        every = 7 if rng.random() < 0.5 else 14
+        amount = float(rng.choice([140, 165, 190, 240, 310]))
+        hour = int(rng.integers(9, 16))
+        for day in range(int(rng.integers(every)), days, every):
+            jobs.append(CompletedJob(f"job-{len(jobs) + 1}", f"client-{c + 1}",
+                                     start + timedelta(days=day, hours=hour), "Recurring clean", amount))
+    return jobs
+
+
+def simulate(jobs, days, start=datetime(2025, 3, 3), engine=None, books=None, seed=0):
+    """Replay ``days`` of invoicing, payments and daily dunning ticks; returns ``(engine, events, tick seconds)``.
+
+    A third of clients pay within days, most of the rest within a month,
+    and a few stop paying.
+    """
+    books = LocalBooks(decline_rate=0.05, seed=seed) if books is None else books
+    engine = BillingEngine(books=books) if engine is None else engine
+    rng = random.Random(seed)
+    by_day = {}
+    for job in jobs:
+        by_day.setdefault((job.completed - start).days, []).append(job)
+    clients = sorted({job.client for job in jobs})
+    delay = {client: rng.choice((2, 5, 7, 10, 18, 22, 30, 40, None)) for client in clients}
+    payments = []  # heap of (at, invoice id)
+    events, tick_seconds = [], []
+    number = 1
+    for day in range(days):
+        end_of_day = start + timedelta(days=day + 1)
+        invoices = generate_invoices(by_day.get(day, []), first_number=number)
+        number += len(invoices)
+        engine.add_invoices(invoices)
+        for invoice in invoices:
+            if delay[invoice.client] is not None:
+                heapq.heappush(payments, (invoice.issued + timedelta(days=delay[invoice.client]), invoice.id))
+        while payments and payments[0][0] < end_of_day:
+            at, invoice_id = heapq.heappop(payments)
+            invoice = engine.invoices[invoice_id]
+            payment = books.charge(invoice, engine.balance[invoice_id], at)
+            if payment.status == "succeeded":
+                events += engine.pay(invoice_id, payment.amount, at)
+            else:
+                heapq.heappush(payments, (at + timedelta(days=3), invoice_id))  # retried later
+        started = time.perf_counter()
+        events += engine.tick(end_of_day)
+        tick_seconds.append(time.perf_counter() - started)
+    return engine, events, tick_seconds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate invoicing and dunning, or render invoices")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sim = sub.add_parser("simulate", help="replay synthetic jobs, payments and daily ticks")
+    sim.add_argument("--clients", type=int, default=5000)
+    sim.add_argument("--days", type=int, default=90)
+    sim.add_argument("--seed", type=int, default=0)
+    render = sub.add_parser("render", help="render synthetic invoices to files")
+    render.add_argument("--invoices", type=int, default=2000)
+    render.add_argument("--format", choices=sorted(RENDERERS), default="pdf")
+    render.add_argument("--workers", type=int, default=None, help="0 renders inline")
+    render.add_argument("--out", default="invoices")
+    args = parser.parse_args(argv)
+
+    if args.command == "simulate":
+        jobs = synthetic_jobs(args.clients, args.days, seed=args.seed)
+        started = time.perf_counter()
+        invoices = generate_invoices(jobs)
+        print(f"{len(invoices):,} invoices generated in {(time.perf_counter() - started) * 1000:.0f} ms")
+        engine, events, ticks = simulate(jobs, args.days, seed=args.seed)
+        kinds = Counter(event.kind for event in events)
+        print(f"{args.days} daily ticks: median {np.median(ticks) * 1000:.2f} ms, max {max(ticks) * 1000:.2f} ms")
+        print("events: " + ", ".join(f"{kind} {count:,}" for kind, count in sorted(kinds.items())))
+        print("invoices: " + ", ".join(f"{state} {count:,}" for state, count in sorted(engine.state_counts().items())))
+        print(f"suspended clients: {len(engine.suspended_clients()):,}")
+        return 0
+
+    jobs = synthetic_jobs(max(args.invoices // 6, 1), 90)[:args.invoices]
+    invoices = generate_invoices(jobs)
+    os.makedirs(args.out, exist_ok=True)
+    started = time.perf_counter()
+    size = 0
+    for invoice_id, data in render_invoices(invoices, args.format, args.workers):
+        with open(os.path.join(args.out, f"{invoice_id}.{args.format}"), "wb") as f:
+            f.write(data)
+        size += len(data)
+    elapsed = time.perf_counter() - started
+    print(f"rendered {len(invoices):,} {args.format} invoices ({size / 1e6:.1f} MB) to {args.out} in {elapsed:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,287 @@
+"""Per-cleaner booking calendar with double-booking and buffer checks.
+
+Backs "Double-booking prevention alert" and "Buffer time automation
+between bookings". Each cleaner's accepted bookings are kept as parallel
+sorted lists of start and end times. Accepted bookings never overlap, so
+a new booking can only collide with its two neighbours: ``check`` is two
+``bisect`` lookups, whatever the size of the calendar.
+
+* ``import_bookings`` validates a bulk import in one pass per cleaner
+  over the sorted incoming bookings: each is checked against its calendar
+  neighbours and the last incoming booking accepted, and the ones that
+  fit are accepted;
+* ``free_gaps`` lists the openings (minus the buffer on both sides) in a
+  window, for rescheduling;
+* ``read_ics`` / ``write_ics`` exchange bookings with a local iCalendar
+  file, standing in for Google Calendar.
+
+Times are naive ``datetime`` values in the business's local time.
+
+    python booking_calendar.py --cleaners 200 --days 365
+"""
+import argparse
+import random
+import time
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+Booking = namedtuple("Booking", ["id", "cleaner", "start", "end", "summary"])
+Conflict = namedtuple("Conflict", ["kind", "booking", "other"])  # kind: "overlap" or "buffer"
+Gap = namedtuple("Gap", ["start", "end"])
+
+OVERLAP, BUFFER = "overlap", "buffer"
+
+_ICS_TIME = "%Y%m%dT%H%M%S"
+
+
+class BookingCalendar:
+    def __init__(self, buffer=timedelta(minutes=30)):
+        self.buffer = buffer
+        self._starts = {}
+        self._ends = {}
+        self._ids = {}
+        self.bookings = {}
+
+    def __len__(self):
+        return len(self.bookings)
+
+    def cleaners(self):
+        return list(self._starts)
+
+    def check(self, booking):
+        """Conflicts ``booking`` would have with the accepted bookings (none: it fits)."""
+        starts = self._starts.get(booking.cleaner)
+        if not starts:
+            return []
+        ends, ids = self._ends[booking.cleaner], self._ids[booking.cleaner]
+        conflicts = []
+        i = bisect_left(starts, booking.start)
+        # Previous neighbour, skipping the booking itself when rescheduling it
+        k = i - 1
+        if k >= 0 and ids[k] == booking.id:
+            k -= 1
+        if k >= 0:
+            conflicts += self._classify(booking, ends[k] - booking.start, ids[k])
+        for j in range(i, len(starts)):
+            if ids[j] == booking.id:
+                continue
+            if starts[j] >= booking.end + self.buffer:
+                break
+            conflicts += self._classify(booking, booking.end - starts[j], ids[j])
+        return conflicts
+
+    def _classify(self, booking, overlap, other_id):
+        """``overlap`` is how far the two bookings run into each other (negative: apart)."""
+        if overlap > timedelta(0):
+            return [Conflict(OVERLAP, booking.id, other_id)]
+        if overlap > -self.buffer:
+            return [Conflict(BUFFER, booking.id, other_id)]
+        return []
+
+    def add(self, booking):
+        """Accept ``booking`` if it fits; returns its conflicts otherwise."""
+        conflicts = self.check(booking)
+        if not conflicts:
+            self._insert(booking)
+        return conflicts
+
+    def remove(self, booking_id):
+        booking = self.bookings.pop(booking_id, None)
+        if booking is None:
+            return False
+        starts, ids = self._starts[booking.cleaner], self._ids[booking.cleaner]
+        i = bisect_left(starts, booking.start)
+        while ids[i] != booking_id:
+            i += 1
+        del starts[i], self._ends[booking.cleaner][i], ids[i]
+        return True
+
+    def _insert(self, booking):
+        if booking.id in self.bookings:
+            self.remove(booking.id)
+        starts = self._starts.setdefault(booking.cleaner, [])
+        i = bisect_right(starts, booking.start)
+        starts.insert(i, booking.start)
+        self._ends.setdefault(booking.cleaner, []).insert(i, booking.end)
+        self._ids.setdefault(booking.cleaner, []).insert(i, booking.id)
+        self.bookings[booking.id] = booking
+
+    def import_bookings(self, bookings):
+        """Validate and accept a batch in one sweep; returns the rejected bookings' conflicts.
+
+        Incoming bookings are checked against the calendar and against each
+        other; of two incoming bookings that collide, the earlier one wins.
+        """
+        incoming = {}
+        for booking in bookings:
+            incoming.setdefault(booking.cleaner, []).append(booking)
+        conflicts = []
+        accepted = []
+        for batch in incoming.values():
+            batch.sort(key=lambda b: b.start)
+            # Accepted incoming bookings never overlap, so the last one has the latest end
+            last = None
+            for booking in batch:
+                found = self.check(booking)
+                if not found and last is not None:
+                    found = self._classify(booking, last.end - booking.start, last.id)
+                if found:
+                    conflicts += found
+                    continue
+                accepted.append(booking)
+                last = booking
+        for booking in accepted:
+            self._insert(booking)
+        return conflicts
+
+    def free_gaps(self, cleaner, start, end, min_length=timedelta(hours=1)):
+        """Openings of at least ``min_length`` between ``start`` and ``end``, buffers excluded."""
+        starts, ends = self._starts.get(cleaner, []), self._ends.get(cleaner, [])
+        i = bisect_left(starts, start)
+        if i > 0 and ends[i - 1] > start - self.buffer:
+            i -= 1
+        gaps = []
+        cursor = start
+        for j in range(i, len(starts)):
+            if starts[j] >= end + self.buffer:
+                break
+            gap_end = min(starts[j] - self.buffer, end)
+            if gap_end - cursor >= min_length:
+                gaps.append(Gap(cursor, gap_end))
+            cursor = max(cursor, ends[j] + self.buffer)
+        if end - cursor >= min_length:
+            gaps.append(Gap(cursor, end))
+        return gaps
+
+    def day(self, cleaner, date):
+        """``cleaner``'s bookings on ``date``, in order."""
+        start = datetime(date.year, date.month, date.day)
+        starts, ids = self._starts.get(cleaner, []), self._ids.get(cleaner, [])
+        i, j = bisect_left(starts, start), bisect_left(starts, start + timedelta(days=1))
+        return [self.bookings[key] for key in ids[i:j]]
+
+
+# -- iCalendar stand-in ---------------------------------------------------
+
+def write_ics(bookings, path=None):
+    """iCalendar text for ``bookings`` (one VEVENT each); written to ``path`` if given."""
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//Cleaning Automation Hub//EN"]
+    for booking in bookings:
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:{booking.id}",
+            f"DTSTART:{booking.start.strftime(_ICS_TIME)}",
+            f"DTEND:{booking.end.strftime(_ICS_TIME)}",
+            f"SUMMARY:{_escape(booking.summary or '')}",
+            f"X-CLEANER:{_escape(booking.cleaner)}",
+            "END:VEVENT",
+        ]
+    lines.append("END:VCALENDAR")
+    text = "\r\n".join(lines) + "\r\n"
+    if path:
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+    return text
+
+
+def read_ics(path, default_cleaner=None):
+    """Bookings from a local ``.ics`` file; ``X-CLEANER`` names the cleaner."""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    # Undo line folding (continuation lines start with a space or tab)
+    text = text.replace("\r\n", "\n").replace("\n ", "").replace("\n\t", "")
+    bookings = []
+    event = None
+    for line in text.split("\n"):
+        if line == "BEGIN:VEVENT":
+            event = {}
+        elif line == "END:VEVENT" and event is not None:
+            if "DTSTART" in event and "DTEND" in event:
+                bookings.append(Booking(
+                    event.get("UID") or f"ics-{len(bookings) + 1}",
+                    event.get("X-CLEANER", default_cleaner),
+                    _parse_ics_time(event["DTSTART"]),
+                    _parse_ics_time(event["DTEND"]),
+                    event.get("SUMMARY", ""),
+                ))
+            event = None
+        elif event is not None and ":" in line:
+            key, value = line.split(":", 1)
+            event[key.split(";")[0].upper()] = _unescape(value)
+    return bookings
+
+
+def _parse_ics_time(value):
+    value = value.rstrip("Z")
+    return datetime.strptime(value, _ICS_TIME if "T" in value else "%Y%m%d")
+
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def _unescape(text):
+    return text.replace("\\n", "\n").replace("\\,", ",").replace("\\;", ";").replace("\\\\", "\\")
+
+
+# -- synthetic data -------------------------------------------------------
+
+def synthetic_bookings(n_cleaners=200, days=365, per_day=4, start=datetime(2025, 1, 6), seed=0):
+    """Weekday jobs for every cleaner, with the odd double booking mixed in."""
+    rng = random.Random(seed)
+    bookings = []
+    for c in range(n_cleaners):
+        cleaner = f"cleaner-{c + 1}"
+        for d in range(days):
+            date = start + timedelta(days=d)
+            if date.weekday() >= 5:
+                continue
+            clock = date + timedelta(hours=8)
+            for _ in range(per_day):
+                clock += timedelta(minutes=rng.choice((30, 30, 45, 60, 90)))
+                length = timedelta(minutes=rng.choice((60, 90, 120)))
+                if rng.random() < 0.01:
+                    clock -= timedelta(minutes=45)  # a double booking
+                bookings.append(Booking(f"b{len(bookings) + 1}", cleaner, clock, clock + length, "Recurring clean"))
+                clock += length
+    return bookings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-validate and query a synthetic year of bookings")
+    parser.add_argument("--cleaners", type=int, default=200)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--checks", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    bookings = synthetic_bookings(args.cleaners, args.days, seed=args.seed)
+    calendar = BookingCalendar()
+    started = time.perf_counter()
+    conflicts = calendar.import_bookings(bookings)
+    elapsed = time.perf_counter() - started
+    kinds = {kind: sum(1 for c in conflicts if c.kind == kind) for kind in (OVERLAP, BUFFER)}
+    print(f"imported {len(calendar):,} of {len(bookings):,} bookings in {elapsed:.2f}s "
+          f"({kinds[OVERLAP]} overlaps, {kinds[BUFFER]} buffer violations rejected)")
+
+    rng = random.Random(args.seed + 1)
+    probes = []
+    for i in range(args.checks):
+        base = rng.choice(bookings)
+        start = base.start + timedelta(minutes=rng.randrange(-240, 240, 15))
+        probes.append(Booking(f"probe-{i}", base.cleaner, start, start + timedelta(hours=2), ""))
+    started = time.perf_counter()
+    rejected = sum(1 for probe in probes if calendar.check(probe))
+    elapsed = time.perf_counter() - started
+    print(f"{args.checks:,} single checks: {rejected:,} rejected, {elapsed / args.checks * 1e6:.1f} us each")
+
+    cleaner = bookings[0].cleaner
+    day = bookings[0].start.replace(hour=0, minute=0)
+    gaps = calendar.free_gaps(cleaner, day + timedelta(hours=7), day + timedelta(hours=20))
+    print(f"{cleaner} on {day:%Y-%m-%d}: " + ", ".join(f"{g.start:%H:%M}-{g.end:%H:%M}" for g in gaps))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
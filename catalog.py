@@ -0,0 +1,93 @@
+"""Automation catalog data and helpers shared by the app and its services."""
+import json
+import os
+import re
+
+CATALOG_PATH = os.environ.get(
+    "AUTOMATION_HUB_CATALOG",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "catalog.json"),
+)
+
+
+def load_catalog(path=CATALOG_PATH):
+    """Load the catalog file, filling in ``id`` for items that lack one."""
+    with open(path, encoding="utf-8") as f:
+        categories = json.load(f)
+    for _, item in iter_items(categories):
+        item.setdefault("id", item_id(item["name"]))
+    return categories
+
+
+def get_automation_data():
+    return load_catalog()
+
+
+def item_id(name):
+    """Stable, URL-safe identifier derived from an item's name."""
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
+def iter_items(categories):
+    """Yield ``(category, item)`` pairs in catalog order."""
+    for category, cat_data in categories.items():
+        for item in cat_data["items"]:
+            yield category, item
+
+
+def _with_id(item):
+    return item if "id" in item else dict(item, id=item_id(item["name"]))
+
+
+def diff_catalogs(old, new):
+    """Compare two catalogs by item ID.
+
+    Returns ``(added, removed, changed)`` ID sets; an item that moved to
+    another category counts as changed.
+    """
+    old_items = {item["id"]: (category, item) for category, item in iter_items(old)}
+    new_items = {item["id"]: (category, item) for category, item in iter_items(new)}
+    added = new_items.keys() - old_items.keys()
+    removed = old_items.keys() - new_items.keys()
+    changed = {
+        key for key in old_items.keys() & new_items.keys()
+        if old_items[key] != new_items[key]
+    }
+    return set(added), set(removed), changed
+
+
+def apply_overlay(base, overlay):
+    """Return ``base`` with a workspace overlay applied.
+
+    The overlay may hide items by ID (``"hidden"``) and add items per
+    category (``"extra"``), creating categories that do not exist yet.
+    Untouched categories and all item dicts are shared with ``base``, so
+    many workspaces can sit on one copy of the catalog.
+    """
+    hidden = set(overlay.get("hidden", []))
+    extra = {
+        category: dict(cat_data, items=[_with_id(item) for item in cat_data.get("items", [])])
+        for category, cat_data in overlay.get("extra", {}).items()
+    }
+    if not hidden and not extra:
+        return base
+
+    categories = {}
+    for category, cat_data in base.items():
+        items = cat_data["items"]
+        if hidden:
+            items = [item for item in items if item["id"] not in hidden]
+        if category in extra:
+            items = items + list(extra[category].get("items", []))
+        if items is cat_data["items"]:
+            categories[category] = cat_data
+        else:
+            categories[category] = dict(cat_data, items=items)
+
+    for category, cat_data in extra.items():
+        if category not in categories:
+            categories[category] = {
+                "items": list(cat_data.get("items", [])),
+                "icon": cat_data.get("icon", "🧩"),
+                "color": cat_data.get("color", "#2E86AB"),
+            }
+    return categories
@@ -0,0 +1,171 @@
+"""Search and filter indexes over the catalog, updated incrementally.
+
+``CatalogIndex.updated`` produces a new index from an old one by touching
+only the added, removed and changed item IDs. Buckets are copied on write,
+so the old index stays valid for sessions that are still rendering it.
+"""
+import re
+from collections import namedtuple
+
+from catalog import apply_overlay, diff_catalogs, iter_items
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Filter name -> (item field, default used by the app when the field is missing)
+FILTER_FIELDS = {
+    "difficulty": ("difficulty", "Medium"),
+    "roi": ("roi_potential", "Medium"),
+}
+
+CatalogSnapshot = namedtuple("CatalogSnapshot", ["version", "categories", "index"])
+
+
+def tokenize(text):
+    return set(_TOKEN_RE.findall(text.lower()))
+
+
+def _search_text(item):
+    return f"{item['name']} {item.get('description', '')}"
+
+
+class CatalogIndex:
+    def __init__(self):
+        self.items = {}
+        self.category_of = {}
+        self.ids_by_name = {}
+        self.tokens = {}
+        self.filters = {name: {} for name in FILTER_FIELDS}
+        self.by_category = {}
+        self._owned = None  # None: every bucket belongs to this index
+
+    @classmethod
+    def build(cls, categories):
+        index = cls()
+        for category, item in iter_items(categories):
+            index._add(category, item)
+        return index
+
+    def updated(self, categories, added, removed, changed):
+        """Return the index for ``categories``, re-indexing only the given IDs."""
+        index = CatalogIndex()
+        index.items = dict(self.items)
+        index.category_of = dict(self.category_of)
+        index.ids_by_name = dict(self.ids_by_name)
+        index.tokens = dict(self.tokens)
+        index.filters = {name: dict(buckets) for name, buckets in self.filters.items()}
+        index.by_category = dict(self.by_category)
+        index._owned = set()
+        for key in removed | changed:
+            index._remove(key)
+        touched = added | changed
+        if touched:
+            for category, item in iter_items(categories):
+                if item["id"] in touched:
+                    index._add(category, item)
+        index._owned = None
+        return index
+
+    @property
+    def total(self):
+        return len(self.items)
+
+    def count(self, name, value):
+        return len(self.filters[name].get(value, ()))
+
+    def ids_for_names(self, names):
+        return {self.ids_by_name[name] for name in names if name in self.ids_by_name}
+
+    def search(self, query):
+        """IDs whose name or description contains ``query`` (case-insensitive)."""
+        query = query.lower()
+        words = _TOKEN_RE.findall(query)
+        candidates = None
+        for word in words:
+            matched = set()
+            for token, ids in self.tokens.items():
+                if word in token:
+                    matched |= ids
+            candidates = matched if candidates is None else candidates & matched
+            if not candidates:
+                return set()
+        if candidates is None:
+            candidates = self.items.keys()
+        return {
+            key for key in candidates
+            if query in self.items[key]["name"].lower()
+            or query in self.items[key].get("description", "").lower()
+        }
+
+    def matching(self, search_term="", **filters):
+        """IDs passing the search term and ``filter=value`` pairs ("All" = any).
+
+        Returns ``None`` when nothing is filtered out.
+        """
+        result = None
+        for name, value in filters.items():
+            if value == "All":
+                continue
+            ids = self.filters[name].get(value, set())
+            result = set(ids) if result is None else result & ids
+        if search_term:
+            found = self.search(search_term)
+            result = found if result is None else result & found
+        return result
+
+    def _bucket(self, mapping, key, tag):
+        bucket = mapping.get(key)
+        if bucket is None:
+            bucket = mapping[key] = set()
+            if self._owned is not None:
+                self._owned.add((tag, key))
+        elif self._owned is not None and (tag, key) not in self._owned:
+            bucket = mapping[key] = set(bucket)
+            self._owned.add((tag, key))
+        return bucket
+
+    def _add(self, category, item):
+        key = item["id"]
+        self.items[key] = item
+        self.category_of[key] = category
+        self.ids_by_name[item["name"]] = key
+        for token in tokenize(_search_text(item)):
+            self._bucket(self.tokens, token, "token").add(key)
+        for name, (field, default) in FILTER_FIELDS.items():
+            self._bucket(self.filters[name], item.get(field, default), name).add(key)
+        self._bucket(self.by_category, category, "category").add(key)
+
+    def _remove(self, key):
+        item = self.items.pop(key)
+        category = self.category_of.pop(key)
+        if self.ids_by_name.get(item["name"]) == key:
+            del self.ids_by_name[item["name"]]
+        for token in tokenize(_search_text(item)):
+            bucket = self._bucket(self.tokens, token, "token")
+            bucket.discard(key)
+            if not bucket:
+                del self.tokens[token]
+        for name, (field, default) in FILTER_FIELDS.items():
+            self._bucket(self.filters[name], item.get(field, default), name).discard(key)
+        self._bucket(self.by_category, category, "category").discard(key)
+
+
+def build_snapshot(categories, version=0):
+    return CatalogSnapshot(version, categories, CatalogIndex.build(categories))
+
+
+def apply_update(snapshot, categories):
+    """Return the next snapshot for ``categories``, or ``snapshot`` if unchanged."""
+    if categories == snapshot.categories:
+        return snapshot
+    added, removed, changed = diff_catalogs(snapshot.categories, categories)
+    index = snapshot.index.updated(categories, added, removed, changed)
+    return CatalogSnapshot(snapshot.version + 1, categories, index)
+
+
+def overlay_snapshot(base, overlay):
+    """Snapshot of ``base`` with a workspace overlay applied incrementally."""
+    categories = apply_overlay(base.categories, overlay)
+    if categories is base.categories:
+        return base
+    added, removed, changed = diff_catalogs(base.categories, categories)
+    return CatalogSnapshot(base.version, categories, base.index.updated(categories, added, removed, changed))
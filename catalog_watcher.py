@@ -0,0 +1,92 @@
+"""Hot-reload of the catalog file without restarting the server.
+
+A daemon thread polls the catalog file's modification time. When it
+changes, the new catalog is diffed against the loaded one by item ID and
+only the affected index entries are rebuilt. The result is published as a
+new ``CatalogSnapshot`` with a single reference assignment, so every
+session sees either the old or the new version, never a mix.
+
+At startup a precompiled artifact (see ``artifact.py``) built from the same
+catalog file is used instead of parsing and indexing the JSON; its index
+reads the mapped arrays in place. It stays available as ``.artifact`` until
+the first reload, which builds an ordinary in-memory index.
+"""
+import logging
+import os
+import threading
+
+from artifact import ARTIFACT_PATH, load_fresh_artifact
+from catalog import CATALOG_PATH, load_catalog
+from catalog_index import apply_update, build_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogWatcher:
+    def __init__(self, path=CATALOG_PATH, interval=1.0, artifact_path=ARTIFACT_PATH):
+        self.path = path
+        self.interval = interval
+        self._stamp = self._stat()
+        self.artifact = load_fresh_artifact(artifact_path, path) if artifact_path else None
+        if self.artifact is not None:
+            self.current = self.artifact.snapshot()
+        else:
+            self.current = build_snapshot(load_catalog(path))
+        self._listeners = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __call__(self):
+        return self.current
+
+    def add_listener(self, callback):
+        """Call ``callback(snapshot)`` whenever a new version is published."""
+        self._listeners.append(callback)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="catalog-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def check(self):
+        """Reload the catalog if the file changed; returns True on a new version."""
+        stamp = self._stat()
+        if stamp == self._stamp:
+            return False
+        self._stamp = stamp
+        try:
+            categories = load_catalog(self.path)
+        except (OSError, ValueError, KeyError) as e:
+            # Most likely a half-written file; the next write triggers a retry.
+            logger.warning("Keeping catalog version %s: %s", self.current.version, e)
+            return False
+        snapshot = apply_update(self.current, categories)
+        if snapshot is self.current:
+            return False
+        self.current = snapshot
+        self.artifact = None
+        logger.info("Catalog reloaded as version %s", snapshot.version)
+        for callback in list(self._listeners):
+            callback(snapshot)
+        return True
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception:
+                logger.exception("Catalog reload failed")
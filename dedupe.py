@@ -0,0 +1,464 @@
+"""Duplicate lead detection with MinHash/LSH blocking.
+
+Backs "Auto-detect and email duplicate leads". Comparing every lead with
+every other is quadratic, so:
+
+1. name, email, phone and address are normalized (case, punctuation,
+   Gmail dots and ``+tags``, phone formatting, street abbreviations);
+2. each lead becomes a set of shingles (character trigrams of name and
+   address, plus the whole email and phone) and a MinHash signature,
+   computed for a whole chunk of leads with one NumPy reduction;
+3. signatures are cut into bands; leads sharing a band bucket, an email
+   or a phone become candidate pairs (sorting, not pairwise comparison);
+4. candidates are scored in one vectorized pass: estimated Jaccard
+   similarity plus bonuses for equal email and phone, minus penalties
+   when both leads give a different email, phone or house number.
+
+``LeadDeduper.check`` tests a single new lead against the index (sorted
+band keys for the batch, small dicts for leads added since), for form
+submissions as they arrive.
+
+    python dedupe.py fixture --rows 1000000 --out fixtures/leads.csv
+    python dedupe.py scan fixtures/leads.csv
+"""
+import argparse
+import csv
+import os
+import random
+import re
+import time
+import zlib
+from collections import namedtuple
+
+import numpy as np
+
+Lead = namedtuple("Lead", ["id", "name", "email", "phone", "address"])
+
+_MERSENNE = np.uint64((1 << 31) - 1)
+_PUNCT_RE = re.compile(r"[^a-z0-9@ ]+")
+_SPACE_RE = re.compile(r"\s+")
+_HOUSE_NUMBER_RE = re.compile(r"^\s*(\d+)")
+_HONORIFICS = {"mr", "mrs", "ms", "miss", "dr", "jr", "sr"}
+_ADDRESS_WORDS = {
+    "street": "st", "avenue": "ave", "road": "rd", "drive": "dr", "lane": "ln", "court": "ct",
+    "boulevard": "blvd", "place": "pl", "apartment": "apt", "suite": "ste", "north": "n",
+    "south": "s", "east": "e", "west": "w",
+}
+
+# Score = estimated Jaccard, plus a bonus for each equal contact field and minus a
+# penalty for each one (or house number) both leads filled in differently, capped to [0, 1].
+# Pairs at or above THRESHOLD are duplicates.
+EMAIL_BONUS = 0.35
+PHONE_BONUS = 0.25
+EMAIL_PENALTY = 0.3
+PHONE_PENALTY = 0.2
+HOUSE_NUMBER_PENALTY = 0.3
+THRESHOLD = 0.6
+
+
+def normalize_name(name):
+    words = _PUNCT_RE.sub(" ", (name or "").lower()).split()
+    return " ".join(word for word in words if word not in _HONORIFICS)
+
+
+def normalize_email(email):
+    email = (email or "").strip().lower()
+    local, _, domain = email.partition("@")
+    if not domain:
+        return ""
+    local = local.split("+", 1)[0]
+    if domain in ("gmail.com", "googlemail.com"):
+        local, domain = local.replace(".", ""), "gmail.com"
+    return f"{local}@{domain}"
+
+
+def normalize_phone(phone):
+    digits = re.sub(r"\D", "", phone or "")
+    return digits[-10:] if len(digits) >= 10 else ""
+
+
+def normalize_address(address):
+    words = _PUNCT_RE.sub(" ", (address or "").lower()).split()
+    return " ".join(_ADDRESS_WORDS.get(word, word) for word in words)
+
+
+def house_number(address):
+    """Leading house number of ``address``, or -1."""
+    match = _HOUSE_NUMBER_RE.match(address or "")
+    return int(match.group(1)) if match else -1
+
+
+def _padded(text):
+    return f" {_SPACE_RE.sub(' ', text)} ".encode("ascii", "ignore")
+
+
+def _contact_hashes(lead):
+    email, phone = normalize_email(lead.email), normalize_phone(lead.phone)
+    return ([zlib.crc32(f"e{email}".encode())] if email else []) + ([zlib.crc32(f"p{phone}".encode())] if phone else [])
+
+
+def shingles(lead):
+    """Stable 32-bit hashes of a lead's trigrams, email and phone.
+
+    A trigram hashes to its three bytes, with bit 24 set for address
+    trigrams; ``signatures_for`` computes the same values with NumPy.
+    """
+    grams = set()
+    for flag, text in ((0, _padded(normalize_name(lead.name))), (1 << 24, _padded(normalize_address(lead.address)))):
+        grams.update(flag | text[i] << 16 | text[i + 1] << 8 | text[i + 2] for i in range(len(text) - 2))
+    grams.update(_contact_hashes(lead))
+    return sorted(grams) or [0]
+
+
+class LeadDeduper:
+    def __init__(self, num_perm=32, bands=8, threshold=THRESHOLD, max_bucket=50, chunk_size=4096, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.max_bucket = max_bucket
+        self.chunk_size = chunk_size
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, int(_MERSENNE), num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(_MERSENNE), num_perm, dtype=np.uint64)
+        self._band_mix = rng.integers(1, 1 << 61, self.rows, dtype=np.uint64) | np.uint64(1)
+        self.ids = []
+        # Row buffers; only the first len(self.ids) rows are live, the rest is spare capacity
+        self._signatures = np.zeros((0, num_perm), dtype=np.uint32)
+        self._emails = self._phones = self._numbers = np.zeros(0, dtype=np.int64)
+        self._codes = {}  # normalized email/phone -> integer code, shared space
+        self._sorted = []  # per band: (sorted keys, rows) for the batch part of the index
+        self._recent = [dict() for _ in range(bands)]  # per band: key -> rows added since the batch
+        self._contacts_sorted = []  # (sorted email/phone codes, rows) for the batch part
+        self._by_contact = {}  # email/phone code -> rows added since the batch
+
+    # -- signatures ------------------------------------------------------
+
+    def signatures_for(self, leads):
+        """``(len(leads), num_perm)`` MinHash signatures, a chunk at a time."""
+        out = np.empty((len(leads), self.num_perm), dtype=np.uint32)
+        for start in range(0, len(leads), self.chunk_size):
+            chunk = leads[start:start + self.chunk_size]
+            rows, hashes = self._chunk_shingles(chunk)
+            # Leads without any shingle hash the single value 0, like ``shingles``
+            empty = np.flatnonzero(np.bincount(rows, minlength=len(chunk)) == 0)
+            if len(empty):
+                rows = np.concatenate((rows, empty))
+                hashes = np.concatenate((hashes, np.zeros(len(empty), dtype=np.uint64)))
+            order = np.argsort(rows, kind="stable")
+            rows, hashes = rows[order], hashes[order]
+            permuted = (hashes[:, None] * self._a[None, :] + self._b[None, :]) % _MERSENNE
+            offsets = np.flatnonzero(np.concatenate(([True], rows[1:] != rows[:-1])))
+            out[start:start + len(chunk)] = np.minimum.reduceat(permuted, offsets, axis=0)
+        return out
+
+    @staticmethod
+    def _chunk_shingles(chunk):
+        """``(row, hash)`` arrays of every trigram (with repeats) and contact of ``chunk``."""
+        rows, hashes = [], []
+        for flag, texts in ((0, [_padded(normalize_name(lead.name)) for lead in chunk]),
+                            (1 << 24, [_padded(normalize_address(lead.address)) for lead in chunk])):
+            lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+            data = np.frombuffer(b"".join(texts), dtype=np.uint8).astype(np.uint64)
+            ends = np.cumsum(lengths)
+            owner = np.repeat(np.arange(len(texts)), lengths)
+            # A trigram starting at p is valid when it ends inside its own text
+            starts = np.flatnonzero(np.arange(len(data)) + 2 < ends[owner]) if len(data) else np.empty(0, np.int64)
+            rows.append(owner[starts])
+            hashes.append(flag | data[starts] << 16 | data[starts + 1] << 8 | data[starts + 2])
+        contacts = [_contact_hashes(lead) for lead in chunk]
+        rows.append(np.repeat(np.arange(len(chunk)), [len(c) for c in contacts]))
+        hashes.append(np.fromiter((h for c in contacts for h in c), dtype=np.uint64))
+        return np.concatenate(rows), np.concatenate(hashes)
+
+    def _band_keys(self, signatures):
+        """``(n, bands)`` uint64 keys, one per band of ``rows`` signature values."""
+        bands = signatures.reshape(len(signatures), self.bands, self.rows).astype(np.uint64)
+        return (bands * self._band_mix).sum(axis=2)  # wraps mod 2**64 on purpose
+
+    @property
+    def signatures(self):
+        return self._signatures[:len(self.ids)]
+
+    def _code(self, value, add=True):
+        """Integer code for ``value``; -1 if empty. Unknown values are only
+        registered when ``add``, otherwise they get a code no lead has."""
+        if not value:
+            return -1
+        if add:
+            return self._codes.setdefault(value, len(self._codes))
+        return self._codes.get(value, len(self._codes))
+
+    def _reserve(self, rows):
+        """Make room for ``rows`` rows, doubling the buffers so appends are amortized O(1)."""
+        capacity = len(self._emails)
+        if rows <= capacity:
+            return
+        capacity = max(rows, 2 * capacity, 1024)
+        signatures = np.zeros((capacity, self.num_perm), dtype=np.uint32)
+        signatures[:len(self.ids)] = self.signatures
+        self._signatures = signatures
+        for name in ("_emails", "_phones", "_numbers"):
+            codes = np.full(capacity, -1, dtype=np.int64)
+            codes[:len(self.ids)] = getattr(self, name)[:len(self.ids)]
+            setattr(self, name, codes)
+
+    # -- batch -----------------------------------------------------------
+
+    def fit(self, leads):
+        """Index ``leads`` and return their duplicate pairs as ``(i, j, score)`` arrays."""
+        self.ids = [lead.id for lead in leads]
+        self._signatures = self.signatures_for(leads)
+        self._emails = np.array([self._code(normalize_email(lead.email)) for lead in leads], dtype=np.int64)
+        self._phones = np.array([self._code("tel:" + normalize_phone(lead.phone)) if normalize_phone(lead.phone)
+                                 else -1 for lead in leads], dtype=np.int64)
+        self._numbers = np.array([house_number(lead.address) for lead in leads], dtype=np.int64)
+        keys = self._band_keys(self._signatures)
+        self._sorted = []
+        self._recent = [dict() for _ in range(self.bands)]
+        self._by_contact = {}
+        self._contacts_sorted = []
+        pairs = []
+        for band in range(self.bands):
+            order = np.argsort(keys[:, band], kind="stable")
+            sorted_keys = keys[order, band]
+            self._sorted.append((sorted_keys, order))
+            pairs.append(self._bucket_pairs(sorted_keys, order))
+        for codes in (self._emails, self._phones):
+            known = np.flatnonzero(codes >= 0)
+            order = known[np.argsort(codes[known], kind="stable")]
+            self._contacts_sorted.append((codes[order], order))
+            pairs.append(self._bucket_pairs(codes[order], order))
+        i, j = np.concatenate([p[0] for p in pairs]), np.concatenate([p[1] for p in pairs])
+        if len(i):
+            # One int64 per pair: a 1-D unique is much cheaper than unique rows
+            unique = np.unique(np.minimum(i, j) * len(leads) + np.maximum(i, j))
+            i, j = unique // len(leads), unique % len(leads)
+        score = self.score(i, j)
+        keep = score >= self.threshold
+        return i[keep], j[keep], score[keep]
+
+    def _bucket_pairs(self, sorted_keys, rows):
+        """All pairs inside runs of equal keys; runs over ``max_bucket`` are skipped."""
+        if len(sorted_keys) < 2:
+            return np.empty(0, np.int64), np.empty(0, np.int64)
+        starts = np.flatnonzero(np.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1])))
+        sizes = np.diff(np.concatenate((starts, [len(sorted_keys)])))
+        firsts, seconds = [], []
+        for offset in range(1, self.max_bucket):
+            # Pair every member with the member ``offset`` places after it in its run
+            runs = sizes > offset
+            if not runs.any():
+                break
+            for start, size in zip(starts[runs].tolist(), sizes[runs].tolist()):
+                if size > self.max_bucket:
+                    continue
+                firsts.append(rows[start:start + size - offset])
+                seconds.append(rows[start + offset:start + size])
+        if not firsts:
+            return np.empty(0, np.int64), np.empty(0, np.int64)
+        return np.concatenate(firsts).astype(np.int64), np.concatenate(seconds).astype(np.int64)
+
+    def score(self, i, j):
+        """Vectorized pair scores for row arrays ``i`` and ``j``."""
+        if not len(i):
+            return np.empty(0)
+        return self._scores(self._signatures[i], self._emails[i], self._phones[i], self._numbers[i], j)
+
+    def _scores(self, signatures, emails, phones, numbers, j):
+        """Scores of leads given by their fields (arrays or one lead's scalars) against rows ``j``."""
+        score = (signatures == self._signatures[j]).mean(axis=1)
+        for a, codes, bonus, penalty in ((emails, self._emails, EMAIL_BONUS, EMAIL_PENALTY),
+                                         (phones, self._phones, PHONE_BONUS, PHONE_PENALTY),
+                                         (numbers, self._numbers, 0.0, HOUSE_NUMBER_PENALTY)):
+            b = codes[j]
+            both = (a >= 0) & (b >= 0)
+            score += np.where(both, np.where(a == b, bonus, -penalty), 0.0)
+        return np.clip(score, 0.0, 1.0)
+
+    # -- streaming -------------------------------------------------------
+
+    def check(self, lead, add=True):
+        """Existing leads ``lead`` duplicates, as ``[(lead id, score), ...]`` best first."""
+        signature = self.signatures_for([lead])
+        keys = self._band_keys(signature)[0]
+        email = self._code(normalize_email(lead.email), add)
+        phone = normalize_phone(lead.phone)
+        phone = self._code("tel:" + phone, add) if phone else -1
+        number = house_number(lead.address)
+        candidates = set()
+        # Search with NumPy scalars of the arrays' dtype: a Python int would make
+        # searchsorted convert the whole sorted array on every call
+        for band, key in enumerate(keys.tolist()):
+            if band < len(self._sorted):
+                sorted_keys, rows = self._sorted[band]
+                lo, hi = sorted_keys.searchsorted(keys[band], "left"), sorted_keys.searchsorted(keys[band], "right")
+                if hi - lo <= self.max_bucket:
+                    candidates.update(rows[lo:hi].tolist())
+            candidates.update(self._recent[band].get(key, ()))
+        for code in (email, phone):
+            if code >= 0:
+                candidates.update(self._by_contact.get(code, ()))
+                for sorted_codes, rows in self._contacts_sorted:
+                    value = np.int64(code)
+                    lo, hi = sorted_codes.searchsorted(value, "left"), sorted_codes.searchsorted(value, "right")
+                    candidates.update(rows[lo:hi].tolist())
+
+        found = []
+        if candidates:
+            others = np.fromiter(candidates, dtype=np.int64)
+            scores = self._scores(signature, email, phone, number, others)
+            keep = scores >= self.threshold
+            found = sorted(zip((self.ids[k] for k in others[keep].tolist()), scores[keep].tolist()),
+                           key=lambda pair: -pair[1])
+        if add:
+            row = len(self.ids)
+            self._reserve(row + 1)
+            self._signatures[row] = signature[0]
+            self._emails[row], self._phones[row], self._numbers[row] = email, phone, number
+            self.ids.append(lead.id)
+            for band, key in enumerate(keys.tolist()):
+                self._recent[band].setdefault(key, []).append(row)
+            for code in (email, phone):
+                if code >= 0:
+                    self._by_contact.setdefault(code, []).append(row)
+        return found
+
+
+def duplicate_groups(ids, i, j):
+    """Union-find clusters of lead ids from duplicate pairs."""
+    parent = list(range(len(ids)))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for a, b in zip(i.tolist(), j.tolist()):
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+    groups = {}
+    for row in set(i.tolist()) | set(j.tolist()):
+        groups.setdefault(find(row), []).append(ids[row])
+    return sorted((sorted(group) for group in groups.values()), key=len, reverse=True)
+
+
+# -- fixtures -------------------------------------------------------------
+
+FIRST_NAMES = ("James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+               "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Maria", "Daniel")
+LAST_NAMES = ("Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+              "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin")
+STREETS = ("Maple", "Oak", "Cedar", "Pine", "Elm", "Washington", "Lake", "Hill", "Park", "Main", "Sunset", "River")
+STREET_TYPES = ("Street", "Avenue", "Road", "Drive", "Lane", "Court")
+DOMAINS = ("gmail.com", "yahoo.com", "outlook.com", "icloud.com", "aol.com")
+
+
+def synthetic_leads(rows, duplicate_rate=0.1, seed=0):
+    """``(leads, source)``: fake leads where ~``duplicate_rate`` re-enter an earlier lead."""
+    rng = random.Random(seed)
+    leads, source = [], []
+    originals = 0
+    for row in range(rows):
+        if leads and rng.random() < duplicate_rate:
+            base = rng.randrange(len(leads))
+            leads.append(_perturb(leads[base], f"L{row + 1}", rng))
+            source.append(source[base])
+            continue
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        number = rng.randrange(10, 9999)
+        leads.append(Lead(
+            f"L{row + 1}",
+            f"{first} {last}",
+            f"{first.lower()}.{last.lower()}{originals + 1}@{rng.choice(DOMAINS)}",
+            f"({rng.randrange(200, 999)}) {rng.randrange(200, 999)}-{rng.randrange(10000):04d}",
+            f"{number} {rng.choice(STREETS)} {rng.choice(STREET_TYPES)}, Columbus OH 43{rng.randrange(1000):03d}",
+        ))
+        originals += 1
+        source.append(originals)
+    return leads, source
+
+
+def _perturb(lead, new_id, rng):
+    name, email, phone, address = lead.name, lead.email, lead.phone, lead.address
+    for change in rng.sample(("name", "email", "phone", "address", "drop"), 2):
+        if change == "name":
+            i = rng.randrange(len(name))
+            name = rng.choice((name.upper(), f"Mrs. {name}", name[:i] + name[i + 1:]))
+        elif change == "email" and "gmail" in email:
+            local, domain = email.split("@")
+            email = f"{local.replace('.', '')}+quote@{domain}"
+        elif change == "email":
+            email = email.upper()
+        elif change == "phone":
+            digits = re.sub(r"\D", "", phone)
+            phone = rng.choice((digits, f"+1 {digits[:3]}.{digits[3:6]}.{digits[6:]}"))
+        elif change == "address":
+            for long, short in _ADDRESS_WORDS.items():
+                address = re.sub(long, short, address, flags=re.IGNORECASE)
+        else:
+            email = rng.choice(("", email))
+            phone = phone if email else ""
+    return Lead(new_id, name, email, phone, address)
+
+
+def write_leads(path, leads, source=None):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(Lead._fields + (("source",) if source else ()))
+        for row, lead in enumerate(leads):
+            writer.writerow(lead + ((source[row],) if source else ()))
+
+
+def read_leads(path):
+    """``(leads, source)`` from a CSV with ``id,name,email,phone,address[,source]`` columns."""
+    leads, source = [], []
+    with open(path, newline="", encoding="utf-8") as f:
+        for record in csv.DictReader(f):
+            leads.append(Lead(*(record.get(field, "") for field in Lead._fields)))
+            if "source" in record:
+                source.append(record["source"])
+    return leads, source or None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find duplicate leads in a CSV file")
+    sub = parser.add_subparsers(dest="command", required=True)
+    fixture = sub.add_parser("fixture", help="write a synthetic lead CSV with known duplicates")
+    fixture.add_argument("--rows", type=int, default=100000)
+    fixture.add_argument("--out", default=os.path.join("fixtures", "leads.csv"))
+    fixture.add_argument("--seed", type=int, default=0)
+    scan = sub.add_parser("scan", help="report duplicate pairs in a lead CSV")
+    scan.add_argument("path")
+    scan.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args(argv)
+
+    if args.command == "fixture":
+        leads, source = synthetic_leads(args.rows, seed=args.seed)
+        write_leads(args.out, leads, source)
+        print(f"wrote {len(leads):,} leads to {args.out}")
+        return 0
+
+    leads, source = read_leads(args.path)
+    deduper = LeadDeduper(threshold=args.threshold)
+    started = time.perf_counter()
+    i, j, _ = deduper.fit(leads)
+    elapsed = time.perf_counter() - started
+    print(f"{len(leads):,} leads: {len(i):,} duplicate pairs in {elapsed:.1f}s")
+    if source:
+        same = np.array([source[a] == source[b] for a, b in zip(i.tolist(), j.tolist())], dtype=bool)
+        by_source = {}
+        for row, key in enumerate(source):
+            by_source[key] = by_source.get(key, 0) + 1
+        true_pairs = sum(n * (n - 1) // 2 for n in by_source.values())
+        print(f"precision {same.mean() if len(same) else 1:.3f}, recall {same.sum() / max(true_pairs, 1):.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,60 @@
+"""Implementation guides linked to catalog items and tools.
+
+Guides live in guides.json; each one lists the catalog item IDs it covers
+(``item_ids``) and the tools it uses. ``GuideIndex`` maps items and tools
+to guides, and ``render_guide`` compiles a guide into a single markdown
+block so the app emits one element per guide whatever its step count.
+"""
+import json
+import os
+from collections import defaultdict
+
+GUIDES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "guides.json")
+
+
+def load_guides(path=GUIDES_PATH):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def render_guide(guide):
+    """Markdown for a guide: numbered steps on the left, details on the right."""
+    steps = "\n".join(f"{i}. {step}" for i, step in enumerate(guide["steps"], 1))
+    details = " • ".join((
+        f"**Time Required:** {guide['time']}",
+        f"**Difficulty:** {guide['difficulty']}",
+        f"**Tools Needed:** {', '.join(guide['tools'])}",
+    ))
+    return f"{details}\n\n#### Implementation Steps:\n{steps}\n"
+
+
+class GuideIndex:
+    def __init__(self, guides):
+        self.guides = {guide["id"]: guide for guide in guides}
+        self.by_item = defaultdict(list)
+        self.by_tool = defaultdict(list)
+        for guide in guides:
+            for key in guide.get("item_ids", []):
+                self.by_item[key].append(guide)
+            for tool in guide.get("tools", []):
+                self.by_tool[tool.lower()].append(guide)
+        self.rendered = {key: render_guide(guide) for key, guide in self.guides.items()}
+
+    def for_item(self, item):
+        """Guides written for ``item``, else the guide for one of its tools.
+
+        Tools used by several guides (e.g. Zapier) are too generic to pick
+        a guide from and are skipped.
+        """
+        linked = self.by_item.get(item["id"])
+        if linked:
+            return linked
+        seen = {}
+        for tool in item.get("tools", []):
+            guides = self.by_tool.get(tool.lower(), [])
+            if len(guides) == 1:
+                seen.setdefault(guides[0]["id"], guides[0])
+        return list(seen.values())
+
+    def for_tool(self, tool):
+        return self.by_tool.get(tool.lower(), [])
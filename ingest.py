@@ -0,0 +1,349 @@
+"""Webhook ingestion of completion events from Zapier, Make.com and similar tools.
+
+A small asyncio HTTP endpoint accepts ``POST /events`` with a JSON event or
+``{"events": [...]}`` batch::
+
+    {"event_id": "zap-123", "workspace": "downtown", "item_id": "automated-quote-generator",
+     "status": "completed"}
+
+``status`` is ``"completed"`` or ``"pending"``; an optional ``"favorite"``
+boolean sets the favorite flag. Events go into a bounded queue (a full
+queue answers 429 so senders back off) and a single consumer drains it in
+batches. Events with malformed keys are skipped one by one, the rest of
+each batch is de-duplicated by ``event_id``, coalesced to the last
+state per item and applied through the workspace's ``SyncHub`` in one call,
+so open sessions pick the changes up like any other edit.
+
+Run ``python ingest.py serve`` for a standalone endpoint and
+``python ingest.py send`` as a local stand-in client.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+
+from workspaces import WorkspaceManager, normalize_workspace_name
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_BYTES = 1 << 20
+STATUS_VALUES = {"completed": True, "complete": True, "done": True, "pending": False, "reopened": False}
+REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 429: "Too Many Requests"}
+
+
+class IngestServer:
+    def __init__(self, workspace_manager, host="127.0.0.1", port=8765, queue_size=10000,
+                 batch_size=1000, flush_interval=0.05, dedupe_size=100000):
+        self.workspace_manager = workspace_manager
+        self.host = host
+        self.port = port
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dedupe_size = dedupe_size
+        self.stats = {"received": 0, "duplicates": 0, "applied": 0, "unknown": 0, "invalid": 0,
+                      "rejected": 0, "batches": 0}
+        self._seen = OrderedDict()
+        self._queue = None
+        self._server = None
+        self._consumer = None
+        self._loop = None
+        self._thread = None
+
+    # -- lifecycle -------------------------------------------------------
+
+    async def start(self):
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._consumer = asyncio.create_task(self._consume())
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("Ingesting events on http://%s:%s/events", self.host, self.port)
+        return self
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+        await self._queue.join()
+        self._consumer.cancel()
+
+    def start_in_thread(self):
+        """Run the server on its own event loop in a daemon thread."""
+        started = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.start())
+            started.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="ingest-server", daemon=True)
+        self._thread.start()
+        started.wait()
+        return self
+
+    def stop_thread(self):
+        asyncio.run_coroutine_threadsafe(self.stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    # -- HTTP ------------------------------------------------------------
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._respond(writer, 400, {"error": "headers too large"}, close=True)
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                method, path, _ = (lines[0].split(" ") + ["", ""])[:3]
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        key, value = line.split(":", 1)
+                        headers[key.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get("content-length") or 0)
+                    if length < 0:
+                        raise ValueError(length)
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "invalid Content-Length"}, close=True)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {"error": "body too large"}, close=True)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                status, payload = self._route(method, path, body)
+                close = headers.get("connection", "").lower() == "close"
+                await self._respond(writer, status, payload, close=close)
+                if close:
+                    break
+        finally:
+            writer.close()
+
+    def _route(self, method, path, body):
+        if path.split("?")[0] == "/health":
+            return 200, dict(self.stats, queued=self._queue.qsize())
+        if path.split("?")[0] != "/events":
+            return 404, {"error": "not found"}
+        if method != "POST":
+            return 405, {"error": "use POST"}
+        try:
+            data = json.loads(body or b"null")
+            events = data["events"] if isinstance(data, dict) and "events" in data else [data]
+            if not all(isinstance(event, dict) for event in events):
+                raise ValueError("events must be objects")
+        except (ValueError, KeyError, TypeError) as e:
+            return 400, {"error": f"invalid payload: {e}"}
+        if self._queue.maxsize - self._queue.qsize() < len(events):
+            self.stats["rejected"] += len(events)
+            return 429, {"error": "queue full, retry later", "retry_after": self.flush_interval * 10}
+        for event in events:
+            self._queue.put_nowait(event)
+        self.stats["received"] += len(events)
+        return 202, {"accepted": len(events)}
+
+    @staticmethod
+    async def _respond(writer, status, payload, close=False):
+        body = json.dumps(payload).encode()
+        head = (
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+            f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n"
+        )
+        writer.write(head.encode() + body)
+        await writer.drain()
+
+    # -- batching --------------------------------------------------------
+
+    async def _consume(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+            try:
+                # Hub and store calls take locks and touch disk: keep them off the loop
+                await loop.run_in_executor(None, self.apply_batch, batch)
+            except Exception:
+                logger.exception("Failed to apply %s events", len(batch))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def apply_batch(self, events):
+        """De-duplicate, coalesce and apply ``events``; usable without HTTP too.
+
+        Events with a malformed ``event_id``, ``workspace`` or ``item_id`` are
+        counted as invalid and skipped one by one. Only existing workspaces are
+        updated, and each workspace is applied on its own: if one fails it is
+        logged and its event ids are not remembered, so a later resend of the
+        same events is still applied. Every other event id is remembered as
+        seen, whether or not it changed anything.
+        """
+        latest = {}
+        event_ids = {}
+        batch_ids = set()
+        for event in events:
+            if not _valid_event(event):
+                self.stats["invalid"] += 1
+                continue
+            workspace = event.get("workspace") or "default"
+            event_id = event.get("event_id")
+            if event_id is not None:
+                if event_id in self._seen or event_id in batch_ids:
+                    self.stats["duplicates"] += 1
+                    continue
+                batch_ids.add(event_id)
+                event_ids.setdefault(workspace, []).append(event_id)
+            key = event.get("item_id")
+            if "status" in event and str(event["status"]).lower() in STATUS_VALUES:
+                latest[(workspace, "completed", key)] = STATUS_VALUES[str(event["status"]).lower()]
+            if "favorite" in event:
+                latest[(workspace, "favorite", key)] = bool(event["favorite"])
+
+        by_workspace = {name: [] for name in event_ids}
+        for (workspace, field, key), value in latest.items():
+            by_workspace.setdefault(workspace, []).append((field, key, value))
+        known = set(self.workspace_manager.list_names())
+        for name, changes in by_workspace.items():
+            try:
+                normalized = normalize_workspace_name(name)
+            except ValueError:
+                normalized = None
+            # Never create a workspace on behalf of a webhook sender
+            if normalized not in known:
+                self.stats["unknown"] += len(changes)
+            elif changes:
+                try:
+                    workspace = self.workspace_manager.get(normalized)
+                    items = workspace.snapshot.index.items
+                    resolved = [(field, items[key]["name"], value) for field, key, value in changes if key in items]
+                    workspace.hub.apply(resolved)
+                except Exception:
+                    logger.exception("Failed to apply %s changes to workspace %r", len(changes), normalized)
+                    continue
+                self.stats["unknown"] += len(changes) - len(resolved)
+                self.stats["applied"] += len(resolved)
+            for event_id in event_ids.get(name, ()):
+                self._seen[event_id] = None
+        while len(self._seen) > self.dedupe_size:
+            self._seen.popitem(last=False)
+        self.stats["batches"] += 1
+
+
+def _valid_event(event):
+    """Whether the fields used as keys have usable types."""
+    return (
+        isinstance(event, dict)
+        and isinstance(event.get("event_id"), (str, int, type(None)))
+        and isinstance(event.get("workspace"), (str, type(None)))
+        and isinstance(event.get("item_id"), (str, int, type(None)))
+    )
+
+
+# -- stand-in client ------------------------------------------------------
+
+async def post_events(host, port, events, batch_size=500):
+    """POST ``events`` in batches over one keep-alive connection.
+
+    Retries a batch after the advertised delay when the server answers 429.
+    Returns the number of batches that had to be retried.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    retries = 0
+    try:
+        for start in range(0, len(events), batch_size):
+            body = json.dumps({"events": events[start:start + batch_size]}).encode()
+            while True:
+                writer.write(
+                    f"POST /events HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+                )
+                await writer.drain()
+                head = await reader.readuntil(b"\r\n\r\n")
+                status = int(head.split(b" ", 2)[1])
+                length = int(head.lower().split(b"content-length:")[1].split(b"\r\n")[0])
+                payload = json.loads(await reader.readexactly(length))
+                if status != 429:
+                    break
+                retries += 1
+                await asyncio.sleep(payload.get("retry_after", 0.5))
+            if status != 202:
+                raise RuntimeError(f"Server answered {status}: {payload}")
+    finally:
+        writer.close()
+    return retries
+
+
+def synthetic_events(item_ids, count, workspace="default", seed=0):
+    rng = random.Random(seed)
+    return [
+        {
+            "event_id": f"evt-{seed}-{i}",
+            "workspace": workspace,
+            "item_id": rng.choice(item_ids),
+            "status": rng.choice(("completed", "completed", "pending")),
+            "source": rng.choice(("zapier", "make")),
+        }
+        for i in range(count)
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Webhook ingestion endpoint and stand-in client")
+    parser.add_argument("command", choices=("serve", "send"))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("AUTOMATION_HUB_INGEST_PORT", 8765)))
+    parser.add_argument("--workspace", default="default")
+    parser.add_argument("--events", type=int, default=10000, help="events to send")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--clients", type=int, default=4, help="concurrent connections")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "serve":
+        async def serve():
+            await IngestServer(WorkspaceManager(), args.host, args.port).start()
+            await asyncio.Event().wait()
+
+        asyncio.run(serve())
+        return 0
+
+    from catalog import iter_items, load_catalog
+
+    item_ids = [item["id"] for _, item in iter_items(load_catalog())]
+    events = synthetic_events(item_ids, args.events, args.workspace)
+    shards = [events[i::args.clients] for i in range(args.clients)]
+
+    async def send():
+        return await asyncio.gather(*(post_events(args.host, args.port, shard, args.batch_size) for shard in shards))
+
+    started = time.perf_counter()
+    retries = sum(asyncio.run(send()))
+    elapsed = time.perf_counter() - started
+    print(f"sent {len(events)} events in {elapsed:.2f}s ({len(events) / elapsed:,.0f}/s), {retries} retried batches")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,164 @@
+"""Background jobs for work too slow to run inside a Streamlit rerun.
+
+Jobs run on a shared thread pool. At most ``max_queued`` jobs may wait,
+and each workspace may run at most ``per_workspace`` jobs at once, so one
+location's bulk export cannot starve everyone else. A job function gets
+its ``Job`` as first argument to report progress and check for
+cancellation::
+
+    def export(job, rows):
+        for i, row in enumerate(rows):
+            job.check_cancelled()
+            job.report(i / len(rows), "Writing rows")
+        return csv_text
+
+    job = job_manager.submit("downtown", "Export report", export, rows)
+
+The session keeps only ``job.id``; each rerun looks the job up, which is a
+dict lookup, and never waits on it.
+"""
+import itertools
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, job_id, workspace, name, fn, args, kwargs):
+        self.id = job_id
+        self.workspace = workspace
+        self.name = name
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = ""
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self._fn = fn
+        self._args = args
+        self._kwargs = kwargs
+        self._cancel = threading.Event()
+
+    @property
+    def active(self):
+        return self.status in (QUEUED, RUNNING)
+
+    def report(self, progress, message=""):
+        self.progress = min(max(progress, 0.0), 1.0)
+        if message:
+            self.message = message
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancel_requested(self):
+        return self._cancel.is_set()
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+
+class JobManager:
+    def __init__(self, max_workers=4, max_queued=64, per_workspace=2, keep_finished=15 * 60):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.per_workspace = per_workspace
+        self.keep_finished = keep_finished
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._ids = itertools.count(1)
+        self._jobs = {}
+        self._pending = deque()
+        self._running = {}
+        self._lock = threading.Lock()
+
+    def submit(self, workspace, name, fn, *args, **kwargs):
+        with self._lock:
+            self._prune()
+            if len(self._pending) >= self.max_queued:
+                raise JobQueueFull(f"{len(self._pending)} jobs are already waiting")
+            job = Job(next(self._ids), workspace, name, fn, args, kwargs)
+            self._jobs[job.id] = job
+            self._pending.append(job)
+            self._dispatch()
+        return job
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def jobs(self, job_ids):
+        return [job for job in map(self._jobs.get, job_ids) if job is not None]
+
+    def cancel(self, job_id):
+        """Cancel a job; queued jobs stop at once, running ones at their next check."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or not job.active:
+                return False
+            job.cancel()
+            if job.status == QUEUED:
+                self._pending.remove(job)
+                self._finish(job, CANCELLED)
+            return True
+
+    def shutdown(self):
+        with self._lock:
+            for job in list(self._pending):
+                self._finish(job, CANCELLED)
+            self._pending.clear()
+            for job in self._jobs.values():
+                job.cancel()
+        self._executor.shutdown(wait=True)
+
+    def _dispatch(self):
+        running = sum(self._running.values())
+        for job in list(self._pending):
+            if running >= self.max_workers:
+                break
+            if self._running.get(job.workspace, 0) >= self.per_workspace:
+                continue
+            self._pending.remove(job)
+            self._running[job.workspace] = self._running.get(job.workspace, 0) + 1
+            running += 1
+            job.status = RUNNING
+            self._executor.submit(self._run, job)
+
+    def _run(self, job):
+        try:
+            job.check_cancelled()
+            job.result = job._fn(job, *job._args, **job._kwargs)
+            status = DONE
+        except JobCancelled:
+            status = CANCELLED
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            status = FAILED
+        with self._lock:
+            self._running[job.workspace] -= 1
+            self._finish(job, status)
+            self._dispatch()
+
+    def _finish(self, job, status):
+        job.status = status
+        job.finished = time.time()
+        if status == DONE:
+            job.progress = 1.0
+        job._fn = job._args = job._kwargs = None
+
+    def _prune(self):
+        cutoff = time.time() - self.keep_finished
+        for job_id in [key for key, job in self._jobs.items() if job.finished and job.finished < cutoff]:
+            del self._jobs[job_id]
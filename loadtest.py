@@ -0,0 +1,214 @@
+"""Multi-session load and soak harness for app.py.
+
+Drives N simulated sessions, each an ``AppTest`` instance that replays
+checklist interactions (filter changes, toggling Complete and Favorite,
+typing notes). Reports rerun latency percentiles, throughput and how each
+session's ``st.session_state`` grows as notes and implementation dates
+accumulate.
+
+    python loadtest.py --sessions 20 --steps 50
+    python loadtest.py --sessions 40 --workers 4 --duration 600   # soak
+
+Sessions are spread over ``--workers`` processes. ``AppTest`` drives a
+process-global runtime, so sessions inside one worker take turns, one rerun
+at a time, and share ``st.cache_resource`` (catalog, workspaces, sync hubs)
+just like the sessions of a single Streamlit server process do.
+"""
+import argparse
+import json
+import os
+import pickle
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+# Session keys that hold user progress; everything else is widget state
+PROGRESS_KEYS = (
+    "completed_automations",
+    "favorite_automations",
+    "priority_levels",
+    "implementation_dates",
+)
+
+NOTE_WORDS = ("call", "vendor", "zap", "template", "tested", "crew", "client", "follow", "up", "ok")
+
+
+def session_state_bytes(at):
+    """Pickled size of the session's progress and of its whole state."""
+    state = at.session_state
+    progress = {key: state[key] for key in PROGRESS_KEYS if key in state}
+    everything = dict(progress)
+    for key in state:
+        everything.setdefault(key, state[key])
+    return len(pickle.dumps(progress)), len(pickle.dumps(everything))
+
+
+def _widget(widgets, label):
+    return next((widget for widget in widgets if widget.label == label), None)
+
+
+def _step(at, rng):
+    """Apply one random interaction to ``at`` and return its name."""
+    action = rng.choices(
+        ("filter", "search", "complete", "favorite", "note"),
+        weights=(2, 1, 3, 2, 3),
+    )[0]
+    if action == "filter":
+        widget = _widget(at.selectbox, rng.choice(("Difficulty Level:", "ROI Potential:")))
+        widget.set_value(rng.choice(widget.options))
+    elif action == "search":
+        _widget(at.text_input, "🔎 Search:").input(rng.choice(("", "email", "route", "invoice", "sms")))
+    elif action in ("complete", "favorite"):
+        boxes = [box for box in at.checkbox if box.label == ("Complete" if action == "complete" else "Favorite")]
+        if not boxes:
+            return "noop"
+        box = rng.choice(boxes)
+        box.set_value(not box.value)
+    else:
+        areas = list(at.text_area)
+        if not areas or rng.random() < 0.3:
+            # Notes editors only render once opened
+            toggles = [toggle for toggle in at.toggle if toggle.label == "📝 Implementation Notes" and not toggle.value]
+            if not toggles:
+                return "noop"
+            rng.choice(toggles).set_value(True)
+            return "open-note"
+        area = rng.choice(areas)
+        words = " ".join(rng.choice(NOTE_WORDS) for _ in range(rng.randint(5, 40)))
+        area.input(f"{area.value}\n{words}".strip())
+    return action
+
+
+def run_worker(session_ids, steps, duration, seed, timeout):
+    """Run ``session_ids`` round-robin in this process; one result per session."""
+    from streamlit.testing.v1 import AppTest
+
+    sessions = []
+    started = time.perf_counter()
+    for session_id in session_ids:
+        at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        tick = time.perf_counter()
+        at.run()
+        progress, total = session_state_bytes(at)
+        sessions.append({
+            "session": session_id,
+            "app": at,
+            "rng": random.Random(seed + session_id),
+            "latencies": [time.perf_counter() - tick],
+            "errors": len(at.exception),
+            "progress_bytes": [progress],
+            "state_bytes": [total],
+        })
+
+    done = 0
+    while (duration and time.perf_counter() - started < duration) or (not duration and done < steps):
+        for session in sessions:
+            at = session["app"]
+            _step(at, session["rng"])
+            tick = time.perf_counter()
+            at.run()
+            session["latencies"].append(time.perf_counter() - tick)
+            session["errors"] += len(at.exception)
+        done += 1
+
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results = []
+    for session in sessions:
+        progress, total = session_state_bytes(session.pop("app"))
+        session.pop("rng")
+        session["progress_bytes"].append(progress)
+        session["state_bytes"].append(total)
+        session["worker_max_rss_kb"] = rss_kb
+        results.append(session)
+    return results
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(results, wall_time):
+    latencies = [value for result in results for value in result["latencies"]]
+    progress_growth = [result["progress_bytes"][-1] - result["progress_bytes"][0] for result in results]
+    growth = [result["state_bytes"][-1] - result["state_bytes"][0] for result in results]
+    worker_rss = {result["worker_max_rss_kb"] for result in results}
+    return {
+        "sessions": len(results),
+        "reruns": len(latencies),
+        "errors": sum(result["errors"] for result in results),
+        "wall_time_s": wall_time,
+        "throughput_rps": len(latencies) / wall_time if wall_time else 0.0,
+        "latency_ms": {
+            f"p{pct}": percentile(latencies, pct) * 1000 for pct in (50, 95, 99)
+        } | {"max": max(latencies, default=0.0) * 1000},
+        "progress_bytes_final": {
+            "mean": statistics.fmean(result["progress_bytes"][-1] for result in results),
+            "max": max(result["progress_bytes"][-1] for result in results),
+        },
+        "progress_bytes_growth": {
+            "mean": statistics.fmean(progress_growth),
+            "max": max(progress_growth),
+        },
+        "state_bytes_growth": {
+            "mean": statistics.fmean(growth),
+            "max": max(growth),
+        },
+        "worker_max_rss_mb": max(worker_rss) / 1024,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--steps", type=int, default=30, help="interactions per session")
+    parser.add_argument("--duration", type=float, default=0, help="soak: seconds per session (overrides --steps)")
+    parser.add_argument("--workers", type=int, default=0, help="worker processes (default: one per CPU)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=60, help="per-rerun timeout in seconds")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    # Keep simulated progress out of the real workspaces directory
+    os.environ.setdefault("AUTOMATION_HUB_WORKSPACES", tempfile.mkdtemp(prefix="hub-loadtest-"))
+
+    workers = max(1, min(args.workers or os.cpu_count() or 1, args.sessions))
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(run_worker, list(range(i, args.sessions, workers)),
+                            args.steps, args.duration, args.seed, args.timeout)
+            for i in range(workers)
+        ]
+        results = [result for future in futures for result in future.result()]
+    summary = summarize(results, time.perf_counter() - started)
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return 0
+    print(f"{summary['sessions']} sessions, {summary['reruns']} reruns in {summary['wall_time_s']:.1f}s "
+          f"({summary['throughput_rps']:.1f} reruns/s), {summary['errors']} errors")
+    print("rerun latency ms: " + ", ".join(f"{k}={v:.0f}" for k, v in summary["latency_ms"].items()))
+    print(f"progress state per session: mean {summary['progress_bytes_final']['mean']:,.0f} B, "
+          f"max {summary['progress_bytes_final']['max']:,} B")
+    print(f"progress state growth: mean {summary['progress_bytes_growth']['mean']:,.0f} B, "
+          f"max {summary['progress_bytes_growth']['max']:,} B")
+    print(f"session_state growth (incl. widgets): mean {summary['state_bytes_growth']['mean']:,.0f} B, "
+          f"max {summary['state_bytes_growth']['max']:,} B")
+    print(f"worker peak RSS: {summary['worker_max_rss_mb']:,.0f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""Implementation notes kept out of ``st.session_state``.
+
+Notes are stored per workspace in a small SQLite file. Long notes are
+zlib-compressed. The app reads a note only when its editor is opened and
+writes it back only when it is edited, so neither session memory nor the
+rerun payload grows with the amount of text people write.
+"""
+import os
+import sqlite3
+import threading
+import zlib
+from datetime import datetime
+
+# Notes longer than this (in UTF-8 bytes) are stored compressed
+COMPRESS_THRESHOLD = 256
+
+
+class NoteStore:
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS notes ("
+            " name TEXT PRIMARY KEY, body BLOB NOT NULL,"
+            " compressed INTEGER NOT NULL, updated TEXT NOT NULL)"
+        )
+        self._conn.commit()
+        # Names only: lets the checklist flag items with notes without reading them
+        self._names = {row[0] for row in self._conn.execute("SELECT name FROM notes")}
+
+    def __contains__(self, name):
+        return name in self._names
+
+    def __len__(self):
+        return len(self._names)
+
+    def names(self):
+        return set(self._names)
+
+    def get(self, name):
+        if name not in self._names:
+            return ""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, compressed FROM notes WHERE name = ?", (name,)
+            ).fetchone()
+        return _decode(*row) if row else ""
+
+    def all(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT name, body, compressed FROM notes").fetchall()
+        return {name: _decode(body, compressed) for name, body, compressed in rows}
+
+    def put(self, name, text):
+        self.put_many({name: text})
+
+    def put_many(self, notes):
+        """Write several notes in one transaction; empty text deletes a note."""
+        now = datetime.now().isoformat()
+        with self._lock, self._conn:
+            for name, text in notes.items():
+                if text:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO notes (name, body, compressed, updated) VALUES (?, ?, ?, ?)",
+                        (name, *_encode(text), now),
+                    )
+                    self._names.add(name)
+                else:
+                    self._conn.execute("DELETE FROM notes WHERE name = ?", (name,))
+                    self._names.discard(name)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _encode(text):
+    raw = text.encode("utf-8")
+    if len(raw) > COMPRESS_THRESHOLD:
+        packed = zlib.compress(raw, 6)
+        if len(packed) < len(raw):
+            return packed, 1
+    return raw, 0
+
+
+def _decode(body, compressed):
+    raw = zlib.decompress(body) if compressed else body
+    return bytes(raw).decode("utf-8")
@@ -0,0 +1,645 @@
+"""Outbound SMS and email notifications.
+
+Backs the message items: "Day-before job confirmation SMS/email", "Send
+ETA texts to clients 1 hour before arrival", "Weekly email newsletter
+automation", "Job status updates via SMS" and the like.
+
+* Messages name a template from ``TEMPLATES`` plus its fields; they are
+  rendered with precompiled ``string.Template`` objects when sent.
+* ``Outbox`` is a SQLite table of every message and its state. Enqueueing
+  is idempotent on the message id, and dispatch workers *claim* small
+  batches with a lease, so nothing is lost if the process stops
+  mid-send and memory never holds more than the batches in flight.
+* ``NotificationDispatcher`` runs asyncio workers per channel. Each claims
+  a batch, waits for the channel's ``TokenBucket``, sends the batch in
+  one transport call and settles the results. Temporary failures come
+  back after an exponential backoff with full jitter, up to
+  ``max_attempts``.
+* ``SmtpTransport`` speaks plain SMTP, several messages per connection;
+  ``HttpTransport`` POSTs JSON batches. ``LocalSmtpServer`` and
+  ``LocalHttpGateway`` are local stand-ins for an email provider
+  (Mailchimp) and an SMS API (Twilio), with an optional failure rate.
+
+    python notify.py bench --messages 20000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import resource
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import deque, namedtuple
+from string import Template
+
+logger = logging.getLogger(__name__)
+
+SMS, EMAIL = "sms", "email"
+PENDING, SENDING, SENT, FAILED = "pending", "sending", "sent", "failed"
+
+Message = namedtuple("Message", ["id", "channel", "to", "template", "data"])
+Claimed = namedtuple("Claimed", ["message", "attempts"])
+Delivery = namedtuple("Delivery", ["id", "ok", "retry", "error"])
+
+# Template name -> (email subject, body); SMS sends the body only
+TEMPLATES = {
+    "day_before": (
+        Template("Reminder: your $service is tomorrow at $time"),
+        Template("Hi $name, this is a reminder that your $service is tomorrow at $time. Reply C to confirm."),
+    ),
+    "eta": (
+        Template("Your cleaner is on the way"),
+        Template("Hi $name, $cleaner is on the way and should arrive around $time."),
+    ),
+    "job_status": (
+        Template("Job update: $status"),
+        Template("Hi $name, your $service is now $status."),
+    ),
+    "newsletter": (
+        Template("$month cleaning tips from $business"),
+        Template("Hi $name,\n\nHere are this month's cleaning tips and offers from $business."),
+    ),
+}
+
+
+def render(message):
+    """``(subject, body)`` for ``message``; raises KeyError for a missing template or field."""
+    subject, body = TEMPLATES[message.template]
+    data = message.data
+    return subject.substitute(data), body.substitute(data)
+
+
+# -- outbox ---------------------------------------------------------------
+
+class Outbox:
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            " id TEXT PRIMARY KEY, channel TEXT NOT NULL, recipient TEXT NOT NULL,"
+            " template TEXT NOT NULL, data TEXT NOT NULL, status TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0, next_attempt REAL NOT NULL,"
+            " error TEXT, created REAL NOT NULL, sent REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS outbox_due ON outbox (channel, status, next_attempt)")
+        self._conn.commit()
+
+    def enqueue(self, messages, at=None):
+        """Queue ``messages`` to go out from ``at`` (default now); returns how many were new."""
+        now = time.time()
+        at = now if at is None else at
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO outbox (id, channel, recipient, template, data, status, next_attempt, created)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                ((m.id, m.channel, m.to, m.template, json.dumps(m.data), PENDING, at, now) for m in messages),
+            )
+            self._conn.commit()
+            return self._conn.total_changes - before
+
+    def claim(self, channel, now, limit, lease=60.0):
+        """Up to ``limit`` due messages, leased to the caller for ``lease`` seconds."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, recipient, template, data, attempts FROM outbox"
+                " WHERE channel = ? AND status IN (?, ?) AND next_attempt <= ?"
+                " ORDER BY next_attempt LIMIT ?",
+                (channel, PENDING, SENDING, now, limit),  # an expired SENDING lease means a lost worker
+            ).fetchall()
+            if not rows:
+                return []
+            self._conn.executemany(
+                "UPDATE outbox SET status = ?, next_attempt = ?, attempts = attempts + 1 WHERE id = ?",
+                ((SENDING, now + lease, row[0]) for row in rows),
+            )
+            self._conn.commit()
+        return [Claimed(Message(key, channel, to, template, json.loads(data)), attempts + 1)
+                for key, to, template, data, attempts in rows]
+
+    def settle(self, sent, retry, failed, now):
+        """Record outcomes: ``sent`` ids, ``retry`` ``(id, next attempt, error)``, ``failed`` ``(id, error)``."""
+        with self._lock:
+            self._conn.executemany("UPDATE outbox SET status = ?, sent = ?, error = NULL WHERE id = ?",
+                                   ((SENT, now, key) for key in sent))
+            self._conn.executemany("UPDATE outbox SET status = ?, next_attempt = ?, error = ? WHERE id = ?",
+                                   ((PENDING, at, error, key) for key, at, error in retry))
+            self._conn.executemany("UPDATE outbox SET status = ?, error = ? WHERE id = ?",
+                                   ((FAILED, error, key) for key, error in failed))
+            self._conn.commit()
+
+    def counts(self):
+        """``{(channel, status): count}``."""
+        with self._lock:
+            rows = self._conn.execute("SELECT channel, status, COUNT(*) FROM outbox GROUP BY channel, status").fetchall()
+        return {(channel, status): count for channel, status, count in rows}
+
+    def unsettled(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM outbox WHERE status IN (?, ?)",
+                                      (PENDING, SENDING)).fetchone()[0]
+
+    def failures(self, limit=20):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT id, channel, recipient, attempts, error FROM outbox WHERE status = ? ORDER BY created DESC LIMIT ?",
+                (FAILED, limit),
+            ).fetchall()
+
+    def purge_sent(self, older_than):
+        """Delete messages sent before ``older_than`` (a timestamp); returns how many."""
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM outbox WHERE status = ? AND sent < ?", (SENT, older_than)).rowcount
+            self._conn.commit()
+        return deleted
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# -- rate limiting --------------------------------------------------------
+
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        """``rate`` tokens per second, holding at most ``capacity`` (default: one second's worth)."""
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, n=1):
+        if n > self.capacity:
+            raise ValueError(f"Cannot take {n} tokens from a bucket of {self.capacity:g}")
+        async with self._lock:  # first come, first served
+            self._refill()
+            while self.tokens < n:
+                await asyncio.sleep((n - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= n
+
+
+# -- transports -----------------------------------------------------------
+
+class SmtpTransport:
+    """Plain SMTP client that sends each batch over one connection."""
+
+    def __init__(self, host, port, sender="hello@sparkle-cleaning.example", timeout=10.0):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.timeout = timeout
+        self._reader = self._writer = None
+        self._lock = asyncio.Lock()
+
+    async def _command(self, line):
+        if line is not None:
+            self._writer.write(line.encode("utf-8") + b"\r\n")
+            await self._writer.drain()
+        while True:
+            reply = await asyncio.wait_for(self._reader.readline(), self.timeout)
+            if not reply:
+                raise ConnectionError("SMTP server closed the connection")
+            if reply[3:4] != b"-":  # last line of a multi-line reply
+                return int(reply[:3]), reply[4:].decode("utf-8", "replace").strip()
+
+    async def _connect(self):
+        self._reader, self._writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.timeout)
+        await self._command(None)
+        await self._command("EHLO automation-hub")
+
+    async def send_batch(self, items):
+        """``items`` are ``(message, subject, body)``; returns one ``Delivery`` each."""
+        async with self._lock:
+            if self._writer is None or self._writer.is_closing():
+                await self._connect()
+            results = []
+            try:
+                for message, subject, body in items:
+                    results.append(await self._send_one(message, subject, body))
+            except (OSError, asyncio.TimeoutError, ConnectionError) as e:
+                self._writer = None
+                done = {result.id for result in results}
+                results += [Delivery(m.id, False, True, f"connection: {e}") for m, _, _ in items if m.id not in done]
+            return results
+
+    async def _send_one(self, message, subject, body):
+        code, text = await self._command(f"MAIL FROM:<{self.sender}>")
+        if code == 250:
+            code, text = await self._command(f"RCPT TO:<{message.to}>")
+        if code == 250:
+            code, text = await self._command("DATA")
+            if code == 354:
+                lines = [f"From: {self.sender}", f"To: {message.to}", f"Subject: {subject}",
+                         f"Message-ID: <{message.id}@automation-hub>", ""] + body.split("\n")
+                payload = "\r\n".join("." + line if line.startswith(".") else line for line in lines)
+                code, text = await self._command(payload + "\r\n.")
+        if code == 250:
+            return Delivery(message.id, True, False, None)
+        await self._command("RSET")
+        return Delivery(message.id, False, 400 <= code < 500, f"{code} {text}")
+
+    async def close(self):
+        if self._writer is not None and not self._writer.is_closing():
+            try:
+                await self._command("QUIT")
+            except (OSError, asyncio.TimeoutError, ConnectionError):
+                pass
+            self._writer.close()
+
+
+class HttpTransport:
+    """POSTs ``{"messages": [...]}`` batches as JSON over a keep-alive connection."""
+
+    def __init__(self, host, port, path="/messages", timeout=10.0):
+        self.host = host
+        self.port = port
+        self.path = path
+        self.timeout = timeout
+        self._reader = self._writer = None
+        self._lock = asyncio.Lock()
+
+    async def send_batch(self, items):
+        body = json.dumps({"messages": [{"id": m.id, "to": m.to, "body": text} for m, _, text in items]}).encode()
+        async with self._lock:
+            try:
+                if self._writer is None or self._writer.is_closing():
+                    self._reader, self._writer = await asyncio.wait_for(
+                        asyncio.open_connection(self.host, self.port), self.timeout)
+                self._writer.write(
+                    f"POST {self.path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+                )
+                await self._writer.drain()
+                head = await asyncio.wait_for(self._reader.readuntil(b"\r\n\r\n"), self.timeout)
+                status = int(head.split(b" ", 2)[1])
+                length = int(head.lower().split(b"content-length:")[1].split(b"\r\n")[0])
+                payload = json.loads(await self._reader.readexactly(length))
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError, ValueError) as e:
+                self._writer = None
+                return [Delivery(m.id, False, True, f"connection: {e}") for m, _, _ in items]
+        if status != 200:
+            retry = status == 429 or status >= 500
+            return [Delivery(m.id, False, retry, f"HTTP {status}") for m, _, _ in items]
+        return [Delivery(r["id"], r["status"] == "sent", False, r.get("error")) for r in payload["results"]]
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+# -- dispatcher -----------------------------------------------------------
+
+class NotificationDispatcher:
+    def __init__(self, outbox, transports, limits, batch_size=50, concurrency=2, max_attempts=5,
+                 base_delay=1.0, max_delay=300.0, lease=60.0, poll_interval=0.25, seed=None):
+        """``transports`` and ``limits`` map a channel to its transport and ``(rate per second, burst)``."""
+        self.outbox = outbox
+        self.transports = transports
+        self.limits = limits
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self.stats = {"sent": 0, "retried": 0, "failed": 0, "batches": 0}
+        self._rng = random.Random(seed)
+        self._buckets = {}
+        self._tasks = []
+        self._wake = None
+        self._loop = None
+        self._thread = None
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        for channel in self.transports:
+            rate, burst = self.limits[channel]
+            self._buckets[channel] = TokenBucket(rate, burst)
+            for _ in range(self.concurrency):
+                self._tasks.append(asyncio.create_task(self._worker(channel)))
+        return self
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for transport in self.transports.values():
+            await transport.close()
+
+    def wake(self):
+        """Tell idle workers new messages are queued; safe from any thread."""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def enqueue(self, messages, at=None):
+        added = self.outbox.enqueue(messages, at)
+        self.wake()
+        return added
+
+    def backoff(self, attempts):
+        """Full jitter: uniform in ``[0, min(max_delay, base_delay * 2**attempts))``."""
+        return self._rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempts))
+
+    async def _worker(self, channel):
+        loop = asyncio.get_running_loop()
+        bucket = self._buckets[channel]
+        size = max(1, min(self.batch_size, int(bucket.capacity)))
+        transport = self.transports[channel]
+        while True:
+            try:
+                claimed = await loop.run_in_executor(None, self.outbox.claim, channel, time.time(), size, self.lease)
+                if not claimed:
+                    self._wake.clear()
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                await bucket.acquire(len(claimed))
+                items, failed = [], []
+                for claim in claimed:
+                    try:
+                        items.append((claim.message,) + render(claim.message))
+                    except (KeyError, ValueError) as e:
+                        failed.append((claim.message.id, f"template: {e}"))
+                results = await transport.send_batch(items) if items else []
+                await loop.run_in_executor(None, self._settle, claimed, results, failed)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Notification worker for %s failed; retrying", channel)
+                await asyncio.sleep(self.poll_interval)
+
+    def _settle(self, claimed, results, failed):
+        now = time.time()
+        attempts = {claim.message.id: claim.attempts for claim in claimed}
+        sent, retry = [], []
+        for result in results:
+            if result.ok:
+                sent.append(result.id)
+            elif result.retry and attempts[result.id] < self.max_attempts:
+                retry.append((result.id, now + self.backoff(attempts[result.id]), result.error))
+            else:
+                failed.append((result.id, result.error))
+        self.outbox.settle(sent, retry, failed, now)
+        self.stats["sent"] += len(sent)
+        self.stats["retried"] += len(retry)
+        self.stats["failed"] += len(failed)
+        self.stats["batches"] += 1
+
+
+# -- local stand-ins ------------------------------------------------------
+
+class LocalSmtpServer:
+    """Accepts SMTP on localhost and keeps the last few messages; stands in for the email provider."""
+
+    def __init__(self, host="127.0.0.1", port=0, failure_rate=0.0, keep=50, seed=None):
+        self.host = host
+        self.port = port
+        self.failure_rate = failure_rate
+        self.received = 0
+        self.recent = deque(maxlen=keep)
+        self._rng = random.Random(seed)
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        def reply(line):
+            writer.write(line.encode() + b"\r\n")
+
+        reply("220 localhost ESMTP stand-in")
+        recipient = None
+        try:
+            while True:
+                line = (await reader.readline()).decode("utf-8", "replace").rstrip("\r\n")
+                if not line:
+                    break
+                verb = line[:4].upper()
+                if verb in ("EHLO", "HELO"):
+                    reply("250-localhost")
+                    reply("250 8BITMIME")
+                elif verb == "MAIL":
+                    recipient = None
+                    reply("250 OK")
+                elif verb == "RCPT":
+                    recipient = line.split(":", 1)[1].strip().strip("<>")
+                    if "@" not in recipient:
+                        reply("550 No such user")
+                        recipient = None
+                    elif self._rng.random() < self.failure_rate:
+                        reply("451 Try again later")
+                        recipient = None
+                    else:
+                        reply("250 OK")
+                elif verb == "DATA":
+                    reply("354 End data with <CR><LF>.<CR><LF>")
+                    await writer.drain()
+                    lines = []
+                    while True:
+                        data = (await reader.readline()).decode("utf-8", "replace").rstrip("\r\n")
+                        if data == ".":
+                            break
+                        lines.append(data[1:] if data.startswith("..") else data)
+                    self.received += 1
+                    subject = next((l[9:] for l in lines if l.startswith("Subject: ")), "")
+                    self.recent.append({"to": recipient, "subject": subject})
+                    reply("250 Queued")
+                elif verb == "RSET":
+                    recipient = None
+                    reply("250 OK")
+                elif verb == "QUIT":
+                    reply("221 Bye")
+                    await writer.drain()
+                    break
+                else:
+                    reply("502 Command not implemented")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+class LocalHttpGateway:
+    """Accepts ``POST /messages`` JSON batches; stands in for the SMS API."""
+
+    def __init__(self, host="127.0.0.1", port=0, failure_rate=0.0, keep=50, seed=None):
+        self.host = host
+        self.port = port
+        self.failure_rate = failure_rate
+        self.received = 0
+        self.recent = deque(maxlen=keep)
+        self._rng = random.Random(seed)
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                length = int(head.lower().split(b"content-length:")[1].split(b"\r\n")[0])
+                body = json.loads(await reader.readexactly(length))
+                if self._rng.random() < self.failure_rate:
+                    status, payload = 503, {"error": "temporarily unavailable"}
+                else:
+                    status, payload = 200, {"results": [self._accept(m) for m in body["messages"]]}
+                data = json.dumps(payload).encode()
+                writer.write(f"HTTP/1.1 {status} {'OK' if status == 200 else 'Service Unavailable'}\r\n"
+                             f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data)
+                await writer.drain()
+        finally:
+            writer.close()
+
+    def _accept(self, message):
+        if sum(ch.isdigit() for ch in message["to"]) < 10:
+            return {"id": message["id"], "status": "rejected", "error": "invalid phone number"}
+        self.received += 1
+        self.recent.append({"to": message["to"], "body": message["body"]})
+        return {"id": message["id"], "status": "sent"}
+
+
+class LocalStack:
+    """Stand-in providers plus a dispatcher on their own event loop thread."""
+
+    def __init__(self, outbox, limits=None, failure_rate=0.0, **dispatcher_options):
+        self.outbox = outbox
+        self.limits = limits or {SMS: (10.0, 20), EMAIL: (20.0, 50)}
+        self.smtp = LocalSmtpServer(failure_rate=failure_rate)
+        self.gateway = LocalHttpGateway(failure_rate=failure_rate)
+        self.dispatcher_options = dispatcher_options
+        self.dispatcher = None
+        self._loop = None
+        self._thread = None
+
+    async def start(self):
+        await self.smtp.start()
+        await self.gateway.start()
+        transports = {SMS: HttpTransport(self.gateway.host, self.gateway.port),
+                      EMAIL: SmtpTransport(self.smtp.host, self.smtp.port)}
+        self.dispatcher = await NotificationDispatcher(self.outbox, transports, self.limits,
+                                                       **self.dispatcher_options).start()
+        return self
+
+    async def stop(self):
+        await self.dispatcher.stop()
+        await self.smtp.stop()
+        await self.gateway.stop()
+
+    def start_in_thread(self):
+        started = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.start())
+            started.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="notifications", daemon=True)
+        self._thread.start()
+        started.wait()
+        return self
+
+    def stop_thread(self):
+        asyncio.run_coroutine_threadsafe(self.stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+
+# -- synthetic messages ---------------------------------------------------
+
+_NAMES = ("Ana", "Ben", "Chloe", "Dev", "Elena", "Farah", "Gus", "Hana", "Ivan", "Jade")
+
+
+def synthetic_messages(n, template="day_before", channels=(SMS, EMAIL), prefix="msg", seed=0):
+    """``n`` messages to made-up clients, alternating ``channels``; a few have bad addresses."""
+    rng = random.Random(seed)
+    messages = []
+    for i in range(n):
+        channel = channels[i % len(channels)]
+        name = rng.choice(_NAMES)
+        if channel == SMS:
+            to = f"+1614555{rng.randrange(10000):04d}" if rng.random() > 0.01 else "555-01"
+        else:
+            to = f"{name.lower()}{i}@example.com" if rng.random() > 0.01 else f"{name.lower()}{i}"
+        data = {"name": name, "service": "standard clean", "time": f"{rng.randrange(8, 17)}:00",
+                "cleaner": rng.choice(_NAMES), "status": "complete", "month": "November",
+                "business": "Sparkle Cleaning Co."}
+        messages.append(Message(f"{prefix}-{i + 1}", channel, to, template, data))
+    return messages
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dispatch synthetic notifications through the local stand-ins")
+    parser.add_argument("command", choices=("bench",))
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--sms-rate", type=float, default=500.0, help="SMS per second")
+    parser.add_argument("--email-rate", type=float, default=500.0, help="emails per second")
+    parser.add_argument("--failure-rate", type=float, default=0.02)
+    parser.add_argument("--outbox", default=None, help="SQLite file (default: a temporary one)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    path = args.outbox or os.path.join(tempfile.mkdtemp(), "outbox.db")
+    outbox = Outbox(path)
+    limits = {SMS: (args.sms_rate, args.sms_rate), EMAIL: (args.email_rate, args.email_rate)}
+
+    async def bench():
+        stack = await LocalStack(outbox, limits, args.failure_rate, batch_size=100, base_delay=0.05,
+                                 max_delay=1.0).start()
+        started = time.perf_counter()
+        stack.dispatcher.enqueue(synthetic_messages(args.messages))
+        while outbox.unsettled():
+            await asyncio.sleep(0.1)
+        elapsed = time.perf_counter() - started
+        await stack.stop()
+        return stack, elapsed
+
+    stack, elapsed = asyncio.run(bench())
+    stats = stack.dispatcher.stats
+    print(f"{args.messages:,} messages in {elapsed:.1f}s ({args.messages / elapsed * 3600:,.0f}/hour): "
+          f"{stats['sent']:,} sent, {stats['retried']:,} retries, {stats['failed']:,} failed "
+          f"in {stats['batches']:,} batches")
+    print(f"stand-ins received {stack.gateway.received:,} SMS and {stack.smtp.received:,} emails; "
+          f"peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
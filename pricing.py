@@ -0,0 +1,318 @@
+"""Quote and estimate pricing from a rate card.
+
+Backs "Automated quote generator", "Estimate calculator form with
+automatic email follow-up", "Auto-calculate travel surcharges" and
+"First-time discount automatically applied". A rate card (a plain dict,
+``DEFAULT_RATE_CARD``) sets per-service base fees and graduated
+per-square-foot rates, frequency multipliers, add-on prices, travel
+distance bands, the first-time discount, promo codes, a minimum charge
+and the sales tax rate.
+
+``PricingEngine`` compiles the card into lookup tables once: cumulative
+square-footage prices per service and band, an add-on price for every
+add-on combination (add-ons are a bitmask), travel band edges and promo
+columns. Pricing a batch is then ``searchsorted`` plus fancy indexing
+over whole columns; ``encode`` turns requests into those columns once, so
+re-pricing the whole client base after a rate change only reruns
+``price_columns``. ``quote`` prices one request with ``bisect`` and dict
+lookups for the estimate form.
+
+Pricing order: labor (base + square footage, times the frequency
+multiplier) plus add-ons, minus the larger of the first-time discount
+and the promo (never below the minimum), topped up to the minimum
+(``minimum_fee``) when the job itself is smaller; then the travel
+surcharge; then tax. Requests beyond the last travel band are not serviceable.
+
+    python pricing.py --quotes 100000
+"""
+import argparse
+import copy
+import time
+from bisect import bisect_right
+from collections import namedtuple
+
+import numpy as np
+
+from routing import haversine_row
+
+QuoteRequest = namedtuple(
+    "QuoteRequest", ["id", "service", "sqft", "frequency", "addons", "lat", "lon", "first_time", "promo"],
+    defaults=((), None, None, False, ""),
+)
+Quote = namedtuple(
+    "Quote", ["id", "serviceable", "labor", "addons", "discount", "minimum_fee", "travel", "tax", "total",
+              "distance_km"]
+)
+
+DEFAULT_DEPOT = (39.96, -83.0)
+
+DEFAULT_RATE_CARD = {
+    # Base fee, then $/sqft for each band starting at the matching sqft_edges value
+    "services": {
+        "Standard clean": {"base": 60.0, "rates": [0.090, 0.070, 0.055, 0.045]},
+        "Deep clean": {"base": 90.0, "rates": [0.140, 0.110, 0.090, 0.075]},
+        "Move-out": {"base": 110.0, "rates": [0.160, 0.130, 0.100, 0.085]},
+        "Commercial": {"base": 120.0, "rates": [0.110, 0.090, 0.070, 0.050]},
+        "Post-construction": {"base": 150.0, "rates": [0.200, 0.170, 0.140, 0.120]},
+    },
+    "sqft_edges": [0, 1000, 2000, 3500],
+    "frequency": {"One-time": 1.0, "Monthly": 0.92, "Biweekly": 0.87, "Weekly": 0.82},
+    "addons": {
+        "Inside fridge": 35.0, "Inside oven": 35.0, "Interior windows": 45.0,
+        "Inside cabinets": 40.0, "Laundry": 25.0, "Baseboards": 30.0,
+    },
+    # Surcharge for each band starting at the matching travel_edges_km value; none past max_km
+    "travel_edges_km": [0, 15, 25, 40],
+    "travel_surcharge": [0.0, 15.0, 30.0, 50.0],
+    "max_km": 60.0,
+    "first_time_discount": 0.15,
+    "promos": {"SPRING10": {"percent": 0.10}, "WELCOME20": {"amount": 20.0}},
+    "minimum": 90.0,
+    "tax_rate": 0.0725,
+}
+
+MAX_ADDONS = 16  # the add-on table has 2**len(addons) entries
+
+
+def adjust_rates(card, percent):
+    """Copy of ``card`` with base fees, sqft rates and add-ons changed by ``percent``."""
+    card = copy.deepcopy(card)
+    factor = 1 + percent / 100
+    for service in card["services"].values():
+        service["base"] *= factor
+        service["rates"] = [rate * factor for rate in service["rates"]]
+    card["addons"] = {name: price * factor for name, price in card["addons"].items()}
+    return card
+
+
+class PricingEngine:
+    def __init__(self, card=None, depot=DEFAULT_DEPOT):
+        card = DEFAULT_RATE_CARD if card is None else card
+        self.card = card
+        self.depot = depot
+        self.services = list(card["services"])
+        self.service_index = {name: i for i, name in enumerate(self.services)}
+        self.frequencies = list(card["frequency"])
+        self.frequency_index = {name: i for i, name in enumerate(self.frequencies)}
+        self.addon_names = list(card["addons"])
+        if len(self.addon_names) > MAX_ADDONS:
+            raise ValueError(f"At most {MAX_ADDONS} add-ons are supported")
+        self.addon_bit = {name: 1 << i for i, name in enumerate(self.addon_names)}
+        self.promo_index = {code.upper(): i + 1 for i, code in enumerate(card["promos"])}  # 0: no promo
+
+        # Square footage: price at each band's lower edge, per service
+        self.sqft_edges = np.array(card["sqft_edges"], dtype=np.float64)
+        self.base = np.array([card["services"][s]["base"] for s in self.services])
+        self.rates = np.array([card["services"][s]["rates"] for s in self.services])
+        if self.rates.shape[1] != len(self.sqft_edges):
+            raise ValueError("Each service needs one rate per sqft band")
+        widths = np.diff(self.sqft_edges)
+        self.band_start = np.hstack([np.zeros((len(self.services), 1)), np.cumsum(self.rates[:, :-1] * widths, axis=1)])
+        self.multiplier = np.array([card["frequency"][f] for f in self.frequencies])
+
+        # Every add-on combination, indexed by bitmask
+        prices = np.array([card["addons"][name] for name in self.addon_names])
+        masks = np.arange(1 << len(prices))
+        self.addon_table = ((masks[:, None] >> np.arange(len(prices))) & 1) @ prices
+
+        self.travel_edges = np.array(card["travel_edges_km"], dtype=np.float64)
+        self.travel_surcharge = np.array(card["travel_surcharge"], dtype=np.float64)
+        self.max_km = float(card["max_km"])
+        self.promo_percent = np.zeros(len(self.promo_index) + 1)
+        self.promo_amount = np.zeros(len(self.promo_index) + 1)
+        for code, i in self.promo_index.items():
+            promo = next(p for name, p in card["promos"].items() if name.upper() == code)
+            self.promo_percent[i] = promo.get("percent", 0.0)
+            self.promo_amount[i] = promo.get("amount", 0.0)
+        self.first_time_discount = float(card["first_time_discount"])
+        self.minimum = float(card["minimum"])
+        self.tax_rate = float(card["tax_rate"])
+
+        # Plain-Python copies for quote()
+        self._edges = self.sqft_edges.tolist()
+        self._band_start = self.band_start.tolist()
+        self._rates = self.rates.tolist()
+        self._travel_edges = self.travel_edges.tolist()
+        self._travel_surcharge = self.travel_surcharge.tolist()
+        self._promo_percent = self.promo_percent.tolist()
+        self._promo_amount = self.promo_amount.tolist()
+
+    # -- batch -----------------------------------------------------------
+
+    def addon_mask(self, addons):
+        mask = 0
+        for name in addons:
+            bit = self.addon_bit.get(name)
+            if bit is None:
+                raise ValueError(f"Unknown add-on: {name}")
+            mask |= bit
+        return mask
+
+    def _lookup(self, index, value, kind):
+        try:
+            return index[value]
+        except KeyError:
+            raise ValueError(f"Unknown {kind}: {value}") from None
+
+    def encode(self, requests):
+        """Column arrays for ``requests``; reusable across engines with the same services and add-ons."""
+        n = len(requests)
+        lat = np.array([r.lat if r.lat is not None else np.nan for r in requests], dtype=np.float64)
+        lon = np.array([r.lon if r.lon is not None else np.nan for r in requests], dtype=np.float64)
+        distance = haversine_row(lat, lon, *self.depot)
+        return {
+            "service": np.fromiter((self._lookup(self.service_index, r.service, "service") for r in requests),
+                                   dtype=np.int64, count=n),
+            "sqft": np.fromiter((r.sqft for r in requests), dtype=np.float64, count=n),
+            "frequency": np.fromiter((self._lookup(self.frequency_index, r.frequency or "One-time", "frequency")
+                                      for r in requests), dtype=np.int64, count=n),
+            "addons": np.fromiter((self.addon_mask(r.addons) for r in requests), dtype=np.int64, count=n),
+            "distance_km": np.where(np.isnan(distance), 0.0, distance),  # no location: priced as local
+            "first_time": np.fromiter((bool(r.first_time) for r in requests), dtype=bool, count=n),
+            "promo": np.fromiter((self.promo_index.get((r.promo or "").upper(), 0) for r in requests),
+                                 dtype=np.int64, count=n),
+        }
+
+    def price_columns(self, columns):
+        """Price encoded requests; returns one array per ``Quote`` field (``id`` excepted)."""
+        service, sqft = columns["service"], np.maximum(columns["sqft"], 0.0)
+        band = np.searchsorted(self.sqft_edges, sqft, side="right") - 1
+        labor = self.base[service] + self.band_start[service, band] \
+            + (sqft - self.sqft_edges[band]) * self.rates[service, band]
+        labor = labor * self.multiplier[columns["frequency"]]
+        addons = self.addon_table[columns["addons"]]
+        subtotal = labor + addons
+        promo = columns["promo"]
+        discount = np.maximum(np.where(columns["first_time"], subtotal * self.first_time_discount, 0.0),
+                              subtotal * self.promo_percent[promo] + self.promo_amount[promo])
+        discount = np.minimum(discount, np.maximum(subtotal - self.minimum, 0.0))
+        minimum_fee = np.maximum(self.minimum - (subtotal - discount), 0.0)
+        distance = columns["distance_km"]
+        travel = self.travel_surcharge[np.searchsorted(self.travel_edges, distance, side="right") - 1]
+        taxable = subtotal - discount + minimum_fee + travel
+        tax = taxable * self.tax_rate
+        serviceable = distance <= self.max_km
+        total = np.where(serviceable, np.round(taxable + tax, 2), np.nan)
+        return {
+            "serviceable": serviceable, "labor": np.round(labor, 2), "addons": addons,
+            "discount": np.round(discount, 2), "minimum_fee": np.round(minimum_fee, 2), "travel": travel, "tax": np.round(tax, 2),
+            "total": total, "distance_km": distance,
+        }
+
+    def price(self, requests):
+        return self.price_columns(self.encode(requests))
+
+    # -- single ----------------------------------------------------------
+
+    def quote(self, request):
+        """``Quote`` for one request, without building arrays."""
+        s = self._lookup(self.service_index, request.service, "service")
+        sqft = max(float(request.sqft), 0.0)
+        band = bisect_right(self._edges, sqft) - 1
+        labor = self.card["services"][request.service]["base"] + self._band_start[s][band] \
+            + (sqft - self._edges[band]) * self._rates[s][band]
+        labor *= self.multiplier[self._lookup(self.frequency_index, request.frequency or "One-time", "frequency")]
+        addons = self.addon_table[self.addon_mask(request.addons)].item()
+        subtotal = labor + addons
+        discount = subtotal * self.first_time_discount if request.first_time else 0.0
+        promo = self.promo_index.get((request.promo or "").upper(), 0)
+        discount = max(discount, subtotal * self._promo_percent[promo] + self._promo_amount[promo])
+        discount = min(discount, max(subtotal - self.minimum, 0.0))
+        minimum_fee = max(self.minimum - (subtotal - discount), 0.0)
+        distance = 0.0
+        if request.lat is not None and request.lon is not None:
+            distance = float(haversine_row(request.lat, request.lon, *self.depot))
+        travel = self._travel_surcharge[bisect_right(self._travel_edges, distance) - 1]
+        taxable = subtotal - discount + minimum_fee + travel
+        tax = taxable * self.tax_rate
+        serviceable = distance <= self.max_km
+        return Quote(request.id, serviceable, round(labor, 2), addons, round(discount, 2), round(minimum_fee, 2),
+                     travel, round(tax, 2), round(taxable + tax, 2) if serviceable else None, distance)
+
+
+def quote_email(quote, request, business="Sparkle Cleaning Co."):
+    """Plain-text follow-up email for an estimate."""
+    if not quote.serviceable:
+        return (f"Thanks for your interest in {business}!\n\nUnfortunately your address is "
+                f"{quote.distance_km:.0f} km away, outside our service area.")
+    lines = [
+        f"Thanks for requesting an estimate from {business}!", "",
+        f"{request.service}, {request.frequency or 'One-time'}, {request.sqft:,.0f} sq ft",
+        f"  Cleaning:          ${quote.labor:,.2f}",
+    ]
+    if quote.addons:
+        lines.append(f"  Add-ons:           ${quote.addons:,.2f}  ({', '.join(request.addons)})")
+    if quote.discount:
+        lines.append(f"  Discount:         -${quote.discount:,.2f}")
+    if quote.minimum_fee:
+        lines.append(f"  Minimum charge:    ${quote.minimum_fee:,.2f}")
+    if quote.travel:
+        lines.append(f"  Travel surcharge:  ${quote.travel:,.2f}")
+    lines += [f"  Tax:               ${quote.tax:,.2f}", f"  Total:             ${quote.total:,.2f}", "",
+              "Reply to this email to book your first visit."]
+    return "\n".join(lines)
+
+
+def synthetic_requests(n=100000, center=DEFAULT_DEPOT, seed=0, card=None):
+    """Quote requests scattered up to ~70 km around ``center``."""
+    card = DEFAULT_RATE_CARD if card is None else card
+    rng = np.random.default_rng(seed)
+    services, frequencies, addons = list(card["services"]), list(card["frequency"]), list(card["addons"])
+    service = rng.choice(len(services), n, p=[0.55, 0.2, 0.12, 0.08, 0.05][:len(services)])
+    frequency = rng.integers(len(frequencies), size=n)
+    sqft = rng.lognormal(7.5, 0.45, n).round(-1)
+    radius = 70.0 * np.sqrt(rng.random(n)) * rng.random(n) ** 0.5
+    angle = rng.random(n) * 2 * np.pi
+    lat = center[0] + radius * np.sin(angle) / 111.0
+    lon = center[1] + radius * np.cos(angle) / (111.0 * np.cos(np.radians(center[0])))
+    addon_masks = rng.integers(0, 1 << len(addons), size=n) & rng.integers(0, 1 << len(addons), size=n)
+    first_time = rng.random(n) < 0.3
+    promos = [""] * 8 + list(card["promos"])
+    promo = rng.integers(len(promos), size=n)
+    return [
+        QuoteRequest(f"q{i + 1}", services[service[i]], float(sqft[i]), frequencies[frequency[i]],
+                     tuple(name for bit, name in enumerate(addons) if addon_masks[i] >> bit & 1),
+                     float(lat[i]), float(lon[i]), bool(first_time[i]), promos[promo[i]])
+        for i in range(n)
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Price and re-price synthetic quote requests")
+    parser.add_argument("--quotes", type=int, default=100000)
+    parser.add_argument("--increase", type=float, default=5.0, help="rate change to re-price with, in percent")
+    parser.add_argument("--singles", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    requests = synthetic_requests(args.quotes, seed=args.seed)
+    engine = PricingEngine()
+    started = time.perf_counter()
+    columns = engine.encode(requests)
+    encoded = time.perf_counter() - started
+    started = time.perf_counter()
+    prices = engine.price_columns(columns)
+    elapsed = time.perf_counter() - started
+    print(f"{len(requests):,} quotes: encoded in {encoded * 1000:.0f} ms, priced in {elapsed * 1000:.1f} ms, "
+          f"{(~prices['serviceable']).sum():,} outside the service area")
+
+    raised = PricingEngine(adjust_rates(engine.card, args.increase))
+    started = time.perf_counter()
+    repriced = raised.price_columns(columns)
+    elapsed = time.perf_counter() - started
+    change = np.nanmean(repriced["total"] - prices["total"])
+    print(f"re-priced at {args.increase:+.1f}% in {elapsed * 1000:.1f} ms: average total {change:+.2f} per visit")
+
+    sample = requests[:args.singles]
+    started = time.perf_counter()
+    singles = [engine.quote(request) for request in sample]
+    elapsed = time.perf_counter() - started
+    batch = prices["total"][:len(sample)]
+    single = np.array([q.total if q.total is not None else np.nan for q in singles])
+    same = np.allclose(single, batch, equal_nan=True, atol=0.011)
+    print(f"{len(sample):,} single quotes: {elapsed / len(sample) * 1e6:.1f} us each, match batch: {same}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
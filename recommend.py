@@ -0,0 +1,117 @@
+"""Similar-automation recommendations from a precomputed TF-IDF neighbor table.
+
+Items are vectorized once per catalog version from their name, description,
+tools and category. The top-k most similar items per row are stored in two
+small ``(n, k)`` arrays, so answering a query is a table lookup rather than
+a similarity computation.
+"""
+import re
+from collections import defaultdict
+
+import numpy as np
+import scipy.sparse as sp
+
+from catalog import iter_items
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOP_WORDS = frozenset("""
+a an and are as at based be by for from in into is it of on or per the to via
+with your you after before when each all auto automatic automated automatically
+""".split())
+
+# Weight of each ROI level when ranking "next best" suggestions
+ROI_WEIGHTS = {"High": 1.0, "Medium": 0.75, "Low": 0.5}
+
+
+def _features(category, item):
+    text = f"{item['name']} {item.get('description', '')}".lower()
+    features = [token for token in _TOKEN_RE.findall(text) if token not in STOP_WORDS and len(token) > 1]
+    features += [f"tool:{tool.lower()}" for tool in item.get("tools", [])]
+    features.append(f"category:{category.lower()}")
+    return features
+
+
+class Recommender:
+    def __init__(self, categories, k=5, block_size=512):
+        self.ids = []
+        self.roi = []
+        docs = []
+        for category, item in iter_items(categories):
+            self.ids.append(item["id"])
+            self.roi.append(ROI_WEIGHTS.get(item.get("roi_potential", "Medium"), 0.75))
+            docs.append(_features(category, item))
+        self.position = {key: row for row, key in enumerate(self.ids)}
+        self.k = min(k, max(len(self.ids) - 1, 0))
+        self.neighbors, self.scores = self._build(self._vectorize(docs), block_size)
+
+    @staticmethod
+    def _vectorize(docs):
+        """Row-normalized TF-IDF matrix (sublinear term frequency)."""
+        vocabulary = {}
+        rows, cols, counts = [], [], []
+        for row, features in enumerate(docs):
+            tf = defaultdict(int)
+            for feature in features:
+                tf[vocabulary.setdefault(feature, len(vocabulary))] += 1
+            rows.extend([row] * len(tf))
+            cols.extend(tf.keys())
+            counts.extend(tf.values())
+        matrix = sp.csr_matrix(
+            (np.asarray(counts, dtype=np.float32), (rows, cols)),
+            shape=(len(docs), len(vocabulary)),
+        )
+        matrix.data = 1.0 + np.log(matrix.data)
+        df = np.bincount(matrix.indices, minlength=len(vocabulary))
+        idf = np.log((1.0 + len(docs)) / (1.0 + df)) + 1.0
+        matrix = matrix @ sp.diags(idf.astype(np.float32))
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return sp.csr_matrix(sp.diags(1.0 / norms) @ matrix)
+
+    def _build(self, matrix, block_size):
+        n, k = matrix.shape[0], self.k
+        neighbors = np.zeros((n, k), dtype=np.int32)
+        scores = np.zeros((n, k), dtype=np.float32)
+        if k == 0:
+            return neighbors, scores
+        transposed = matrix.T.tocsc()
+        for start in range(0, n, block_size):
+            stop = min(start + block_size, n)
+            block = (matrix[start:stop] @ transposed).toarray()
+            block[np.arange(stop - start), np.arange(start, stop)] = -1.0
+            top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(block, top, axis=1)
+            order = np.argsort(-top_scores, axis=1)
+            neighbors[start:stop] = np.take_along_axis(top, order, axis=1)
+            scores[start:stop] = np.take_along_axis(top_scores, order, axis=1)
+        return neighbors, scores
+
+    def similar(self, key, k=None):
+        """``[(item_id, similarity), ...]`` for the items most like ``key``."""
+        row = self.position.get(key)
+        if row is None:
+            return []
+        k = self.k if k is None else min(k, self.k)
+        return [
+            (self.ids[col], float(score))
+            for col, score in zip(self.neighbors[row, :k], self.scores[row, :k])
+            if score > 0
+        ]
+
+    def next_best(self, completed_ids, k=5):
+        """Pending items closest to what has been completed, weighted by ROI."""
+        totals = defaultdict(float)
+        for key in completed_ids:
+            row = self.position.get(key)
+            if row is None:
+                continue
+            for col, score in zip(self.neighbors[row], self.scores[row]):
+                if score > 0:
+                    totals[col] += float(score)
+        ranked = sorted(
+            ((total * self.roi[col], self.ids[col]) for col, total in totals.items()
+             if self.ids[col] not in completed_ids),
+            reverse=True,
+        )
+        return [(key, score) for score, key in ranked[:k]]
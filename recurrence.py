@@ -0,0 +1,264 @@
+"""Recurring appointments, expanded lazily.
+
+Backs "Auto-schedule recurring appointments", "Auto-reschedule on public
+holidays" and the weekly/biweekly reminder items. A ``Rule`` is a small
+RRULE subset (DAILY, WEEKLY with weekdays, MONTHLY with month days,
+``interval``, ``count``, ``until``). ``occurrences`` is a generator that
+jumps straight to the requested window arithmetically and yields only the
+visits inside it, so showing next month never expands the years before it.
+
+``Exceptions`` holds holidays, weekends and per-cleaner days off as
+precomputed date sets; a visit falling on one moves to the next free day
+(or is dropped after ``max_shift`` days). ``RecurrenceEngine`` caches each
+series' expanded months, so a month view over thousands of clients only
+expands what is not cached yet, and invalidates a series' months when it
+changes.
+
+    python recurrence.py --series 5000
+"""
+import argparse
+import heapq
+import random
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from datetime import date, datetime, timedelta
+
+DAILY, WEEKLY, MONTHLY = "DAILY", "WEEKLY", "MONTHLY"
+
+Rule = namedtuple(
+    "Rule", ["freq", "dtstart", "interval", "byweekday", "bymonthday", "count", "until"],
+    defaults=(1, (), (), None, None),
+)
+Series = namedtuple("Series", ["id", "client", "cleaner", "rule"])
+
+
+def _raw(rule, start=None):
+    """Rule occurrences at or after ``start`` (default: the first), in order, forever."""
+    dtstart = rule.dtstart
+    start = dtstart if start is None or start < dtstart else start
+    if rule.freq == DAILY:
+        step = timedelta(days=rule.interval)
+        n = -((dtstart - start) // step)  # ceil((start - dtstart) / step)
+        index, t = n, dtstart + n * step
+        while True:
+            yield index, t
+            index, t = index + 1, t + step
+    elif rule.freq == WEEKLY:
+        weekdays = sorted(set(rule.byweekday or (dtstart.weekday(),)))
+        anchor = dtstart - timedelta(days=dtstart.weekday())
+        period = timedelta(weeks=rule.interval)
+        skipped = max((start - anchor) // period, 0)
+        # Occurrences in skipped periods, minus first-week weekdays before dtstart
+        index = skipped * len(weekdays) - (sum(1 for wd in weekdays if wd < dtstart.weekday()) if skipped else 0)
+        k = skipped
+        while True:
+            week = anchor + k * period
+            for wd in weekdays:
+                t = week + timedelta(days=wd)
+                if t < dtstart:
+                    continue
+                if t >= start:
+                    yield index, t
+                index += 1
+            k += 1
+    elif rule.freq == MONTHLY:
+        days = sorted(set(rule.bymonthday or (dtstart.day,)))
+        # With a count every earlier month matters; otherwise jump to the window
+        months = 0 if rule.count else max(
+            ((start.year - dtstart.year) * 12 + start.month - dtstart.month) // rule.interval * rule.interval, 0)
+        index = 0
+        while True:
+            year, month = divmod(dtstart.month - 1 + months, 12)
+            year += dtstart.year
+            for day in days:
+                try:
+                    t = dtstart.replace(year=year, month=month + 1, day=day)
+                except ValueError:
+                    continue  # e.g. the 31st in a 30-day month
+                if t < dtstart:
+                    continue
+                if t >= start:
+                    yield index, t
+                index += 1
+            months += rule.interval
+    else:
+        raise ValueError(f"Unsupported frequency: {rule.freq}")
+
+
+def occurrences(rule, start=None, end=None):
+    """Occurrences of ``rule`` in ``[start, end)``; unbounded if ``end`` is None."""
+    for index, t in _raw(rule, start):
+        if (end is not None and t >= end) or (rule.count is not None and index >= rule.count) \
+                or (rule.until is not None and t > rule.until):
+            return
+        yield t
+
+
+class Exceptions:
+    def __init__(self, holidays=(), days_off=None, weekend=(5, 6), max_shift=7):
+        self.holidays = frozenset(holidays)
+        self.days_off = {cleaner: frozenset(days) for cleaner, days in (days_off or {}).items()}
+        self.weekend = frozenset(weekend)
+        self.max_shift = max_shift
+
+    def blocked(self, day, cleaner=None):
+        return (day.weekday() in self.weekend or day in self.holidays
+                or day in self.days_off.get(cleaner, ()))
+
+    def adjust(self, t, cleaner=None):
+        """``t`` moved to the next day the visit can happen, or None."""
+        for shift in range(self.max_shift + 1):
+            moved = t + timedelta(days=shift)
+            if not self.blocked(moved.date(), cleaner):
+                return moved
+        return None
+
+
+def adjusted_occurrences(series, exceptions, start=None, end=None):
+    """``series`` visits in ``[start, end)`` after holidays and days off, in order."""
+    margin = timedelta(days=exceptions.max_shift)
+    raw = occurrences(series.rule, None if start is None else start - margin, end)
+    # Visits only ever move forward, by at most ``margin``: hold them back until
+    # the raw sequence has passed them, so the output stays sorted.
+    pending = []
+    for t in raw:
+        while pending and pending[0] <= t:
+            yield from _within(heapq.heappop(pending), start, end)
+        moved = exceptions.adjust(t, series.cleaner)
+        if moved is not None:
+            heapq.heappush(pending, moved)
+    while pending:
+        yield from _within(heapq.heappop(pending), start, end)
+
+
+def _within(t, start, end):
+    if (start is None or t >= start) and (end is None or t < end):
+        yield t
+
+
+class RecurrenceEngine:
+    def __init__(self, series=(), exceptions=None, max_cached=100000):
+        self.series = {s.id: s for s in series}
+        self.exceptions = exceptions or Exceptions()
+        self.max_cached = max_cached
+        self._months = OrderedDict()  # (series id, year, month) -> tuple of visits
+        self._cached_by_series = {}
+        self._lock = threading.Lock()
+
+    def update_series(self, series):
+        self.series[series.id] = series
+        self._invalidate(series.id)
+
+    def remove_series(self, series_id):
+        self.series.pop(series_id, None)
+        self._invalidate(series_id)
+
+    def set_exceptions(self, exceptions):
+        with self._lock:
+            self.exceptions = exceptions
+            self._months.clear()
+            self._cached_by_series.clear()
+
+    def _invalidate(self, series_id):
+        with self._lock:
+            for key in self._cached_by_series.pop(series_id, ()):
+                self._months.pop(key, None)
+
+    def month(self, series_id, year, month):
+        """Visits of one series in one month, cached."""
+        key = (series_id, year, month)
+        with self._lock:
+            visits = self._months.get(key)
+            if visits is not None:
+                self._months.move_to_end(key)
+                return visits
+        start = datetime(year, month, 1)
+        end = datetime(year + month // 12, month % 12 + 1, 1)
+        visits = tuple(adjusted_occurrences(self.series[series_id], self.exceptions, start, end))
+        with self._lock:
+            self._months[key] = visits
+            self._cached_by_series.setdefault(series_id, set()).add(key)
+            while len(self._months) > self.max_cached:
+                old, _ = self._months.popitem(last=False)
+                self._cached_by_series.get(old[0], set()).discard(old)
+        return visits
+
+    def window(self, series_id, start, end):
+        """Visits of one series in ``[start, end)``, built from cached months."""
+        year, month = start.year, start.month
+        while datetime(year, month, 1) < end:
+            for t in self.month(series_id, year, month):
+                if start <= t < end:
+                    yield t
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+    def next_visit(self, series_id, after):
+        """First visit strictly after ``after`` (for reminders), or None."""
+        series = self.series[series_id]
+        return next(adjusted_occurrences(series, self.exceptions, after + timedelta(microseconds=1)), None)
+
+    def month_view(self, year, month, series_ids=None):
+        """``{date: [(series id, visit), ...]}`` for every series in one month."""
+        view = {}
+        for series_id in self.series if series_ids is None else series_ids:
+            for t in self.month(series_id, year, month):
+                view.setdefault(t.date(), []).append((series_id, t))
+        return view
+
+
+def us_holidays(year):
+    """Fixed-date and Monday/Thursday US federal holidays most cleaning businesses close on."""
+    def nth_weekday(month, weekday, n):
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+
+    def last_weekday(month, weekday):
+        last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+        return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+    return {
+        date(year, 1, 1), last_weekday(5, 0), date(year, 7, 4), nth_weekday(9, 0, 1),
+        nth_weekday(11, 3, 4), date(year, 12, 25),
+    }
+
+
+def synthetic_series(n=5000, seed=0, cleaners=100):
+    """Weekly, biweekly and monthly clients starting during 2024."""
+    rng = random.Random(seed)
+    series = []
+    for i in range(n):
+        dtstart = datetime(2024, 1, 1, rng.choice((8, 9, 10, 11, 13, 14))) + timedelta(days=rng.randrange(366))
+        kind = rng.random()
+        if kind < 0.45:
+            rule = Rule(WEEKLY, dtstart, byweekday=(rng.randrange(5),))
+        elif kind < 0.85:
+            rule = Rule(WEEKLY, dtstart, interval=2, byweekday=(rng.randrange(5),))
+        else:
+            rule = Rule(MONTHLY, dtstart, bymonthday=(rng.randrange(1, 29),))
+        series.append(Series(f"series-{i + 1}", f"client-{i + 1}", f"cleaner-{rng.randrange(cleaners) + 1}", rule))
+    return series
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Expand a month of synthetic recurring visits")
+    parser.add_argument("--series", type=int, default=5000)
+    parser.add_argument("--year", type=int, default=2026)
+    parser.add_argument("--month", type=int, default=11)
+    args = parser.parse_args(argv)
+
+    holidays = us_holidays(args.year - 1) | us_holidays(args.year) | us_holidays(args.year + 1)
+    engine = RecurrenceEngine(synthetic_series(args.series), Exceptions(holidays))
+    for label in ("cold", "cached"):
+        started = time.perf_counter()
+        view = engine.month_view(args.year, args.month)
+        elapsed = time.perf_counter() - started
+        print(f"{label}: {sum(map(len, view.values())):,} visits for {args.series:,} series "
+              f"in {args.year}-{args.month:02d}, {elapsed * 1000:.0f} ms")
+    moved = [day for day in view if day in holidays]
+    print(f"visits on holidays: {len(moved)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
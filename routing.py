@@ -0,0 +1,400 @@
+"""Daily route planning for cleaning crews.
+
+Backs "Send daily job route to each cleaner" and the other route items.
+A day is a depot (the office), a list of ``Job`` stops with arrival time
+windows and durations (minutes after midnight), and a number of crews
+sharing one shift. ``RoutePlanner``:
+
+* builds the haversine distance matrix for all stops in one NumPy pass and
+  turns it into travel minutes at ``speed_kmh``;
+* constructs routes with Clarke-Wright savings, merging routes only while
+  every time window and the shift end still hold;
+* improves them with 2-opt (reversing a stretch of one route) and Or-opt
+  (moving a run of one to three stops, also between routes);
+* re-plans a single added, moved or cancelled job incrementally: one new
+  matrix row, a cheapest feasible insertion and local search on the routes
+  it touched only.
+
+Jobs that no crew can reach in time end up in ``unassigned``.
+
+    python routing.py --jobs 300 --crews 40
+"""
+import argparse
+import math
+import time
+from collections import namedtuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+
+Job = namedtuple("Job", ["id", "lat", "lon", "earliest", "latest", "duration"])
+Route = namedtuple("Route", ["crew", "jobs", "arrivals", "minutes", "km"])
+
+_EPS = 1e-9
+
+
+def haversine_matrix(lat, lon):
+    """Pairwise great-circle distances (km) between points given in degrees."""
+    lat, lon = np.radians(lat), np.radians(lon)
+    dlat = lat[:, None] - lat[None, :]
+    dlon = lon[:, None] - lon[None, :]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def haversine_row(lat, lon, lat0, lon0):
+    """Distances (km) from one point to each of ``lat``/``lon``."""
+    lat, lon = np.radians(lat), np.radians(lon)
+    lat0, lon0 = math.radians(lat0), math.radians(lon0)
+    a = np.sin((lat - lat0) / 2) ** 2 + np.cos(lat) * math.cos(lat0) * np.sin((lon - lon0) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class RoutePlanner:
+    def __init__(self, depot, jobs, crews, day_start=8 * 60, day_end=18 * 60, speed_kmh=40.0, max_passes=20):
+        """``depot`` is ``(lat, lon)``; ``crews`` is a count or a list of crew names."""
+        self.depot = depot
+        self.crews = [f"Crew {i + 1}" for i in range(crews)] if isinstance(crews, int) else list(crews)
+        self.day_start = day_start
+        self.day_end = day_end
+        self.speed_kmh = speed_kmh
+        self.max_passes = max_passes
+        # Node 0 is the depot, job nodes start at 1
+        self.jobs = [None]
+        self.node_of = {}
+        for job in jobs:
+            self.node_of[job.id] = len(self.jobs)
+            self.jobs.append(job)
+        lat = np.array([depot[0]] + [job.lat for job in jobs])
+        lon = np.array([depot[1]] + [job.lon for job in jobs])
+        self.minutes = haversine_matrix(lat, lon) * (60.0 / speed_kmh)
+        # Nested lists: element access in the search loops is much cheaper than on an ndarray
+        self._t = self.minutes.tolist()
+        self.routes = []
+        self.unassigned = set()
+
+    # -- planning --------------------------------------------------------
+
+    def solve(self):
+        self.routes, self.unassigned = self._savings()
+        self._fit_to_crews()
+        self._improve(range(len(self.routes)))
+        return self.plan()
+
+    def _savings(self):
+        nodes = [node for node in range(1, len(self.jobs)) if self.jobs[node] is not None]
+        unassigned = {self.jobs[node].id for node in nodes if not self._feasible([node])}
+        nodes = [node for node in nodes if self.jobs[node].id not in unassigned]
+        routes = {node: [node] for node in nodes}
+        route_of = {node: node for node in nodes}
+        if len(nodes) > 1:
+            index = np.array(nodes)
+            depot = self.minutes[0, index]
+            savings = depot[:, None] + depot[None, :] - self.minutes[np.ix_(index, index)]
+            rows, cols = np.triu_indices(len(nodes), 1)
+            values = savings[rows, cols]
+            order = np.argsort(-values, kind="stable")
+            order = order[values[order] > 0]
+            for i, j in zip(index[rows[order]].tolist(), index[cols[order]].tolist()):
+                ri, rj = route_of[i], route_of[j]
+                if ri == rj:
+                    continue
+                a, b = routes[ri], routes[rj]
+                if a[-1] == i and b[0] == j:
+                    merged = a + b
+                elif b[-1] == j and a[0] == i:
+                    merged = b + a
+                else:
+                    # Only route ends can be joined without breaking the routes apart
+                    continue
+                if not self._feasible(merged):
+                    continue
+                routes[ri] = merged
+                del routes[rj]
+                for node in b:
+                    route_of[node] = ri
+        return list(routes.values()), unassigned
+
+    def _fit_to_crews(self):
+        """Dissolve the shortest routes into the others while there are more routes than crews."""
+        self.routes.sort(key=len, reverse=True)
+        while len(self.routes) > len(self.crews):
+            for node in self.routes.pop():
+                if self._insert(node, range(len(self.routes))) is None:
+                    self.unassigned.add(self.jobs[node].id)
+
+    def _insert(self, node, candidates, allow_new=False):
+        """Cheapest feasible insertion of ``node``; returns the route index or None."""
+        t = self._t
+        best = None
+        for r in candidates:
+            route = self.routes[r]
+            stops = [0] + route + [0]
+            for p in range(len(stops) - 1):
+                a, b = stops[p], stops[p + 1]
+                delta = t[a][node] + t[node][b] - t[a][b]
+                if best is not None and delta >= best[0]:
+                    continue
+                if self._feasible(route[:p] + [node] + route[p:]):
+                    best = (delta, r, p)
+        if best is not None:
+            _, r, p = best
+            self.routes[r].insert(p, node)
+            return r
+        if allow_new and self._feasible([node]):
+            # An idle crew takes it; crews keep their route index for the whole day
+            for r, route in enumerate(self.routes):
+                if not route:
+                    route.append(node)
+                    return r
+            if len(self.routes) < len(self.crews):
+                self.routes.append([node])
+                return len(self.routes) - 1
+        return None
+
+    def _improve(self, touched):
+        touched = set(touched)
+        for _ in range(self.max_passes):
+            improved = False
+            for r in sorted(touched):
+                improved |= self._two_opt(r)
+            for r in sorted(touched):
+                moved = self._or_opt(r, touched)
+                if moved is not None:
+                    touched.add(moved)
+                    improved = True
+            if not improved:
+                break
+
+    def _two_opt(self, r):
+        t = self._t
+        route = self.routes[r]
+        improved = False
+        changed = True
+        while changed:
+            changed = False
+            stops = [0] + route + [0]
+            for i in range(1, len(stops) - 2):
+                for j in range(i + 1, len(stops) - 1):
+                    a, b, c, d = stops[i - 1], stops[i], stops[j], stops[j + 1]
+                    delta = t[a][c] + t[b][d] - t[a][b] - t[c][d]
+                    if delta < -_EPS:
+                        candidate = route[:i - 1] + route[i - 1:j][::-1] + route[j:]
+                        if self._feasible(candidate):
+                            route[:] = candidate
+                            improved = changed = True
+                            break
+                if changed:
+                    break
+        return improved
+
+    def _or_opt(self, r, targets):
+        """Move one run of 1-3 stops out of route ``r`` if that shortens the plan."""
+        t = self._t
+        source = self.routes[r]
+        for length in (1, 2, 3):
+            for i in range(len(source) - length + 1):
+                segment = source[i:i + length]
+                before = source[i - 1] if i else 0
+                after = source[i + length] if i + length < len(source) else 0
+                gain = t[before][segment[0]] + t[segment[-1]][after] - t[before][after]
+                rest = source[:i] + source[i + length:]
+                for q in targets:
+                    target = rest if q == r else self.routes[q]
+                    stops = [0] + target + [0]
+                    for p in range(len(stops) - 1):
+                        a, b = stops[p], stops[p + 1]
+                        delta = t[a][segment[0]] + t[segment[-1]][b] - t[a][b] - gain
+                        if delta >= -_EPS:
+                            continue
+                        candidate = target[:p] + segment + target[p:]
+                        if not self._feasible(candidate) or (q != r and rest and not self._feasible(rest)):
+                            continue
+                        if q == r:
+                            source[:] = candidate
+                        else:
+                            source[:] = rest
+                            self.routes[q][:] = candidate
+                        return q
+        return None
+
+    def _feasible(self, route):
+        return self._schedule(route) is not None
+
+    def _schedule(self, route):
+        """Arrival minute at each stop, or None if a window or the shift end is missed."""
+        t = self._t
+        clock = self.day_start
+        previous = 0
+        arrivals = []
+        for node in route:
+            job = self.jobs[node]
+            clock += t[previous][node]
+            if clock > job.latest:
+                return None
+            clock = max(clock, job.earliest)
+            arrivals.append(clock)
+            clock += job.duration
+            previous = node
+        if clock + t[previous][0] > self.day_end:
+            return None
+        return arrivals
+
+    # -- incremental updates ----------------------------------------------
+
+    def update_job(self, job):
+        """Add or change one job and re-plan only the routes it affects.
+
+        Returns the crew now serving the job, or ``None`` if it is unassigned.
+        """
+        touched = set()
+        node = self.node_of.get(job.id)
+        if node is None:
+            node = self._add_node(job)
+        else:
+            touched |= self._detach(node)
+            self.jobs[node] = job
+            self._update_row(node)
+        self.unassigned.discard(job.id)
+        # Try the routes closest to the job first: a full scan only if they fail
+        candidates = self._nearby_routes(node)
+        r = self._insert(node, candidates) if candidates else None
+        if r is None:
+            r = self._insert(node, range(len(self.routes)), allow_new=True)
+        if r is None:
+            self.unassigned.add(job.id)
+        else:
+            touched.add(r)
+        self._improve(touched)
+        return self._crew_of(node)
+
+    def remove_job(self, job_id):
+        node = self.node_of.pop(job_id, None)
+        if node is None:
+            return False
+        touched = self._detach(node)
+        self.jobs[node] = None
+        self.unassigned.discard(job_id)
+        self._improve(touched)
+        return True
+
+    def _detach(self, node):
+        for r, route in enumerate(self.routes):
+            if node in route:
+                route.remove(node)
+                return {r}
+        return set()
+
+    def _nearby_routes(self, node, count=5):
+        row = self._t[node]
+        closest = {}
+        for r, route in enumerate(self.routes):
+            if route:
+                closest[r] = min(row[other] for other in route)
+        return sorted(closest, key=closest.get)[:count]
+
+    def _add_node(self, job):
+        node = len(self.jobs)
+        self.jobs.append(job)
+        self.node_of[job.id] = node
+        self.minutes = np.pad(self.minutes, ((0, 1), (0, 1)))
+        for row in self._t:
+            row.append(0.0)
+        self._t.append([0.0] * (node + 1))
+        self._update_row(node)
+        return node
+
+    def _update_row(self, node):
+        lat = np.array([self.depot[0]] + [job.lat if job else self.depot[0] for job in self.jobs[1:]])
+        lon = np.array([self.depot[1]] + [job.lon if job else self.depot[1] for job in self.jobs[1:]])
+        job = self.jobs[node]
+        row = haversine_row(lat, lon, job.lat, job.lon) * (60.0 / self.speed_kmh)
+        self.minutes[node, :] = row
+        self.minutes[:, node] = row
+        values = row.tolist()
+        self._t[node] = values
+        for other, value in enumerate(values):
+            self._t[other][node] = value
+
+    # -- results ---------------------------------------------------------
+
+    def _crew_of(self, node):
+        for crew, route in zip(self.crews, self.routes):
+            if node in route:
+                return crew
+        return None
+
+    def plan(self):
+        """One ``Route`` per busy crew."""
+        t = self._t
+        routes = []
+        for crew, route in zip(self.crews, self.routes):
+            if not route:
+                continue
+            stops = [0] + route + [0]
+            minutes = sum(t[a][b] for a, b in zip(stops, stops[1:]))
+            routes.append(Route(
+                crew=crew,
+                jobs=[self.jobs[node].id for node in route],
+                arrivals=self._schedule(route),
+                minutes=minutes,
+                km=minutes * self.speed_kmh / 60.0,
+            ))
+        return routes
+
+    @property
+    def total_minutes(self):
+        return sum(route.minutes for route in self.plan())
+
+
+def synthetic_day(n_jobs=300, center=(39.96, -83.0), radius_km=25.0, seed=0):
+    """Random jobs around ``center`` with two- to four-hour arrival windows."""
+    rng = np.random.default_rng(seed)
+    distance = radius_km * np.sqrt(rng.random(n_jobs))
+    angle = rng.random(n_jobs) * 2 * np.pi
+    lat = center[0] + distance * np.sin(angle) / 111.0
+    lon = center[1] + distance * np.cos(angle) / (111.0 * np.cos(np.radians(center[0])))
+    earliest = rng.integers(8, 15, n_jobs) * 60
+    width = rng.integers(2, 5, n_jobs) * 60
+    duration = rng.choice([30, 45, 60, 90], n_jobs, p=[0.25, 0.35, 0.25, 0.15])
+    return [
+        Job(f"job-{i + 1}", float(lat[i]), float(lon[i]), int(earliest[i]),
+            int(min(earliest[i] + width[i], 17 * 60)), int(duration[i]))
+        for i in range(n_jobs)
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Plan a synthetic day of cleaning routes")
+    parser.add_argument("--jobs", type=int, default=300)
+    parser.add_argument("--crews", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--updates", type=int, default=20, help="single-job changes to re-plan afterwards")
+    args = parser.parse_args(argv)
+
+    center = (39.96, -83.0)
+    jobs = synthetic_day(args.jobs, center, seed=args.seed)
+    started = time.perf_counter()
+    planner = RoutePlanner(center, jobs, args.crews)
+    routes = planner.solve()
+    elapsed = time.perf_counter() - started
+    print(f"{args.jobs} jobs, {args.crews} crews: {len(routes)} routes, {len(planner.unassigned)} unassigned, "
+          f"{sum(r.km for r in routes):,.0f} km in {elapsed:.2f}s")
+
+    rng = np.random.default_rng(args.seed + 1)
+    timings = []
+    for _ in range(args.updates):
+        job = jobs[int(rng.integers(len(jobs)))]
+        moved = job._replace(lat=job.lat + rng.normal(0, 0.03), lon=job.lon + rng.normal(0, 0.03))
+        started = time.perf_counter()
+        planner.update_job(moved)
+        timings.append(time.perf_counter() - started)
+    if timings:
+        print(f"{len(timings)} single-job updates: median {1000 * float(np.median(timings)):.1f} ms, "
+              f"max {1000 * max(timings):.1f} ms, {sum(r.km for r in planner.plan()):,.0f} km")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,122 @@
+"""Priority score and sort keys for the checklist.
+
+``ItemFeatures`` holds per-item numeric columns (ROI, ease, cost and time)
+and is built once per catalog version. ``SortKeys`` combines them with one
+progress state (priorities, favorites, completion dates) and the user's
+weights into a 0-100 score plus one key array per sort order; the app
+builds it once per sync version and shares it between reruns and
+sessions. ``SortKeys.top`` returns only the first ``k`` items, found with
+a partial sort, so the first page of a large catalog never sorts the rest.
+"""
+import numpy as np
+
+from catalog import iter_items
+from simulate import estimate_columns
+
+LEVELS = {"High": 1.0, "Medium": 0.5, "Low": 0.0}
+EASE = {"Easy": 1.0, "Medium": 0.5, "Hard": 0.0}
+
+DEFAULT_WEIGHTS = {"roi": 3.0, "ease": 2.0, "cost": 1.0, "time": 1.0, "priority": 2.0, "favorite": 1.0}
+WEIGHT_LABELS = {
+    "roi": "ROI potential", "ease": "Ease", "cost": "Low cost",
+    "time": "Quick to set up", "priority": "Your priority", "favorite": "Favorite",
+}
+
+# Checklist sort option -> key in SortKeys.keys (None: catalog order)
+SORT_OPTIONS = {
+    "Catalog order": None,
+    "Score": "score",
+    "Cost": "cost",
+    "Time": "time",
+    "Recently completed": "recency",
+}
+
+
+class ItemFeatures:
+    """State-independent columns, one row per catalog item in catalog order."""
+
+    def __init__(self, categories, columns=None):
+        items = [item for _, item in iter_items(categories)]
+        self.ids = [item["id"] for item in items]
+        self.row_of = {key: row for row, key in enumerate(self.ids)}
+        self.row_of_name = {item["name"]: row for row, item in enumerate(items)}
+        self.roi = np.array([LEVELS.get(item.get("roi_potential", "Medium"), 0.5) for item in items])
+        self.ease = np.array([EASE.get(item.get("difficulty", "Medium"), 0.5) for item in items])
+        columns = estimate_columns(items) if columns is None else columns
+        # Midpoints of the estimate ranges; unknown estimates sort last
+        self.time = np.nan_to_num(columns[0:2].mean(axis=0, dtype=np.float64), nan=np.inf)
+        self.cost = np.nan_to_num(columns[2:4].mean(axis=0, dtype=np.float64), nan=np.inf)
+        self.quickness = _inverse_scale(self.time)
+        self.cheapness = _inverse_scale(self.cost)
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def _inverse_scale(values):
+    """1.0 for the smallest value, 0.0 for the largest, on a log scale; unknown -> 0.5."""
+    known = np.isfinite(values)
+    scaled = np.full(len(values), 0.5)
+    if known.any():
+        logs = np.log1p(values[known])
+        low, high = logs.min(), logs.max()
+        scaled[known] = (high - logs) / (high - low) if high > low else 1.0
+    return scaled
+
+
+class SortKeys:
+    """Score and sort keys for one progress state; lower keys sort first."""
+
+    def __init__(self, features, weights, priorities, favorites, dates):
+        self.features = features
+        n = len(features)
+        priority = np.full(n, LEVELS["Medium"])
+        for name, level in priorities.items():
+            row = features.row_of_name.get(name)
+            if row is not None:
+                priority[row] = LEVELS.get(level, 0.5)
+        favorite = np.zeros(n)
+        favorite[[row for row in map(features.row_of_name.get, favorites) if row is not None]] = 1.0
+        recency = np.full(n, np.inf)
+        for name, date in dates.items():
+            row = features.row_of_name.get(name)
+            if row is not None:
+                recency[row] = -date.timestamp()
+
+        columns = {
+            "roi": features.roi, "ease": features.ease, "cost": features.cheapness,
+            "time": features.quickness, "priority": priority, "favorite": favorite,
+        }
+        total = sum(max(weights.get(name, 0.0), 0.0) for name in columns)
+        score = np.zeros(n)
+        for name, column in columns.items():
+            score += max(weights.get(name, 0.0), 0.0) * column
+        self.score = score * (100.0 / total) if total else score
+        self.keys = {
+            "score": -self.score,
+            "cost": features.cost,
+            "time": features.time,
+            "recency": recency,
+        }
+
+    def score_of(self, key):
+        return float(self.score[self.features.row_of[key]])
+
+    def top(self, sort_key, ids, k=None):
+        """The first ``k`` of ``ids`` (all if ``k`` is None) ordered by ``sort_key``.
+
+        Ties keep catalog order, so a page never reshuffles between reruns.
+        """
+        row_of = self.features.row_of
+        rows = np.sort(np.fromiter((row_of[key] for key in ids if key in row_of), dtype=np.intp))
+        keys = self.keys[sort_key][rows]
+        if k is not None and k < len(rows):
+            if k <= 0:
+                return []
+            kth = np.partition(keys, k - 1)[k - 1]
+            below = np.flatnonzero(keys < kth)
+            ties = np.flatnonzero(keys == kth)[:k - len(below)]
+            picked = np.concatenate([below, ties])
+            rows, keys = rows[picked], keys[picked]
+        order = np.lexsort((rows, keys))
+        return [self.features.ids[row] for row in rows[order]]
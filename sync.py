@@ -0,0 +1,131 @@
+"""Shared, versioned progress state for sessions working the same workspace.
+
+Every change bumps a workspace-wide version number and is recorded in a
+bounded change log as ``(version, field, name)``. A session remembers the
+last version it has seen and, on its next rerun, pulls only the items that
+changed since then instead of reloading everything.
+
+State is sparse: only non-default priorities (anything but
+``DEFAULT_PRIORITY``) and non-empty notes are stored, so setting an item
+back to the default removes its entry.
+
+Completion, favorites and priorities are last-writer-wins per item. Notes
+edited concurrently (the writer started from an older version than the
+current note) are merged line by line so neither edit is lost.
+"""
+import threading
+import uuid
+from collections import deque
+from datetime import datetime
+
+PRIORITY_LEVELS = ("High", "Medium", "Low")
+DEFAULT_PRIORITY = "Medium"
+
+
+def merge_notes(current, incoming):
+    """Merge two versions of a note, keeping every distinct line once."""
+    if not current or current == incoming:
+        return incoming
+    if not incoming:
+        return current
+    seen = set(current.splitlines())
+    extra = [line for line in incoming.splitlines() if line not in seen]
+    if not extra:
+        return current
+    return current.rstrip("\n") + "\n" + "\n".join(extra)
+
+
+class SyncHub:
+    """In-process broker for one workspace's ``ProgressStore`` and ``NoteStore``.
+
+    ``lock`` is shared with the owning workspace so snapshots taken by
+    ``Workspace.load_into`` are consistent with ``version``.
+    """
+
+    def __init__(self, progress, notes, lock=None, log_size=10000):
+        self.progress = progress
+        self.notes = notes
+        self.lock = lock or threading.RLock()
+        # Identifies this hub's version sequence; a workspace reloaded after
+        # eviction starts a new one, which forces sessions to resync fully.
+        self.epoch = uuid.uuid4().hex
+        self.version = 0
+        self._log = deque(maxlen=log_size)
+        self._item_versions = {}
+
+    def apply(self, changes, base_version=None):
+        """Apply ``[(field, name, value), ...]`` atomically.
+
+        ``base_version`` is the version the writer last synced at; it only
+        matters for notes, which are merged instead of overwritten when
+        someone else edited them after that version.
+        """
+        applied = []
+        with self.lock:
+            for field, name, value in changes:
+                if not self._set(field, name, value, base_version):
+                    continue
+                self.version += 1
+                self._item_versions[(field, name)] = self.version
+                self._log.append((self.version, field, name))
+                applied.append((field, name))
+            if applied:
+                self.progress.dirty = True
+            return self.version
+
+    def changes_since(self, version):
+        """Return ``(current_version, {(field, name), ...})``.
+
+        The change set is ``None`` when ``version`` is older than the log,
+        in which case the caller has to take a full snapshot.
+        """
+        with self.lock:
+            if version == self.version:
+                return version, set()
+            if version < self.version - len(self._log):
+                return self.version, None
+            changed = {(field, name) for v, field, name in reversed(self._log) if v > version}
+            return self.version, changed
+
+    def value(self, field, name):
+        progress = self.progress
+        if field == "completed":
+            return name in progress.completed
+        if field == "favorite":
+            return name in progress.favorites
+        if field == "priority":
+            return progress.priorities.get(name, DEFAULT_PRIORITY)
+        if field == "note":
+            return self.notes.get(name)
+        raise ValueError(f"Unknown field: {field}")
+
+    def _set(self, field, name, value, base_version):
+        progress = self.progress
+        if self.value(field, name) == value:
+            return False
+        if field == "completed":
+            if value:
+                progress.completed.add(name)
+                progress.implementation_dates.setdefault(name, datetime.now())
+            else:
+                progress.completed.discard(name)
+        elif field == "favorite":
+            if value:
+                progress.favorites.add(name)
+            else:
+                progress.favorites.discard(name)
+        elif field == "priority":
+            if value == DEFAULT_PRIORITY:
+                progress.priorities.pop(name, None)
+            else:
+                progress.priorities[name] = value
+        elif field == "note":
+            current = self.notes.get(name)
+            if base_version is not None and self._item_versions.get((field, name), 0) > base_version:
+                value = merge_notes(current, value)
+                if value == current:
+                    return False
+            self.notes.put(name, value)
+        else:
+            raise ValueError(f"Unknown field: {field}")
+        return True
@@ -0,0 +1,72 @@
+"""Precompiled HTML fragments for category cards, headers and item badges.
+
+Templates are compiled once at import. Badge rows depend only on catalog
+data, so ``build_badges`` renders them for a whole catalog version up front
+and the checklist just looks them up. Fragments are emitted on one line so
+markdown never mistakes indented HTML for a code block.
+"""
+from html import escape
+from string import Template
+
+from catalog import iter_items
+
+METRIC_CARD = Template(
+    '<div class="metric-card"><h3>$icon $title</h3><h2>$completed/$total</h2>'
+    '<p>$percentage% Complete</p></div>'
+)
+CARD_GRID = Template('<div class="metric-grid">$cards</div>')
+CATEGORY_HEADER = Template(
+    '<div class="category-header"><h3>$icon $category</h3>'
+    '<p>Progress: $completed/$shown completed • $shown items shown</p></div>'
+)
+BADGE_ROW = Template(
+    '<div style="margin: 10px 0;">'
+    '<span class="feature-badge badge-new">Difficulty: <span class="$difficulty_class">$difficulty</span></span> '
+    '<span class="feature-badge badge-popular">Time: $time</span> '
+    '<span class="feature-badge badge-advanced">Cost: $cost</span> '
+    '<span class="feature-badge badge-new">ROI: <span class="$roi_class">$roi</span></span>'
+    '</div>'
+)
+
+
+def badge_row(item):
+    difficulty = item.get("difficulty", "Medium")
+    roi = item.get("roi_potential", "Medium")
+    return BADGE_ROW.substitute(
+        difficulty_class=f"difficulty-{escape(difficulty.lower())}",
+        difficulty=escape(difficulty),
+        time=escape(item.get("time_estimate", "Unknown")),
+        # "$" would start a LaTeX span in st.markdown
+        cost=escape(item.get("cost_estimate", "Unknown")).replace("$", "&#36;"),
+        roi_class=f"roi-{escape(roi.lower())}",
+        roi=escape(roi),
+    )
+
+
+def build_badges(categories):
+    """Badge row HTML for every item, keyed by item ID."""
+    return {item["id"]: badge_row(item) for _, item in iter_items(categories)}
+
+
+def category_card(cat_data, category, completed, total):
+    percentage = (completed / total) * 100 if total > 0 else 0
+    return METRIC_CARD.substitute(
+        icon=cat_data["icon"],
+        title=escape(category.split(" &")[0]),
+        completed=completed,
+        total=total,
+        percentage=f"{percentage:.0f}",
+    )
+
+
+def card_grid(cards):
+    return CARD_GRID.substitute(cards="".join(cards))
+
+
+def category_header(cat_data, category, completed, shown):
+    return CATEGORY_HEADER.substitute(
+        icon=cat_data["icon"],
+        category=escape(category),
+        completed=completed,
+        shown=shown,
+    )
@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta
+
+from booking_calendar import BUFFER, OVERLAP, Booking, BookingCalendar
+
+DAY = datetime(2025, 3, 3)
+
+
+def at(hour, minute=0):
+    return DAY + timedelta(hours=hour, minutes=minute)
+
+
+def test_import_rejects_incoming_overlapping_a_later_existing_booking():
+    calendar = BookingCalendar()
+    assert calendar.add(Booking("existing", "ana", at(10), at(12), "")) == []
+
+    rejected = calendar.import_bookings([Booking("incoming", "ana", at(9), at(11), "")])
+
+    assert [(c.kind, c.booking, c.other) for c in rejected] == [(OVERLAP, "incoming", "existing")]
+    assert set(calendar.bookings) == {"existing"}
+
+
+def test_import_still_accepts_bookings_that_fit():
+    calendar = BookingCalendar()
+    calendar.add(Booking("existing", "ana", at(12), at(14), ""))
+
+    rejected = calendar.import_bookings([
+        Booking("morning", "ana", at(8), at(10), ""),
+        Booking("clash", "ana", at(9), at(11), ""),
+        Booking("too-close", "ana", at(14, 15), at(15), ""),
+        Booking("evening", "ana", at(16), at(18), ""),
+    ])
+
+    assert [(c.kind, c.booking) for c in rejected] == [(OVERLAP, "clash"), (BUFFER, "too-close")]
+    assert set(calendar.bookings) == {"existing", "morning", "evening"}
+
+
+def test_reschedule_checks_the_booking_before_its_old_slot():
+    calendar = BookingCalendar(buffer=timedelta(0))
+    calendar.add(Booking("first", "ana", at(8), at(10), ""))
+    calendar.add(Booking("moving", "ana", at(10), at(11), ""))
+    calendar.buffer = timedelta(minutes=30)
+
+    # The booking's own old slot sits between "first" and the new start
+    conflicts = calendar.check(Booking("moving", "ana", at(10, 15), at(11, 15), ""))
+
+    assert [(c.kind, c.other) for c in conflicts] == [(BUFFER, "first")]
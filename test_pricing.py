@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from pricing import PricingEngine, QuoteRequest, synthetic_requests
+
+
+def test_small_job_is_raised_to_the_minimum():
+    engine = PricingEngine()
+    quote = engine.quote(QuoteRequest("small", "Standard clean", 300, "Weekly"))
+
+    assert quote.minimum_fee > 0
+    assert quote.labor + quote.addons - quote.discount + quote.minimum_fee == pytest.approx(engine.minimum, abs=0.011)
+    assert quote.total == pytest.approx(engine.minimum * (1 + engine.tax_rate), abs=0.011)
+
+
+def test_batch_and_single_quotes_agree_below_the_minimum():
+    engine = PricingEngine()
+    requests = [
+        QuoteRequest("weekly", "Standard clean", 300, "Weekly"),
+        QuoteRequest("first-time", "Standard clean", 500, "Biweekly", first_time=True),
+        QuoteRequest("promo", "Standard clean", 200, "Monthly", promo="WELCOME20"),
+        QuoteRequest("addon", "Standard clean", 100, "Weekly", addons=("Laundry",)),
+    ] + [request._replace(sqft=request.sqft / 10) for request in synthetic_requests(500, seed=3)]
+
+    prices = engine.price(requests)
+    singles = [engine.quote(request) for request in requests]
+
+    below = prices["minimum_fee"] > 0
+    assert below.sum() >= 4
+    for field in ("minimum_fee", "discount", "tax"):
+        assert np.allclose(prices[field], [getattr(q, field) for q in singles], atol=0.011)
+    totals = np.array([np.nan if q.total is None else q.total for q in singles])
+    assert np.allclose(prices["total"], totals, equal_nan=True, atol=0.011)
+
+
+def test_unknown_frequency_fails_the_same_way_in_both_paths():
+    engine = PricingEngine()
+    request = QuoteRequest("odd", "Standard clean", 1500, "Fortnightly-ish")
+
+    with pytest.raises(ValueError, match="Unknown frequency"):
+        engine.quote(request)
+    with pytest.raises(ValueError, match="Unknown frequency"):
+        engine.price([request])
@@ -0,0 +1,14 @@
+from routing import RoutePlanner, synthetic_day
+
+CENTER = (39.96, -83.0)
+
+
+def test_no_job_is_both_routed_and_unassigned():
+    jobs = synthetic_day(300, CENTER, seed=2)
+    planner = RoutePlanner(CENTER, jobs, 40)
+    routes = planner.solve()
+
+    routed = [job_id for route in routes for job_id in route.jobs]
+    assert len(routed) == len(set(routed))
+    assert not set(routed) & planner.unassigned
+    assert set(routed) | planner.unassigned == {job.id for job in jobs}
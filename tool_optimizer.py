@@ -0,0 +1,170 @@
+"""Smallest or cheapest set of tool subscriptions covering a set of automations.
+
+Every catalog item lists the tools it can be built with; an item counts as
+covered once any one of them is subscribed to. Choosing the subscriptions
+is weighted set cover:
+
+* dominated tools (covering a subset of another tool's items at no lower
+  cost) are dropped first;
+* lazy greedy (a heap of stale ratios) gives a fast ln(n)-approximation
+  and, divided by the harmonic number of the largest set, a lower bound;
+* small instances are then solved exactly by branch and bound, seeded
+  with the greedy answer and cut off after ``node_limit`` nodes.
+"""
+import heapq
+from collections import namedtuple
+
+from catalog import iter_items
+
+# Rough entry-level monthly prices (USD); anything unlisted uses DEFAULT_TOOL_COST
+TOOL_COSTS = {
+    "zapier": 20, "make.com": 9, "mailchimp": 13, "convertkit": 15, "hubspot": 20,
+    "pipedrive": 15, "twilio": 20, "stripe": 0, "paypal": 0, "quickbooks": 30,
+    "freshbooks": 19, "xero": 15, "calendly": 10, "acuity": 16, "google calendar": 0,
+    "google forms": 0, "google sheets": 0, "google maps": 0, "google maps api": 0,
+    "typeform": 25, "docusign": 10, "slack": 7, "jobber": 69, "housecall pro": 65,
+}
+DEFAULT_TOOL_COST = 15
+
+CoverResult = namedtuple("CoverResult", ["tools", "cost", "covered", "uncovered", "lower_bound", "method"])
+
+
+class ToolIndex:
+    """Maps tools to the items they cover and back (tool keys are lower-case)."""
+
+    def __init__(self, categories):
+        self.tool_items = {}
+        self.item_tools = {}
+        self.display = {}
+        for _, item in iter_items(categories):
+            tools = set()
+            for tool in item.get("tools", []):
+                key = tool.strip().lower()
+                self.display.setdefault(key, tool.strip())
+                self.tool_items.setdefault(key, set()).add(item["id"])
+                tools.add(key)
+            self.item_tools[item["id"]] = tools
+
+    def tools_for(self, item_ids):
+        """Tools used by ``item_ids`` with the number of those items each covers."""
+        counts = {}
+        for key in item_ids:
+            for tool in self.item_tools.get(key, ()):
+                counts[tool] = counts.get(tool, 0) + 1
+        return counts
+
+
+def tool_cost(tool, costs=TOOL_COSTS, default=DEFAULT_TOOL_COST):
+    return costs.get(tool, default)
+
+
+def optimize(index, item_ids, weighted=True, costs=TOOL_COSTS, exact_limit=40, node_limit=200000):
+    """Cover ``item_ids`` with as few (or as cheap, if ``weighted``) tools as possible."""
+    targets = {key for key in item_ids if index.item_tools.get(key)}
+    uncovered = set(item_ids) - targets
+    sets = {}
+    for key in targets:
+        for tool in index.item_tools[key]:
+            sets.setdefault(tool, set()).add(key)
+    # Unit prices turn "cheapest" into "fewest tools"
+    price = {tool: (tool_cost(tool, costs) if weighted else 1) for tool in sets}
+    sets = _drop_dominated(sets, price)
+
+    chosen, lower_bound = _greedy(sets, price, targets)
+    method = "greedy"
+    if len(sets) <= exact_limit:
+        exact = _branch_and_bound(sets, price, targets, chosen, node_limit)
+        if exact is not None:
+            chosen, lower_bound, method = exact, sum(price[t] for t in exact), "exact"
+
+    cost = sum(price[tool] for tool in chosen)
+    covered = {tool: sorted(sets[tool]) for tool in chosen}
+    return CoverResult(
+        tools=sorted(chosen, key=lambda tool: (-len(sets[tool]), tool)),
+        cost=cost,
+        covered=covered,
+        uncovered=sorted(uncovered),
+        lower_bound=lower_bound,
+        method=method,
+    )
+
+
+def _drop_dominated(sets, price):
+    kept = {}
+    # Larger and cheaper sets first, so a dominating set is always seen first
+    for tool in sorted(sets, key=lambda t: (-len(sets[t]), price[t], t)):
+        items = sets[tool]
+        if any(items <= other_items and price[other] <= price[tool] for other, other_items in kept.items()):
+            continue
+        kept[tool] = items
+    return kept
+
+
+def _greedy(sets, price, targets):
+    remaining = set(targets)
+    chosen = []
+    # (cost per newly covered item, tool, coverage when the ratio was computed)
+    heap = [(_ratio(price[t], len(s)), t, len(s)) for t, s in sets.items()]
+    heapq.heapify(heap)
+    while remaining and heap:
+        _, tool, size = heapq.heappop(heap)
+        gain = len(sets[tool] & remaining)
+        if gain == 0:
+            continue
+        if gain < size:
+            heapq.heappush(heap, (_ratio(price[tool], gain), tool, gain))
+            continue
+        chosen.append(tool)
+        remaining -= sets[tool]
+    cost = sum(price[t] for t in chosen)
+    largest = max((len(s) for s in sets.values()), default=1)
+    harmonic = sum(1.0 / k for k in range(1, largest + 1))
+    # Every item needs at least its cheapest tool
+    cheapest = {}
+    for tool, items in sets.items():
+        for key in items:
+            if price[tool] < cheapest.get(key, float("inf")):
+                cheapest[key] = price[tool]
+    return chosen, max(cost / harmonic, max(cheapest.values(), default=0))
+
+
+def _ratio(cost, gain):
+    # Zero-cost tools sort first, larger coverage breaking the tie
+    return (cost / gain, -gain) if cost else (0.0, -gain)
+
+
+def _branch_and_bound(sets, price, targets, incumbent, node_limit):
+    options = {key: sorted((t for t in sets if key in sets[t]), key=lambda t: (price[t], -len(sets[t])))
+               for key in targets}
+    best = [list(incumbent), sum(price[t] for t in incumbent)]
+    nodes = [0]
+
+    def bound(remaining):
+        return max((price[options[key][0]] for key in remaining), default=0)
+
+    def search(remaining, chosen, cost):
+        nodes[0] += 1
+        if nodes[0] > node_limit:
+            raise _Abort
+        if not remaining:
+            if cost < best[1]:
+                best[0], best[1] = list(chosen), cost
+            return
+        if cost + bound(remaining) >= best[1]:
+            return
+        # Branch on the hardest item: every cover must include one of its tools
+        pivot = min(remaining, key=lambda key: len(options[key]))
+        for tool in options[pivot]:
+            chosen.append(tool)
+            search(remaining - sets[tool], chosen, cost + price[tool])
+            chosen.pop()
+
+    try:
+        search(frozenset(targets), [], 0)
+    except _Abort:
+        return None
+    return best[0]
+
+
+class _Abort(Exception):
+    pass
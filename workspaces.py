@@ -0,0 +1,305 @@
+"""Named workspaces, one per business location or franchisee.
+
+Each workspace lives in its own directory under ``WORKSPACES_DIR``::
+
+    workspaces/<name>/overlay.json   # optional: {"hidden": [...], "extra": {...}}
+    workspaces/<name>/progress.json  # written by "Save All Progress"
+    workspaces/<name>/notes.db       # implementation notes (see notes_store.py)
+
+Workspaces are loaded on first access and evicted (after saving) once they
+have been idle for ``idle_timeout`` seconds, so a single server can host many
+locations while only keeping the active ones in memory.
+"""
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from catalog import load_catalog
+from catalog_index import build_snapshot, overlay_snapshot
+from notes_store import NoteStore
+from sync import DEFAULT_PRIORITY, PRIORITY_LEVELS, SyncHub
+
+WORKSPACES_DIR = os.environ.get(
+    "AUTOMATION_HUB_WORKSPACES",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "workspaces"),
+)
+DEFAULT_WORKSPACE = "default"
+
+_NAME_RE = re.compile(r"^[a-z0-9][a-z0-9_-]{0,63}$")
+
+
+def normalize_workspace_name(name):
+    """Lower-case ``name`` and validate it for use as a directory name."""
+    name = name.strip().lower().replace(" ", "-")
+    if not _NAME_RE.match(name):
+        raise ValueError(f"Invalid workspace name: {name!r}")
+    return name
+
+
+def _write_json(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def priority_counts(priorities, index):
+    """``{level: count}`` over the items of ``index`` (a ``CatalogIndex``).
+
+    ``priorities`` holds non-default levels only; every other item counts
+    as ``DEFAULT_PRIORITY``, so this is linear in the number of edits.
+    """
+    counts = dict.fromkeys(PRIORITY_LEVELS, 0)
+    for name, level in priorities.items():
+        if level in counts and name in index.ids_by_name:
+            counts[level] += 1
+    counts[DEFAULT_PRIORITY] = index.total - sum(
+        count for level, count in counts.items() if level != DEFAULT_PRIORITY
+    )
+    return counts
+
+
+class ProgressStore:
+    """Persistent checklist progress for one workspace.
+
+    Uses the same fields as ``st.session_state`` and the same JSON layout
+    as the "Save All Progress" payload. Priorities are sparse (see
+    sync.py); default entries in older files are dropped on load. Notes
+    live in the workspace's ``NoteStore``; notes found in older progress
+    files are kept in ``legacy_notes`` until they are migrated there.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.completed = set()
+        self.favorites = set()
+        self.legacy_notes = {}
+        self.priorities = {}
+        self.implementation_dates = {}
+        self.last_updated = None
+        self.dirty = False
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return self
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        self.completed = set(data.get("completed", []))
+        self.favorites = set(data.get("favorites", []))
+        self.legacy_notes = dict(data.get("notes", {}))
+        self.priorities = {
+            name: level for name, level in data.get("priorities", {}).items() if level != DEFAULT_PRIORITY
+        }
+        self.implementation_dates = {
+            name: datetime.fromisoformat(value)
+            for name, value in data.get("implementation_dates", {}).items()
+        }
+        self.last_updated = data.get("last_updated")
+        return self
+
+    def to_dict(self):
+        return {
+            "completed": sorted(self.completed),
+            "priorities": self.priorities,
+            "favorites": sorted(self.favorites),
+            "implementation_dates": {k: v.isoformat() for k, v in self.implementation_dates.items()},
+            "last_updated": self.last_updated,
+        }
+
+    def save(self):
+        self.last_updated = datetime.now().isoformat()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        _write_json(self.path, self.to_dict())
+        self.dirty = False
+
+
+class Workspace:
+    def __init__(self, name, path, catalog_source, overlay, progress, notes):
+        self.name = name
+        self.path = path
+        self._catalog_source = catalog_source
+        self._snapshot = None
+        self.overlay = overlay
+        self.progress = progress
+        self.notes = notes
+        self.lock = threading.RLock()
+        self.hub = SyncHub(progress, notes, lock=self.lock)
+        self.last_access = time.monotonic()
+
+    def touch(self):
+        self.last_access = time.monotonic()
+
+    @property
+    def snapshot(self):
+        """This workspace's ``CatalogSnapshot``, following base catalog reloads."""
+        base = self._catalog_source()
+        with self.lock:
+            if self._snapshot is None or self._snapshot.version != base.version:
+                self._snapshot = overlay_snapshot(base, self.overlay)
+            return self._snapshot
+
+    @property
+    def catalog(self):
+        return self.snapshot.categories
+
+    def load_into(self, state):
+        """Copy this workspace's progress into a session's state."""
+        with self.lock:
+            progress = self.progress
+            state.completed_automations = set(progress.completed)
+            state.favorite_automations = set(progress.favorites)
+            state.priority_levels = dict(progress.priorities)
+            state.implementation_dates = dict(progress.implementation_dates)
+            state.sync_epoch = self.hub.epoch
+            state.sync_version = self.hub.version
+            state.workspace = self.name
+
+    def pull_into(self, state):
+        """Bring a session up to date with changes made by other sessions.
+
+        Only the changed items are copied; returns the ``(field, name)``
+        pairs that were refreshed, or ``None`` after a full reload.
+        """
+        with self.lock:
+            if getattr(state, "sync_epoch", None) != self.hub.epoch:
+                self.load_into(state)
+                return None
+            version, changed = self.hub.changes_since(state.sync_version)
+            if changed is None:
+                self.load_into(state)
+                return None
+            for field, name in changed:
+                # Notes are not mirrored in the session; their editors re-read the store
+                if field == "note":
+                    continue
+                value = self.hub.value(field, name)
+                if field == "completed":
+                    if value:
+                        state.completed_automations.add(name)
+                        state.implementation_dates[name] = self.progress.implementation_dates[name]
+                    else:
+                        state.completed_automations.discard(name)
+                elif field == "favorite":
+                    if value:
+                        state.favorite_automations.add(name)
+                    else:
+                        state.favorite_automations.discard(name)
+                elif field == "priority":
+                    if value == DEFAULT_PRIORITY:
+                        state.priority_levels.pop(name, None)
+                    else:
+                        state.priority_levels[name] = value
+            state.sync_version = version
+            return changed
+
+    def push(self, state, changes):
+        """Publish a session's edits and pull everything it has missed."""
+        self.hub.apply(changes, base_version=state.sync_version)
+        return self.pull_into(state)
+
+    def save(self):
+        with self.lock:
+            self.progress.save()
+
+
+class WorkspaceManager:
+    """Lazily loads workspaces and evicts the idle ones.
+
+    One instance is shared by every session of the server process (see
+    ``st.cache_resource`` in app.py); all methods are thread-safe.
+    """
+
+    def __init__(self, root=WORKSPACES_DIR, idle_timeout=15 * 60, max_loaded=None,
+                 catalog_source=None):
+        """``catalog_source`` returns the current base ``CatalogSnapshot``
+        (e.g. a ``CatalogWatcher``); defaults to the catalog file as loaded now."""
+        self.root = root
+        self.idle_timeout = idle_timeout
+        self.max_loaded = max_loaded
+        if catalog_source is None:
+            base = build_snapshot(load_catalog())
+            catalog_source = lambda: base
+        self.catalog_source = catalog_source
+        self._loaded = OrderedDict()
+        self._lock = threading.Lock()
+
+    def list_names(self):
+        names = {DEFAULT_WORKSPACE}
+        if os.path.isdir(self.root):
+            names.update(
+                entry for entry in os.listdir(self.root)
+                if _NAME_RE.match(entry) and os.path.isdir(os.path.join(self.root, entry))
+            )
+        with self._lock:
+            names.update(self._loaded)
+        return sorted(names)
+
+    def loaded_names(self):
+        with self._lock:
+            return list(self._loaded)
+
+    def get(self, name):
+        name = normalize_workspace_name(name)
+        with self._lock:
+            workspace = self._loaded.get(name)
+            if workspace is None:
+                workspace = self._load(name)
+                self._loaded[name] = workspace
+            self._loaded.move_to_end(name)
+            workspace.touch()
+            evicted = self._pop_evictable(keep=name)
+        for stale in evicted:
+            self._flush(stale)
+        return workspace
+
+    def create(self, name):
+        name = normalize_workspace_name(name)
+        os.makedirs(os.path.join(self.root, name), exist_ok=True)
+        return self.get(name)
+
+    def evict_idle(self, now=None):
+        """Save and drop idle workspaces; returns the evicted names."""
+        with self._lock:
+            evicted = self._pop_evictable(now=now)
+        for workspace in evicted:
+            self._flush(workspace)
+        return [workspace.name for workspace in evicted]
+
+    def _load(self, name):
+        path = os.path.join(self.root, name)
+        overlay = {}
+        overlay_path = os.path.join(path, "overlay.json")
+        if os.path.exists(overlay_path):
+            with open(overlay_path, encoding="utf-8") as f:
+                overlay = json.load(f)
+        progress = ProgressStore(os.path.join(path, "progress.json")).load()
+        notes = NoteStore(os.path.join(path, "notes.db"))
+        if progress.legacy_notes:
+            notes.put_many({k: v for k, v in progress.legacy_notes.items() if k not in notes})
+            progress.legacy_notes = {}
+            progress.dirty = True
+        return Workspace(name, path, self.catalog_source, overlay, progress, notes)
+
+    def _pop_evictable(self, keep=None, now=None):
+        now = time.monotonic() if now is None else now
+        evicted = []
+        for name in list(self._loaded):
+            if name != keep and now - self._loaded[name].last_access > self.idle_timeout:
+                evicted.append(self._loaded.pop(name))
+        if self.max_loaded is not None:
+            while len(self._loaded) > self.max_loaded:
+                oldest = next(iter(self._loaded))
+                if oldest == keep:
+                    break
+                evicted.append(self._loaded.pop(oldest))
+        return evicted
+
+    def _flush(self, workspace):
+        with workspace.lock:
+            if workspace.progress.dirty:
+                workspace.progress.save()
+            workspace.notes.close()